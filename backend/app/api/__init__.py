@@ -1,11 +1,27 @@
 from fastapi import Depends, HTTPException
 from starlette.requests import Request
 
-from app.storage.repository import InMemoryRepository
+from app.core.profiling import RequestProfiler
+from app.services.batch_planning_service import BatchPlanningService
+from app.storage.repository import Repository
 
 
-def get_repository(request: Request) -> InMemoryRepository:
+def get_repository(request: Request) -> Repository:
     repository = getattr(request.app.state, "repository", None)
     if repository is None:
         raise HTTPException(status_code=500, detail="Repository not initialized")
     return repository
+
+
+def get_batch_planning_service(request: Request) -> BatchPlanningService:
+    service = getattr(request.app.state, "batch_planning_service", None)
+    if service is None:
+        raise HTTPException(status_code=500, detail="Batch planner not initialized")
+    return service
+
+
+def get_profiler(request: Request) -> RequestProfiler:
+    profiler = getattr(request.app.state, "profiler", None)
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Profiling is not enabled")
+    return profiler
@@ -0,0 +1,32 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+
+from app.api import get_profiler
+from app.core.profiling import ProfileRecord, RequestProfiler
+
+router = APIRouter()
+
+
+def require_admin(
+    x_admin_token: Optional[str] = Header(None),
+    profiler: RequestProfiler = Depends(get_profiler),
+) -> RequestProfiler:
+    if not profiler.is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    return profiler
+
+
+@router.get("/profiles")
+def list_profiles(profiler: RequestProfiler = Depends(require_admin)) -> List[ProfileRecord]:
+    """Stored request profiles, newest first."""
+    return profiler.store.list()
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(profile_id: str, profiler: RequestProfiler = Depends(require_admin)) -> FileResponse:
+    path = profiler.store.path_for(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
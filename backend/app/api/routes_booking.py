@@ -1,15 +1,17 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header
 
 from app.api import get_repository
 from app.models.schemas import BookingResponse
 from app.services.booking_service import BookingService
-from app.storage.repository import InMemoryRepository
+from app.storage.repository import Repository
 
 router = APIRouter()
 
 
 def get_booking_service(
-    repository: InMemoryRepository = Depends(get_repository),
+    repository: Repository = Depends(get_repository),
 ) -> BookingService:
     return BookingService(repository=repository)
 
@@ -17,6 +19,7 @@ def get_booking_service(
 @router.post("/{trip_id}/book", response_model=BookingResponse)
 def book_trip(
     trip_id: str,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     service: BookingService = Depends(get_booking_service),
 ) -> BookingResponse:
-    return service.book_trip(trip_id=trip_id)
+    return service.book_trip(trip_id=trip_id, idempotency_key=idempotency_key)
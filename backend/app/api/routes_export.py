@@ -0,0 +1,42 @@
+from datetime import date
+from typing import Iterator, Optional
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.api import get_repository
+from app.models.encoding import booking_to_jsonable, dumps, plan_to_jsonable
+from app.storage.repository import Repository, iter_plans
+
+router = APIRouter()
+
+
+@router.get("/export")
+def export_plans(
+    user_id: Optional[str] = None,
+    start_from: Optional[date] = None,
+    start_to: Optional[date] = None,
+    include_bookings: bool = True,
+    repository: Repository = Depends(get_repository),
+) -> StreamingResponse:
+    """
+    Stream matching plans as NDJSON, each followed by its bookings. Rows are
+    serialized one at a time from a paged repository scan.
+    """
+    lines = _export_lines(repository, user_id, start_from, start_to, include_bookings)
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+def _export_lines(
+    repository: Repository,
+    user_id: Optional[str],
+    start_from: Optional[date],
+    start_to: Optional[date],
+    include_bookings: bool,
+) -> Iterator[bytes]:
+    for plan in iter_plans(repository, user_id=user_id, start_from=start_from, start_to=start_to):
+        yield dumps({"type": "plan", "data": plan_to_jsonable(plan)}) + b"\n"
+        if not include_bookings:
+            continue
+        for booking in repository.list_bookings_for_trip(plan.trip_id):
+            yield dumps({"type": "booking", "data": booking_to_jsonable(booking)}) + b"\n"
@@ -1,16 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from typing import List, Optional
 
-from app.api import get_repository
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
+
+from app.api import get_batch_planning_service, get_repository
 from app.core.config import settings
-from app.models.schemas import PlanResponse, Preferences, TripPlanSchema
+from app.core.metrics import span
+from app.models.encoding import encode_plan_page, encode_plan_response
+from app.models.schemas import PlanPage, PlanResponse, Preferences, TripPlanSchema
+from app.services.batch_planning_service import BatchPlanningService
 from app.services.planning_service import PlanningService
-from app.storage.repository import InMemoryRepository
+from app.storage.repository import Repository
 
 router = APIRouter()
 
 
 def get_planning_service(
-    repository: InMemoryRepository = Depends(get_repository),
+    repository: Repository = Depends(get_repository),
 ) -> PlanningService:
     return PlanningService(repository=repository)
 
@@ -18,17 +25,76 @@ def get_planning_service(
 @router.post("/", response_model=PlanResponse)
 def create_plan(
     preferences: Preferences,
+    include_alternatives: bool = False,
     service: PlanningService = Depends(get_planning_service),
-) -> PlanResponse:
-    plan = service.plan_trip(user_id=settings.default_user_id, preferences=preferences)
-    return PlanResponse(plan=plan)
+) -> Response:
+    # Encoded straight from the domain plans; response_model only documents the shape.
+    plans = service.create_plans(
+        user_id=settings.default_user_id,
+        preferences=preferences,
+        include_alternatives=include_alternatives,
+    )
+    with span("serialize"):
+        body = encode_plan_response(plans[0], plans[1:])
+    return Response(body, media_type="application/json")
+
+
+@router.get("/", response_model=PlanPage)
+def list_plans(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    user_id: Optional[str] = None,
+    start_from: Optional[date] = None,
+    start_to: Optional[date] = None,
+    repository: Repository = Depends(get_repository),
+) -> Response:
+    try:
+        plans, next_cursor = repository.list_plans_page(
+            limit=limit,
+            cursor=cursor,
+            user_id=user_id,
+            start_from=start_from,
+            start_to=start_to,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return Response(encode_plan_page(plans, next_cursor), media_type="application/json")
+
+
+@router.post("/batch")
+def create_plans_batch(
+    preferences: List[Preferences],
+    batch_service: BatchPlanningService = Depends(get_batch_planning_service),
+    repository: Repository = Depends(get_repository),
+) -> StreamingResponse:
+    lines = batch_service.plan_many(
+        user_id=settings.default_user_id,
+        preferences_list=preferences,
+        repository=repository,
+    )
+    return StreamingResponse(lines, media_type="application/x-ndjson")
 
 
 @router.get("/{trip_id}", response_model=TripPlanSchema)
 def get_plan(
-    trip_id: str, repository: InMemoryRepository = Depends(get_repository)
-) -> TripPlanSchema:
-    plan = repository.get_plan(trip_id)
-    if not plan:
+    trip_id: str,
+    if_none_match: Optional[str] = Header(None),
+    repository: Repository = Depends(get_repository),
+) -> Response:
+    # Repeat polls hit the repository's cached bytes; unchanged plans get a bodiless 304.
+    encoded = repository.get_encoded_plan(trip_id)
+    if encoded is None:
         raise HTTPException(status_code=404, detail="Plan not found")
-    return TripPlanSchema.from_domain(plan)
+    body, etag = encoded
+    headers = {"ETag": etag, "Cache-Control": settings.plan_cache_control}
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison: a W/ prefix on either side is ignored.
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
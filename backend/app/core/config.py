@@ -1,4 +1,5 @@
 from functools import lru_cache
+from pathlib import Path
 
 try:  # optional dependency
     from dotenv import load_dotenv
@@ -18,7 +19,46 @@ class Settings(BaseSettings):
     ollama_model: str = Field("llama3", env="OLLAMA_MODEL")
     calendar_ics_url: str | None = Field(None, env="CALENDAR_ICS_URL")
     makcorps_jwt: str | None = Field(None, env="MAKCORPS_JWT")
+    makcorps_base_url: str = Field("https://api.makcorps.com", env="MAKCORPS_BASE_URL")
+    hotel_search_deadline_seconds: float = Field(2.0, env="HOTEL_SEARCH_DEADLINE_SECONDS")
+    # Plan requests expected to search hotels at the same time; sizes the per-provider pools.
+    hotel_search_concurrency: int = Field(8, env="HOTEL_SEARCH_CONCURRENCY")
+    hotel_cache_ttl_seconds: float = Field(3600.0, env="HOTEL_CACHE_TTL_SECONDS")
+    hotel_cache_negative_ttl_seconds: float = Field(60.0, env="HOTEL_CACHE_NEGATIVE_TTL_SECONDS")
+    hotel_cache_max_entries: int = Field(10000, env="HOTEL_CACHE_MAX_ENTRIES")
+    hotel_cache_path: str | None = Field(None, env="HOTEL_CACHE_PATH")
+    repository_backend: str = Field("memory", env="REPOSITORY_BACKEND")  # memory | sqlite
+    sqlite_path: str = Field("data/vacation_planner.db", env="SQLITE_PATH")
+    # In-memory plan and booking store bounds; 0 disables each limit.
+    plan_store_max_plans: int = Field(0, env="PLAN_STORE_MAX_PLANS")
+    plan_store_ttl_seconds: float = Field(0.0, env="PLAN_STORE_TTL_SECONDS")
+    plan_store_max_bytes: int = Field(0, env="PLAN_STORE_MAX_BYTES")
+    booking_store_max_bookings: int = Field(0, env="BOOKING_STORE_MAX_BOOKINGS")
+    booking_store_ttl_seconds: float = Field(0.0, env="BOOKING_STORE_TTL_SECONDS")
+    plan_cache_control: str = Field("private, no-cache", env="PLAN_CACHE_CONTROL")
     rag_docs_path: str = Field("/extracted", env="RAG_DOCS_PATH")
+    destination_rules_path: str = Field(
+        str(Path(__file__).resolve().parents[1] / "data" / "destination_rules.json"),
+        env="DESTINATION_RULES_PATH",
+    )
+    catalog_path: str = Field(
+        str(Path(__file__).resolve().parents[1] / "data" / "destinations.json"),
+        env="CATALOG_PATH",
+    )
+    booking_timeout_seconds: float = Field(10.0, env="BOOKING_TIMEOUT_SECONDS")
+    booking_provider_latency_seconds: float = Field(0.0, env="BOOKING_PROVIDER_LATENCY_SECONDS")
+    planner_max_candidates: int = Field(5, env="PLANNER_MAX_CANDIDATES")
+    batch_workers: int = Field(0, env="BATCH_WORKERS")  # 0 = one per CPU
+    batch_persist_chunk_size: int = Field(100, env="BATCH_PERSIST_CHUNK_SIZE")
+    # Guards /admin routes and the X-Profile request header; unset disables both.
+    admin_token: str | None = Field(None, env="ADMIN_TOKEN")
+    # Request profiling: a sampled share of requests, and requests slower than
+    # profile_slow_seconds (0 disables each), kept in a ring of profile_max_files.
+    profile_sample_rate: float = Field(0.0, env="PROFILE_SAMPLE_RATE")
+    profile_slow_seconds: float = Field(0.0, env="PROFILE_SLOW_SECONDS")
+    profile_sample_interval_seconds: float = Field(0.01, env="PROFILE_SAMPLE_INTERVAL_SECONDS")
+    profile_dir: str = Field("data/profiles", env="PROFILE_DIR")
+    profile_max_files: int = Field(50, env="PROFILE_MAX_FILES")
 
     class Config:
         case_sensitive = False
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, Sequence, Tuple, TypeVar
+
+# Prometheus-style upper bounds in seconds, sized for stages from ~100 us to LLM calls.
+DEFAULT_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+F = TypeVar("F", bound=Callable)
+
+
+class Counter:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Histogram:
+    """Observations bucketed by upper bound; counts are cumulated only when rendered."""
+
+    __slots__ = ("bounds", "counts", "sum", "count", "_lock")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class MetricFamily:
+    """One metric name with a child Counter/Histogram per label-value tuple."""
+
+    def __init__(self, name: str, help_text: str, kind: str, label_names: Sequence[str], factory: Callable):
+        self.name = name
+        self.help_text = help_text
+        self.kind = kind
+        self.label_names = tuple(label_names)
+        self._factory = factory
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            labels = _format_labels(self.label_names, values)
+            if isinstance(child, Counter):
+                lines.append(f"{self.name}{_braced(labels)} {_number(child.value)}")
+                continue
+            with child._lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(child.bounds + (math.inf,), counts):
+                cumulative += bucket_count
+                le = _format_labels(("le",), ("+Inf" if bound == math.inf else _number(bound),))
+                lines.append(f"{self.name}_bucket{_braced(_join(labels, le))} {cumulative}")
+            lines.append(f"{self.name}_sum{_braced(labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_braced(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._families: Dict[str, MetricFamily] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> MetricFamily:
+        return self._register(name, help_text, "counter", label_names, Counter)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> MetricFamily:
+        return self._register(name, help_text, "histogram", label_names, lambda: Histogram(buckets))
+
+    def _register(self, name: str, help_text: str, kind: str, label_names: Sequence[str], factory) -> MetricFamily:
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = MetricFamily(name, help_text, kind, label_names, factory)
+            elif family.kind != kind:
+                raise ValueError(f"Metric {name} is already registered as a {family.kind}")
+            return family
+
+    def render(self) -> str:
+        """Everything registered, in the Prometheus text exposition format (0.0.4)."""
+        with self._lock:
+            families = sorted(self._families.values(), key=lambda f: f.name)
+        return "\n".join(line for family in families for line in family.render()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+STAGE_SECONDS = REGISTRY.histogram(
+    "vacation_planner_stage_seconds", "Time spent in each planning stage.", ("stage",)
+)
+LLM_RETRIES = REGISTRY.counter(
+    "vacation_planner_llm_retries_total", "LLM calls repeated after an unusable reply."
+).labels()
+LLM_FALLBACKS = REGISTRY.counter(
+    "vacation_planner_llm_fallbacks_total", "Plans produced by the mock fallback after the primary planner failed."
+).labels()
+CACHE_REQUESTS = REGISTRY.counter(
+    "vacation_planner_cache_requests_total", "Cache lookups by cache and result (hit or miss).", ("cache", "result")
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "vacation_planner_http_request_seconds", "HTTP request latency by route.", ("method", "route", "status")
+)
+
+
+class _Span:
+    __slots__ = ("_histogram", "_started")
+
+    def __init__(self, histogram: Histogram):
+        self._histogram = histogram
+
+    def __enter__(self) -> "_Span":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._histogram.observe(time.perf_counter() - self._started)
+
+
+# stage -> histogram, so a span costs one plain dict lookup.
+_STAGES: Dict[str, Histogram] = {}
+
+
+def span(stage: str) -> _Span:
+    """Time a block into vacation_planner_stage_seconds{stage=...}: `with span("llm_call"): ...`."""
+    histogram = _STAGES.get(stage)
+    if histogram is None:
+        histogram = _STAGES.setdefault(stage, STAGE_SECONDS.labels(stage))
+    return _Span(histogram)
+
+
+def timed(stage: str) -> Callable[[F], F]:
+    """Decorator form of span()."""
+
+    def decorate(fn: F) -> F:
+        histogram = STAGE_SECONDS.labels(stage)
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+
+
+def _join(*parts: str) -> str:
+    return ",".join(part for part in parts if part)
+
+
+def _braced(labels: str) -> str:
+    return f"{{{labels}}}" if labels else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value))
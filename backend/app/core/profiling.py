@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import cProfile
+import hmac
+import inspect
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+from fastapi.routing import APIRoute
+
+logger = logging.getLogger(__name__)
+
+# Request headers: X-Profile asks for a deterministic profile of this request,
+# X-Admin-Token must carry settings.admin_token for it to be honoured.
+PROFILE_HEADER = "x-profile"
+ADMIN_TOKEN_HEADER = "x-admin-token"
+
+
+@dataclass
+class ProfileRecord:
+    id: str
+    created_at: float
+    method: str
+    path: str
+    route: str
+    status: int
+    duration_ms: float
+    trigger: str  # header | sampled | slow
+    kind: str  # cprofile (.prof, pstats) | folded (.folded, collapsed stacks)
+    filename: str
+
+
+class ProfileStore:
+    """
+    Bounded on-disk ring buffer of profiles: each one is a data file plus a JSON
+    sidecar with its ProfileRecord. Saving beyond max_profiles deletes the oldest.
+    """
+
+    def __init__(self, directory: str | Path, max_profiles: int = 50):
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+
+    def save(self, record_fields: dict, kind: str, write: Callable[[Path], None]) -> ProfileRecord:
+        # Time-prefixed ids sort chronologically; the counter breaks same-nanosecond ties.
+        profile_id = f"{time.time_ns():020d}-{next(self._seq) % 10000:04d}"
+        suffix = ".prof" if kind == "cprofile" else ".folded"
+        record = ProfileRecord(
+            id=profile_id, created_at=time.time(), kind=kind, filename=profile_id + suffix, **record_fields
+        )
+        self.directory.mkdir(parents=True, exist_ok=True)
+        data_path = self.directory / record.filename
+        tmp = data_path.with_name(data_path.name + ".tmp")
+        write(tmp)
+        os.replace(tmp, data_path)
+        meta_tmp = self.directory / f"{profile_id}.json.tmp"
+        meta_tmp.write_text(json.dumps(asdict(record)), encoding="utf-8")
+        os.replace(meta_tmp, self.directory / f"{profile_id}.json")
+        self._prune()
+        return record
+
+    def list(self) -> List[ProfileRecord]:
+        """Stored profiles, newest first."""
+        records = []
+        for meta in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                records.append(ProfileRecord(**json.loads(meta.read_text(encoding="utf-8"))))
+            except (OSError, ValueError, TypeError):
+                continue  # pruned or half-written meanwhile
+        return records
+
+    def path_for(self, profile_id: str) -> Optional[Path]:
+        meta = self.directory / f"{profile_id}.json"
+        if "/" in profile_id or "\\" in profile_id or not meta.is_file():
+            return None
+        record = ProfileRecord(**json.loads(meta.read_text(encoding="utf-8")))
+        path = self.directory / record.filename
+        return path if path.is_file() else None
+
+    def _prune(self) -> None:
+        with self._lock:
+            metas = sorted(self.directory.glob("*.json"))
+            for meta in metas[: max(0, len(metas) - self.max_profiles)]:
+                for path in self.directory.glob(f"{meta.stem}.*"):
+                    path.unlink(missing_ok=True)
+
+
+class _ActiveRequest:
+    """Profiling state of one in-flight request, shared with its worker threads."""
+
+    __slots__ = ("profile", "started", "threads", "samples", "_lock")
+
+    def __init__(self, deterministic: bool):
+        self.profile = cProfile.Profile() if deterministic else None
+        self.started = time.perf_counter()
+        self.threads: Set[int] = set()  # threads currently running this request's handlers
+        self.samples: Counter = Counter()  # folded stack -> sample count
+        self._lock = threading.Lock()
+
+    def run(self, fn: Callable, args, kwargs):
+        ident = threading.get_ident()
+        with self._lock:
+            self.threads.add(ident)
+        try:
+            if self.profile is None:
+                return fn(*args, **kwargs)
+            self.profile.enable()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.profile.disable()
+        finally:
+            with self._lock:
+                self.threads.discard(ident)
+
+
+_CURRENT: ContextVar[Optional[_ActiveRequest]] = ContextVar("profiled_request", default=None)
+
+
+class _SlowSampler:
+    """
+    One background thread that samples the stacks of requests running longer
+    than threshold seconds, every interval seconds, via sys._current_frames().
+    Fast requests never get sampled, so they only pay for registration.
+    """
+
+    def __init__(self, threshold: float, interval: float):
+        self.threshold = threshold
+        self.interval = interval
+        self._active: Set[_ActiveRequest] = set()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, active: _ActiveRequest) -> None:
+        with self._cond:
+            self._active.add(active)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="slow-request-sampler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def discard(self, active: _ActiveRequest) -> None:
+        with self._cond:
+            self._active.discard(active)
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._active:
+                    self._cond.wait()
+            time.sleep(self.interval)
+            now = time.perf_counter()
+            with self._cond:
+                slow = [a for a in self._active if now - a.started >= self.threshold]
+            if not slow:
+                continue
+            frames = sys._current_frames()
+            for active in slow:
+                with active._lock:
+                    threads = list(active.threads)
+                for ident in threads:
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        active.samples[_folded_stack(frame)] += 1
+
+
+def _folded_stack(frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{getattr(code, 'co_qualname', code.co_name)} ({Path(code.co_filename).name}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class RequestProfiler:
+    """
+    Decides per request whether to profile it, and stores the result:
+    - X-Profile with a valid X-Admin-Token, or a sample_rate draw: the
+      request's handlers run under cProfile (saved as a .prof pstats file);
+    - otherwise, when slow_seconds is set, a request still running after
+      slow_seconds has its stacks sampled until it ends (saved as .folded
+      collapsed stacks, ready for flamegraph.pl or speedscope).
+    Requests matching none of these only pay for a context variable and,
+    with slow_seconds set, a sampler registration.
+    """
+
+    def __init__(
+        self,
+        store: ProfileStore,
+        sample_rate: float = 0.0,
+        slow_seconds: float = 0.0,
+        admin_token: Optional[str] = None,
+        sample_interval: float = 0.01,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.store = store
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_seconds
+        self.admin_token = admin_token
+        self.rng = rng
+        self._sampler = _SlowSampler(slow_seconds, sample_interval) if slow_seconds > 0 else None
+
+    def is_admin(self, token: Optional[str]) -> bool:
+        return bool(self.admin_token and token and hmac.compare_digest(token.encode(), self.admin_token.encode()))
+
+    def trigger_for(self, headers) -> Optional[str]:
+        if headers.get(PROFILE_HEADER) and self.is_admin(headers.get(ADMIN_TOKEN_HEADER)):
+            return "header"
+        if self.sample_rate > 0 and self.rng() < self.sample_rate:
+            return "sampled"
+        return None
+
+    async def dispatch(self, request, call_next):
+        trigger = self.trigger_for(request.headers)
+        if trigger is None and self._sampler is None:
+            return await call_next(request)
+        active = _ActiveRequest(deterministic=trigger is not None)
+        token = _CURRENT.set(active)  # copied into the handler tasks and threadpool calls
+        if trigger is None:
+            self._sampler.add(active)
+        try:
+            response = await call_next(request)
+        finally:
+            _CURRENT.reset(token)
+            if trigger is None:
+                self._sampler.discard(active)
+        duration = time.perf_counter() - active.started
+        fields = {
+            "method": request.method,
+            "path": request.url.path,
+            "route": getattr(request.scope.get("route"), "path", "unmatched"),
+            "status": response.status_code,
+            "duration_ms": round(duration * 1e3, 3),
+        }
+        try:
+            if trigger is not None:
+                record = self.store.save({**fields, "trigger": trigger}, "cprofile", active.profile.dump_stats)
+            elif duration >= self.slow_seconds and active.samples:
+                samples = dict(active.samples)
+                record = self.store.save({**fields, "trigger": "slow"}, "folded", lambda p: _write_folded(p, samples))
+            else:
+                return response
+        except OSError as exc:
+            logger.warning("Could not store profile for %s %s: %s", request.method, request.url.path, exc)
+            return response
+        logger.info("Stored %s profile %s for %s %s", record.trigger, record.id, request.method, request.url.path)
+        response.headers["X-Profile-Id"] = record.id
+        return response
+
+
+def _write_folded(path: Path, samples: Dict[str, int]) -> None:
+    with path.open("w", encoding="utf-8") as f:
+        for stack, count in sorted(samples.items(), key=lambda item: -item[1]):
+            f.write(f"{stack} {count}\n")
+
+
+def instrument_routes(routes) -> None:
+    """
+    Let RequestProfiler follow each API route's endpoint and dependencies into
+    the threads they run on. FastAPI looks dependant.call up per request, so
+    wrapping it in place is enough. Coroutine and generator callables are left
+    alone: cProfile is per thread, and the event loop thread is shared by every
+    in-flight request.
+    """
+    wrapped: Dict[Callable, Callable] = {}
+
+    def visit(dependant) -> None:
+        call = dependant.call
+        if call is not None and not (
+            inspect.iscoroutinefunction(call) or inspect.isgeneratorfunction(call) or inspect.isasyncgenfunction(call)
+        ):
+            if call not in wrapped:
+                wrapped[call] = _profiled(call)
+            dependant.call = wrapped[call]
+        for sub in dependant.dependencies:
+            visit(sub)
+
+    for route in routes:
+        if isinstance(route, APIRoute):
+            visit(route.dependant)
+
+
+def _profiled(fn: Callable) -> Callable:
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        active = _CURRENT.get()
+        if active is None:
+            return fn(*args, **kwargs)
+        return active.run(fn, args, kwargs)
+
+    return wrapper
+
+
+def create_request_profiler(settings) -> Optional[RequestProfiler]:
+    """A RequestProfiler if any trigger is configured, else None (no middleware needed)."""
+    if not (settings.profile_sample_rate > 0 or settings.profile_slow_seconds > 0 or settings.admin_token):
+        return None
+    return RequestProfiler(
+        ProfileStore(settings.profile_dir, max_profiles=settings.profile_max_files),
+        sample_rate=settings.profile_sample_rate,
+        slow_seconds=settings.profile_slow_seconds,
+        admin_token=settings.admin_token,
+        sample_interval=settings.profile_sample_interval_seconds,
+    )
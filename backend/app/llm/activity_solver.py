@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import heapq
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Optional, Pattern, Sequence
+
+TIME_SLOTS = ["morning", "afternoon", "evening"]
+
+STYLE_KEYWORDS: Dict[str, List[str]] = {
+    "relaxing": ["spa", "yoga", "beach", "garden", "sunset", "massage", "cruise", "tea"],
+    "adventure": ["hike", "trek", "surf", "snorkel", "dive", "climb", "volcano", "kayak"],
+    "family": ["zoo", "aquarium", "park", "museum", "cooking", "workshop", "boat"],
+    "business": ["dinner", "tour", "district", "market", "evening"],
+}
+
+
+def _score(pattern: Optional[Pattern[str]], activity: dict) -> float:
+    if pattern is None:
+        return 1.0
+    hits = pattern.findall(activity.get("title", "")) + pattern.findall(
+        activity.get("description", "")
+    )
+    return 1.0 + len({hit.lower() for hit in hits}) if hits else 1.0
+
+
+@lru_cache(maxsize=None)
+def _style_pattern(travel_style: str) -> Optional[Pattern[str]]:
+    keywords = STYLE_KEYWORDS.get(travel_style)
+    if not keywords:
+        return None
+    return re.compile("|".join(re.escape(kw) for kw in keywords), re.IGNORECASE)
+
+
+def select_activities(
+    pool: Sequence[dict],
+    day_count: int,
+    budget: float,
+    travel_style: str = "",
+    max_per_day: int = 2,
+) -> List[List[dict]]:
+    """
+    Pick activities for each day to maximize preference score and variety while
+    keeping the summed cost_estimate within budget (greedy with repair):
+
+    1. give every day its best-scoring distinct activity;
+    2. while over budget, swap the most expensive slot for the best-scoring unused
+       activity that closes the gap, or else the cheapest one available;
+    3. spend the remaining slack on extra activities in free time slots.
+
+    Each step is a sort or a linear scan, so pools of thousands of candidates
+    are solved in milliseconds. If even the cheapest itinerary exceeds the
+    budget, the cheapest itinerary is returned and the caller reports the overrun.
+    """
+    if day_count <= 0:
+        return []
+    if not pool:
+        raise ValueError("No activities available for destination")
+
+    pattern = _style_pattern((travel_style or "").lower())
+    costs = [float(a.get("cost_estimate") or 0.0) for a in pool]
+    rank_keys = [(-_score(pattern, a), cost) for a, cost in zip(pool, costs)]
+    by_score = sorted(range(len(pool)), key=rank_keys.__getitem__)
+    by_cost = sorted(range(len(pool)), key=costs.__getitem__)
+
+    days: List[List[int]] = [[by_score[d % len(pool)]] for d in range(day_count)]
+    used: Dict[int, int] = {}
+    for day in days:
+        used[day[0]] = used.get(day[0], 0) + 1
+    total = sum(costs[day[0]] for day in days)
+
+    # Repair: cost of the swapped slot strictly decreases, so this terminates.
+    heap = [(-costs[day[0]], d) for d, day in enumerate(days)]
+    heapq.heapify(heap)
+    while total > budget and heap:
+        _, d = heapq.heappop(heap)
+        current = days[d][0]
+        replacement = _best_unused_within(by_score, costs, used, costs[current] - (total - budget))
+        if replacement is None:
+            replacement = _cheapest_below(by_cost, costs, used, costs[current])
+        if replacement is None:
+            continue
+        days[d][0] = replacement
+        used[current] -= 1
+        used[replacement] = used.get(replacement, 0) + 1
+        total += costs[replacement] - costs[current]
+        heapq.heappush(heap, (-costs[replacement], d))
+
+    slack = budget - total
+    if max_per_day > 1 and slack > 0:
+        open_days = deque(range(day_count))
+        for idx in by_score:
+            if not open_days:
+                break
+            if used.get(idx) or costs[idx] > slack:
+                continue
+            slot = pool[idx].get("time_of_day")
+            for d in open_days:
+                if all(pool[other].get("time_of_day") != slot for other in days[d]):
+                    days[d].append(idx)
+                    used[idx] = 1
+                    slack -= costs[idx]
+                    if len(days[d]) >= max_per_day:
+                        open_days.remove(d)
+                    break
+
+    return [
+        sorted((pool[i] for i in day), key=lambda a: _slot_order(a.get("time_of_day")))
+        for day in days
+    ]
+
+
+def _best_unused_within(
+    by_score: List[int], costs: List[float], used: Dict[int, int], max_cost: float
+) -> Optional[int]:
+    for idx in by_score:
+        if not used.get(idx) and costs[idx] <= max_cost:
+            return idx
+    return None
+
+
+def _cheapest_below(
+    by_cost: List[int], costs: List[float], used: Dict[int, int], limit: float
+) -> Optional[int]:
+    for idx in by_cost:
+        if costs[idx] >= limit:
+            break
+        if not used.get(idx):
+            return idx
+    # Every cheaper activity is already scheduled: repeat the cheapest one.
+    cheapest = by_cost[0]
+    return cheapest if costs[cheapest] < limit else None
+
+
+def _slot_order(time_of_day: Optional[str]) -> int:
+    return TIME_SLOTS.index(time_of_day) if time_of_day in TIME_SLOTS else len(TIME_SLOTS)
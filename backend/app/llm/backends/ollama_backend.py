@@ -10,6 +10,12 @@ from uuid import uuid4
 import requests
 
 from app.core.config import settings
+from app.core.metrics import LLM_RETRIES, span
+from app.llm.candidates import (
+    build_candidates_concurrently,
+    candidate_destinations,
+    rank_candidates,
+)
 from app.llm.client import PlannerBackend, PlannerContext
 from app.llm.prompts import PLANNER_SYSTEM_PROMPT
 from app.models.domain import Activity, BudgetSummary, DayPlan, TripPlan
@@ -33,9 +39,8 @@ class OllamaPlannerBackend(PlannerBackend):
     Expects the model to return a TripPlan-compatible JSON object.
     """
 
-    def _build_messages(self, context: PlannerContext) -> List[dict]:
+    def _build_messages(self, context: PlannerContext, destination: str) -> List[dict]:
         prefs = context.preferences
-        destination = (prefs.destination_preferences[0] if prefs.destination_preferences else context.search_tool.default_destination())
         full_catalog = getattr(context.search_tool, "catalog", {})
         dest_catalog = {destination: full_catalog.get(destination, {})}
         calendar_hint = self._calendar_hint(context)
@@ -93,18 +98,30 @@ class OllamaPlannerBackend(PlannerBackend):
         prefs = context.preferences
         start = prefs.start_date or date.today()
         end = prefs.end_date or date.today() + timedelta(days=90)
-        ranges = context.calendar_tool.get_free_date_ranges(
-            user_id=context.user_id, start=start, end=end
-        )
+        with span("calendar"):
+            ranges = context.calendar_tool.get_group_free_date_ranges(
+                user_ids=context.calendar_user_ids(), start=start, end=end
+            )
         return [(rng[0].isoformat(), rng[1].isoformat()) for rng in ranges]
 
     def generate_plan(self, context: PlannerContext) -> TripPlan:
-        messages = self._build_messages(context)
+        return rank_candidates(self.generate_candidates(context), context)[0]
+
+    def generate_candidates(self, context: PlannerContext) -> List[TripPlan]:
+        """One chat request per preferred destination, issued concurrently; unranked."""
+        return build_candidates_concurrently(
+            candidate_destinations(context, catalog_only=False),
+            lambda dest: self._plan_for_destination(context, dest),
+        )
+
+    def _plan_for_destination(self, context: PlannerContext, destination: str) -> TripPlan:
+        messages = self._build_messages(context, destination)
         data = self._call_model(messages)
         try:
             return self._to_domain(data, user_id=context.user_id)
         except Exception as exc:  # noqa: BLE001
             logger.warning("Ollama response invalid, retrying with strict JSON ask: %s", exc)
+            LLM_RETRIES.inc()
             retry_messages = messages + [
                 {
                     "role": "user",
@@ -122,9 +139,10 @@ class OllamaPlannerBackend(PlannerBackend):
             "format": "json",
         }
         try:
-            resp = requests.post(
-                f"{settings.ollama_host}/api/chat", json=payload, timeout=45
-            )
+            with span("llm_call"):
+                resp = requests.post(
+                    f"{settings.ollama_host}/api/chat", json=payload, timeout=45
+                )
             resp.raise_for_status()
         except Exception as exc:  # noqa: BLE001
             logger.error("Ollama request failed: %s", exc)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.llm.client import PlannerContext
+from app.models.domain import TripPlan
+
+logger = logging.getLogger(__name__)
+
+
+def candidate_destinations(context: PlannerContext, catalog_only: bool = True) -> List[str]:
+    """
+    Preferred destinations in the order the user listed them, deduplicated and
+    capped at settings.planner_max_candidates. Destinations beyond
+    max_flight_hours stay in for plan_fit to rank last, unless none of them is
+    within reach: then the first reachable catalog destination is suggested
+    instead, then the catalog default.
+    """
+    prefs = context.preferences
+    search_tool = context.search_tool
+    destinations = [
+        dest
+        for dest in dict.fromkeys(prefs.destination_preferences)
+        if not catalog_only or search_tool.has_destination(dest)
+    ]
+    if prefs.max_flight_hours is not None and not any(
+        _within_reach(search_tool, dest, prefs.max_flight_hours) for dest in destinations
+    ):
+        # Only this fallback needs the range query over the whole catalog.
+        destinations = search_tool.find_destinations(max_flight_hours=prefs.max_flight_hours)[:1] or destinations
+    if not destinations:
+        return [search_tool.default_destination()]
+    return destinations[: settings.planner_max_candidates]
+
+
+def _within_reach(search_tool, destination: str, max_flight_hours: float) -> bool:
+    """Off-catalog destinations count as reachable: nothing is known against them."""
+    if not search_tool.has_destination(destination):
+        return True
+    hours = search_tool.flight_hours(destination)
+    return hours is not None and hours <= max_flight_hours
+
+
+def build_candidates_concurrently(
+    destinations: List[str], build_plan: Callable[[str], TripPlan]
+) -> List[TripPlan]:
+    """
+    Build one plan per destination on a thread pool. Failed destinations are
+    logged and skipped; if every destination fails, the first error is raised.
+    """
+    if len(destinations) == 1:
+        return [build_plan(destinations[0])]
+
+    plans: List[TripPlan] = []
+    errors: List[Exception] = []
+    with ThreadPoolExecutor(max_workers=len(destinations)) as pool:
+        futures = [(dest, pool.submit(build_plan, dest)) for dest in destinations]
+        for dest, future in futures:
+            try:
+                plans.append(future.result())
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Candidate plan for %s failed: %s", dest, exc)
+                errors.append(exc)
+    if not plans:
+        raise errors[0]
+    return plans
+
+
+def plan_fit(plan: TripPlan, context: PlannerContext) -> Tuple[int, float]:
+    """
+    Fit key for a candidate plan, lower is better: the number of violated
+    constraints (budget, max_flight_hours, calendar) and the relative budget
+    overshoot. Ties keep the user's preference order because sorting is stable.
+    Call it on post-processed plans, since backfilling days changes the budget.
+    The calendar term only separates backends that pick dates per destination
+    (Ollama); the mock backend gives every candidate the same free range.
+    """
+    prefs = context.preferences
+    breakdown = plan.budget_summary.breakdown or {}
+    total = sum(float(v or 0.0) for v in breakdown.values()) or plan.budget_summary.total_estimated
+    overshoot = max(0.0, total - prefs.budget_max) / (prefs.budget_max or 1.0)
+
+    violations = 0
+    if overshoot > 0:
+        violations += 1
+    flight_hours = _flight_hours(context, plan.destination)
+    if prefs.max_flight_hours is not None and flight_hours is not None:
+        if flight_hours > prefs.max_flight_hours:
+            violations += 1
+    if not context.calendar_tool.is_group_range_available(
+        user_ids=context.calendar_user_ids(),
+        start=plan.start_date,
+        end=plan.end_date,
+    ):
+        violations += 1
+    return violations, overshoot
+
+
+def rank_candidates(plans: List[TripPlan], context: PlannerContext) -> List[TripPlan]:
+    return sorted(plans, key=lambda plan: plan_fit(plan, context))
+
+
+def _flight_hours(context: PlannerContext, destination: str) -> Optional[float]:
+    return context.search_tool.flight_hours(destination)
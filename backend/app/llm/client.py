@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Protocol
+from dataclasses import dataclass, field
+from typing import List, Protocol
 
 from app.models.domain import TripPlan
 
@@ -16,6 +16,12 @@ class PlannerContext:
     calendar_tool: "CalendarTool"
     search_tool: "SearchTool"
     rag_tool: "RAGTool | None" = None
+    hotel_tool: "HotelTool | None" = None
+    participants: List[str] = field(default_factory=list)
+
+    def calendar_user_ids(self) -> List[str]:
+        """Users whose calendars must all be free: the planner plus any participants."""
+        return list(dict.fromkeys([self.user_id, *self.participants]))
 
 
 class LLMClient:
@@ -30,3 +36,10 @@ class LLMClient:
 
     def plan_trip(self, context: PlannerContext) -> TripPlan:
         return self.backend.generate_plan(context)
+
+    def plan_candidates(self, context: PlannerContext) -> List[TripPlan]:
+        # Backends may optionally expose generate_candidates (unranked, preference order).
+        generate_candidates = getattr(self.backend, "generate_candidates", None)
+        if generate_candidates is None:
+            return [self.backend.generate_plan(context)]
+        return generate_candidates(context)
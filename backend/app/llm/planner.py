@@ -6,7 +6,13 @@ from datetime import date, timedelta
 from typing import List, Optional, Tuple
 from uuid import uuid4
 
-from app.core.config import settings
+from app.core.metrics import span
+from app.llm.activity_solver import select_activities
+from app.llm.candidates import (
+    build_candidates_concurrently,
+    candidate_destinations,
+    rank_candidates,
+)
 from app.llm.client import LLMClient, PlannerContext, PlannerBackend
 from app.llm.prompts import PLANNER_SYSTEM_PROMPT
 from app.models.domain import Activity, BudgetSummary, DayPlan, TripPlan
@@ -23,45 +29,76 @@ class PlannerTools:
 
 class MockPlannerBackend(PlannerBackend):
     """
-    A deterministic planner that simulates LLM output. It selects the first
-    preferred destination with data, finds available dates, and assembles a
-    simple itinerary while honoring budget limits where possible.
+    A deterministic planner that simulates LLM output. It builds a candidate
+    itinerary for every preferred destination with data, finds available dates,
+    and returns the candidate that best fits the budget and flight constraints.
     """
 
     def generate_plan(self, context: PlannerContext) -> TripPlan:
+        return rank_candidates(self.generate_candidates(context), context)[0]
+
+    def generate_candidates(self, context: PlannerContext) -> List[TripPlan]:
+        """All candidate plans in preference order; callers rank them once post-processed."""
+        with span("calendar"):
+            start_date, end_date = self._select_dates(
+                context.preferences, context.calendar_tool, context.calendar_user_ids()
+            )
+        with span("mock_planner"):
+            return build_candidates_concurrently(
+                candidate_destinations(context),
+                lambda dest: self._plan_for_destination(context, dest, start_date, end_date),
+            )
+
+    def _plan_for_destination(
+        self,
+        context: PlannerContext,
+        destination: str,
+        start_date: date,
+        end_date: date,
+    ) -> TripPlan:
         preferences = context.preferences
-        destination = self._select_destination(preferences, context.search_tool)
-        start_date, end_date = self._select_dates(preferences, context.calendar_tool)
-        day_count = (end_date - start_date).days + 1
-        destination_data = context.search_tool.lookup_destination(destination)
+        with span("search"):
+            destination_data = context.search_tool.lookup_destination(destination)
         activities_pool = self._activity_pool(context, destination, destination_data)
         rag_tip = self._rag_tip(context, destination)
+        hotel_rate = self._hotel_rate(context, destination, destination_data)
+        if not (preferences.start_date and preferences.end_date):
+            end_date = self._fit_duration(
+                preferences, destination_data, hotel_rate, activities_pool, start_date, end_date
+            )
+        day_count = (end_date - start_date).days + 1
+        activity_budget = preferences.budget_max - self._fixed_costs(
+            destination_data, hotel_rate, day_count
+        )
+        schedule = select_activities(
+            activities_pool,
+            day_count=day_count,
+            budget=activity_budget,
+            travel_style=preferences.travel_style,
+        )
 
         day_plans: List[DayPlan] = []
-        for i in range(day_count):
+        for i, day_activities in enumerate(schedule):
             current_date = start_date + timedelta(days=i)
-            activity = activities_pool[i % len(activities_pool)]
-            description = activity["description"]
-            if rag_tip:
-                description = f"{description} | Local tip: {rag_tip}"
-            day_plans.append(
-                DayPlan(
-                    date=current_date,
-                    activities=[
-                        Activity(
-                            time_of_day=activity.get("time_of_day", "morning"),
-                            title=activity.get("title", "Activity"),
-                            description=description,
-                            cost_estimate=activity.get(
-                                "cost_estimate", activity.get("price", 50.0)
-                            ),
-                            booking_required=activity.get("booking_required", False),
-                        )
-                    ],
+            activities: List[Activity] = []
+            for activity in day_activities:
+                description = activity["description"]
+                if rag_tip:
+                    description = f"{description} | Local tip: {rag_tip}"
+                activities.append(
+                    Activity(
+                        time_of_day=activity.get("time_of_day", "morning"),
+                        title=activity.get("title", "Activity"),
+                        description=description,
+                        cost_estimate=activity.get(
+                            "cost_estimate", activity.get("price", 50.0)
+                        ),
+                        booking_required=activity.get("booking_required", False),
+                    )
                 )
-            )
+            day_plans.append(DayPlan(date=current_date, activities=activities))
 
-        budget_summary = self._build_budget(preferences, destination_data, day_plans)
+        budget_summary = self._build_budget(destination_data, hotel_rate, day_plans)
 
         trip_id = str(uuid4())
         logger.info(
@@ -113,7 +150,8 @@ class MockPlannerBackend(PlannerBackend):
     def _activities_from_rag(self, context: PlannerContext, destination: str) -> List[dict]:
         if not context.rag_tool:
             return []
-        hits = context.rag_tool.search(destination, top_k=5)
+        with span("rag_activities"):
+            hits = context.rag_tool.search(destination, top_k=5, destination=destination)
         activities: List[dict] = []
         for text, _score in hits:
             for line in text.splitlines():
@@ -160,27 +198,23 @@ class MockPlannerBackend(PlannerBackend):
     def _rag_tip(self, context: PlannerContext, destination: str) -> Optional[str]:
         if not context.rag_tool:
             return None
-        hits = context.rag_tool.search(destination, top_k=1)
+        with span("rag_tip"):
+            hits = context.rag_tool.search(destination, top_k=1, destination=destination)
         if not hits:
             return None
         snippet = hits[0][0].strip()
         # Use first line to keep context small
         return snippet.splitlines()[0][:200]
 
-    def _select_destination(
-        self, preferences: Preferences, search_tool: "SearchTool"
-    ) -> str:
-        for dest in preferences.destination_preferences:
-            if search_tool.has_destination(dest):
-                return dest
-        return search_tool.default_destination()
-
     def _select_dates(
-        self, preferences: Preferences, calendar_tool: "CalendarTool"
+        self,
+        preferences: Preferences,
+        calendar_tool: "CalendarTool",
+        user_ids: List[str],
     ) -> Tuple[date, date]:
         if preferences.start_date and preferences.end_date:
-            if calendar_tool.is_range_available(
-                user_id=settings.default_user_id,
+            if calendar_tool.is_group_range_available(
+                user_ids=user_ids,
                 start=preferences.start_date,
                 end=preferences.end_date,
             ):
@@ -189,8 +223,8 @@ class MockPlannerBackend(PlannerBackend):
 
         start_search = date.today()
         end_search = start_search + timedelta(days=90)
-        free_ranges = calendar_tool.get_free_date_ranges(
-            user_id=settings.default_user_id, start=start_search, end=end_search
+        free_ranges = calendar_tool.get_group_free_date_ranges(
+            user_ids=user_ids, start=start_search, end=end_search
         )
         desired_min = preferences.min_duration_days
         desired_max = preferences.max_duration_days
@@ -201,18 +235,50 @@ class MockPlannerBackend(PlannerBackend):
                 return rng_start, rng_start + timedelta(days=duration - 1)
         raise ValueError("No available dates found")
 
+    def _hotel_rate(
+        self, context: PlannerContext, destination: str, destination_data: dict
+    ) -> float:
+        """Cheapest merged nightly rate from the hotel providers, else the catalog price."""
+        if context.hotel_tool:
+            with span("hotel_search"):
+                hotels = context.hotel_tool.search_hotels(destination)
+            prices = [h.price_per_night for h in hotels if h.price_per_night > 0]
+            if prices:
+                return min(prices)
+        return destination_data["hotel"]["price_per_night"]
+
+    def _fit_duration(
+        self,
+        preferences: Preferences,
+        destination_data: dict,
+        hotel_rate: float,
+        activities_pool: List[dict],
+        start_date: date,
+        end_date: date,
+    ) -> date:
+        """Longest trip (down to min_duration_days) whose cheapest itinerary fits budget_max."""
+        day_count = (end_date - start_date).days + 1
+        min_days = min(preferences.min_duration_days, day_count)
+        cheapest = min(float(a.get("cost_estimate") or 0.0) for a in activities_pool)
+        for days in range(day_count, min_days - 1, -1):
+            fixed = self._fixed_costs(destination_data, hotel_rate, days)
+            if fixed + cheapest * days <= preferences.budget_max:
+                return start_date + timedelta(days=days - 1)
+        return start_date + timedelta(days=min_days - 1)
+
+    @staticmethod
+    def _fixed_costs(destination_data: dict, hotel_rate: float, day_count: int) -> float:
+        night_count = day_count - 1 if day_count > 1 else 1
+        return destination_data["flight"]["price"] + night_count * hotel_rate
+
     def _build_budget(
-        self, preferences: Preferences, destination_data: dict, days: List[DayPlan]
+        self, destination_data: dict, hotel_rate: float, days: List[DayPlan]
     ) -> BudgetSummary:
         flight_price = destination_data["flight"]["price"]
-        hotel_price_per_night = destination_data["hotel"]["price_per_night"]
         activity_total = sum(a.cost_estimate for d in days for a in d.activities)
-        night_count = len(days) - 1 if len(days) > 1 else 1
-        hotel_total = night_count * hotel_price_per_night
-        total = flight_price + hotel_total + activity_total
-        constrained_total = min(total, preferences.budget_max)
+        hotel_total = self._fixed_costs(destination_data, hotel_rate, len(days)) - flight_price
         return BudgetSummary(
-            total_estimated=constrained_total,
+            total_estimated=flight_price + hotel_total + activity_total,
             breakdown={
                 "flight": flight_price,
                 "hotel": hotel_total,
@@ -232,3 +298,10 @@ class LLMPlanner:
         except Exception as exc:  # noqa: BLE001
             logger.error("Planner failed: %s", exc)
             raise
+
+    def plan_candidates(self, context: PlannerContext) -> List[TripPlan]:
+        try:
+            return self.client.plan_candidates(context)
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Planner failed: %s", exc)
+            raise
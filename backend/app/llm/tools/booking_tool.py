@@ -1,104 +1,209 @@
 from __future__ import annotations
 
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional, Protocol
 from uuid import uuid4
 
+from app.core.config import settings
+from app.core.metrics import span
 from app.models.domain import (
-    Activity,
     BookingRecord,
     BookingStatus,
     BookingType,
-    DayPlan,
     PaymentStatus,
     TripPlan,
 )
-from app.storage.repository import InMemoryRepository
+from app.storage.repository import Repository
+
+logger = logging.getLogger(__name__)
+
+
+class BookingProvider(Protocol):
+    """Reservation backend for one provider (airline, hotel chain, activity seller)."""
+
+    def reserve(self, booking_type: BookingType, price: float, reference: Optional[str]) -> str:
+        """Reserve the item and return the provider confirmation code."""
+        ...
+
+    def cancel(self, confirmation: str) -> None:
+        ...
+
+
+class MockBookingProvider(BookingProvider):
+    """Simulated provider with configurable latency and failure injection."""
+
+    def __init__(self, name: str, latency_seconds: float = 0.0, fail: bool = False):
+        self.name = name
+        self.latency_seconds = latency_seconds
+        self.fail = fail
+        self.cancelled: List[str] = []
+
+    def reserve(self, booking_type: BookingType, price: float, reference: Optional[str]) -> str:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        if self.fail:
+            raise RuntimeError(f"{self.name} rejected {booking_type.value} reservation")
+        return f"{self.name}-{uuid4().hex[:8]}"
+
+    def cancel(self, confirmation: str) -> None:
+        self.cancelled.append(confirmation)
+
+
+def default_providers() -> Dict[str, BookingProvider]:
+    latency = settings.booking_provider_latency_seconds
+    return {
+        name: MockBookingProvider(name, latency_seconds=latency)
+        for name in ("mock-air", "mock-hotel", "mock-activity")
+    }
+
+
+@dataclass
+class _ReservationItem:
+    booking_type: BookingType
+    price: float
+    provider: str
+    reference: Optional[str] = None
 
 
 class BookingTool:
-    def __init__(self, repository: InMemoryRepository):
-        self.repository = repository
+    """
+    Reserves every bookable item of a plan concurrently with one shared timeout,
+    so latency tracks the slowest provider rather than the sum of all calls.
+    Each call gets its own pool with a thread per item, so no reservation waits
+    in a queue behind another booking's.
+    If any item fails or times out, the confirmed ones are cancelled
+    (compensation) and every record is stored with its own final status.
+    """
 
-    def reserve_trip(self, plan: TripPlan, payment_allowed: bool = True) -> List[BookingRecord]:
-        bookings: List[BookingRecord] = []
-        bookings.append(
-            self._create_booking(
-                user_id=plan.user_id,
-                trip_id=plan.trip_id,
-                booking_type=BookingType.flight,
-                price=plan.budget_summary.breakdown.get("flight", 0.0),
-                provider="mock-air",
-                payment_allowed=payment_allowed,
-            )
-        )
-        bookings.append(
-            self._create_booking(
-                user_id=plan.user_id,
-                trip_id=plan.trip_id,
-                booking_type=BookingType.hotel,
-                price=plan.budget_summary.breakdown.get("hotel", 0.0),
-                provider="mock-hotel",
-                payment_allowed=payment_allowed,
-            )
+    def __init__(
+        self,
+        repository: Repository,
+        providers: Optional[Dict[str, BookingProvider]] = None,
+        timeout_seconds: Optional[float] = None,
+    ):
+        self.repository = repository
+        self.providers = providers or default_providers()
+        self.timeout_seconds = (
+            settings.booking_timeout_seconds if timeout_seconds is None else timeout_seconds
         )
 
-        for day in plan.days:
-            bookings.extend(
-                self._create_activity_bookings(
-                    plan=plan,
-                    day=day,
-                    payment_allowed=payment_allowed,
-                )
-            )
-
-        for booking in bookings:
-            self.repository.save_booking(booking)
-        return bookings
-
-    def _create_activity_bookings(
-        self, plan: TripPlan, day: DayPlan, payment_allowed: bool
+    def reserve_trip(
+        self,
+        plan: TripPlan,
+        payment_allowed: bool = True,
+        idempotency_key: Optional[str] = None,
+        record_failures: bool = True,
     ) -> List[BookingRecord]:
-        records: List[BookingRecord] = []
-        for activity in day.activities:
-            if not activity.booking_required:
+        """
+        Reserve and store every item. The records complete idempotency_key's
+        claim; with record_failures=False an outcome that is not fully confirmed
+        is stored without the key and the claim is released instead.
+        """
+        items = self._reservation_items(plan)
+        if payment_allowed:
+            with span("booking_reserve"):
+                statuses = self._reserve_all(items)
+        else:
+            statuses = [(BookingStatus.failed, PaymentStatus.failed)] * len(items)
+        bookings = [
+            self._create_booking(plan, item, status, payment_status)
+            for item, (status, payment_status) in zip(items, statuses)
+        ]
+        confirmed = all(b.status is BookingStatus.confirmed for b in bookings)
+        with span("booking_persist"):
+            if idempotency_key is None or confirmed or record_failures:
+                return self.repository.save_bookings(bookings, idempotency_key=idempotency_key)
+            saved = self.repository.save_bookings(bookings)
+            self.repository.release_idempotency_key(idempotency_key)
+            return saved
+
+    def _reservation_items(self, plan: TripPlan) -> List[_ReservationItem]:
+        breakdown = plan.budget_summary.breakdown
+        items = [
+            _ReservationItem(BookingType.flight, breakdown.get("flight", 0.0), "mock-air"),
+            _ReservationItem(BookingType.hotel, breakdown.get("hotel", 0.0), "mock-hotel"),
+        ]
+        for day in plan.days:
+            for activity in day.activities:
+                if activity.booking_required:
+                    items.append(
+                        _ReservationItem(
+                            BookingType.activity,
+                            activity.cost_estimate,
+                            "mock-activity",
+                            reference=activity.title,
+                        )
+                    )
+        return items
+
+    def _reserve_all(self, items: List[_ReservationItem]) -> List[tuple]:
+        pool = ThreadPoolExecutor(max_workers=max(1, len(items)), thread_name_prefix="booking")
+        futures: List[Future] = [
+            pool.submit(self.providers[item.provider].reserve, item.booking_type, item.price, item.reference)
+            for item in items
+        ]
+        done, not_done = wait(futures, timeout=self.timeout_seconds)
+        # Don't wait for stragglers; any that never started are cancelled.
+        pool.shutdown(wait=False, cancel_futures=True)
+        confirmations: List[Optional[str]] = []
+        for item, future in zip(items, futures):
+            if future in done and future.exception() is None:
+                confirmations.append(future.result())
                 continue
-            records.append(
-                self._create_booking(
-                    user_id=plan.user_id,
-                    trip_id=plan.trip_id,
-                    booking_type=BookingType.activity,
-                    price=activity.cost_estimate,
-                    provider="mock-activity",
-                    payment_allowed=payment_allowed,
-                    reference=activity.title,
-                )
-            )
-        return records
+            if future in not_done:
+                logger.warning("%s reservation timed out", item.provider)
+                # Release the reservation if the provider confirms after we gave up.
+                if not future.cancel():
+                    future.add_done_callback(self._cancel_late(item.provider))
+            else:
+                logger.warning("%s reservation failed: %s", item.provider, future.exception())
+            confirmations.append(None)
+
+        if all(confirmations):
+            return [(BookingStatus.confirmed, PaymentStatus.authorized)] * len(items)
 
+        statuses = []
+        for item, confirmation in zip(items, confirmations):
+            if confirmation is None:
+                statuses.append((BookingStatus.failed, PaymentStatus.failed))
+                continue
+            self._cancel(item.provider, confirmation)
+            statuses.append((BookingStatus.cancelled, PaymentStatus.voided))
+        return statuses
+
+    def _cancel(self, provider: str, confirmation: str) -> None:
+        try:
+            self.providers[provider].cancel(confirmation)
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Compensation failed for %s %s: %s", provider, confirmation, exc)
+
+    def _cancel_late(self, provider: str):
+        def _callback(future: Future) -> None:
+            if not future.cancelled() and future.exception() is None:
+                self._cancel(provider, future.result())
+
+        return _callback
+
+    @staticmethod
     def _create_booking(
-        self,
-        user_id: str,
-        trip_id: str,
-        booking_type: BookingType,
-        price: float,
-        provider: str,
-        payment_allowed: bool,
-        reference: str | None = None,
+        plan: TripPlan,
+        item: _ReservationItem,
+        status: BookingStatus,
+        payment_status: PaymentStatus,
     ) -> BookingRecord:
-        payment_status = (
-            PaymentStatus.authorized if payment_allowed else PaymentStatus.failed
-        )
-        status = BookingStatus.confirmed if payment_allowed else BookingStatus.failed
         return BookingRecord(
             booking_id=str(uuid4()),
-            user_id=user_id,
-            trip_id=trip_id,
-            type=booking_type,
+            user_id=plan.user_id,
+            trip_id=plan.trip_id,
+            type=item.booking_type,
             status=status,
-            provider=provider,
-            price=price,
+            provider=item.provider,
+            price=item.price,
             created_at=datetime.utcnow(),
             payment_status=payment_status,
-            reference=reference,
+            reference=item.reference,
         )
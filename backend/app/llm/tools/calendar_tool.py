@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import heapq
 import logging
 from datetime import date, datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Sequence, Tuple
 
 import requests
 
@@ -19,11 +20,12 @@ class CalendarTool:
         self.busy: Dict[str, List[Tuple[date, date]]] = {}
 
     def seed_busy_ranges(self, user_id: str, ranges: List[Tuple[date, date]]) -> None:
-        self.busy[user_id] = ranges
+        # Busy ranges are kept sorted by start so group lookups can k-way merge them.
+        self.busy[user_id] = sorted(ranges)
 
     def add_busy_ranges(self, user_id: str, ranges: List[Tuple[date, date]]) -> None:
         existing = self.busy.get(user_id, [])
-        self.busy[user_id] = existing + ranges
+        self.busy[user_id] = list(heapq.merge(existing, sorted(ranges)))
 
     def load_from_ics(self, user_id: str, url: str, timeout: int = 10) -> None:
         try:
@@ -42,14 +44,38 @@ class CalendarTool:
                 return False
         return True
 
+    def is_group_range_available(
+        self, user_ids: Sequence[str], start: date, end: date
+    ) -> bool:
+        return all(self.is_range_available(user_id, start, end) for user_id in user_ids)
+
     def get_free_date_ranges(
         self, user_id: str, start: date, end: date
+    ) -> List[Tuple[date, date]]:
+        return self._free_ranges(self.busy.get(user_id, []), start, end)
+
+    def get_group_free_date_ranges(
+        self, user_ids: Sequence[str], start: date, end: date
+    ) -> List[Tuple[date, date]]:
+        """
+        Return the windows where every user in user_ids is free.
+        The per-user busy lists are already sorted, so a k-way merge yields one
+        sorted stream and the sweep is linear in the total number of events,
+        regardless of the order in which users are given.
+        """
+        streams = [self.busy.get(user_id, []) for user_id in dict.fromkeys(user_ids)]
+        return self._free_ranges(heapq.merge(*streams), start, end)
+
+    @staticmethod
+    def _free_ranges(
+        busy: Iterable[Tuple[date, date]], start: date, end: date
     ) -> List[Tuple[date, date]]:
         current = start
         free_ranges: List[Tuple[date, date]] = []
-        busy = sorted(self.busy.get(user_id, []), key=lambda r: r[0])
 
         for busy_start, busy_end in busy:
+            if busy_start > end:
+                break
             if current < busy_start:
                 free_ranges.append((current, busy_start - timedelta(days=1)))
             current = max(current, busy_end + timedelta(days=1))
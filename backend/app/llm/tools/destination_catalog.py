@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _SortedIndex:
+    """Values sorted ascending with their destination names, for <= range lookups."""
+
+    def __init__(self, pairs: List[Tuple[float, str]]):
+        pairs.sort(key=lambda p: p[0])
+        self.values = [p[0] for p in pairs]
+        self.names = [p[1] for p in pairs]
+
+    def count_at_most(self, limit: float) -> int:
+        return bisect_right(self.values, limit)
+
+    def at_most(self, limit: float) -> List[str]:
+        return self.names[: self.count_at_most(limit)]
+
+
+class DestinationCatalog:
+    """
+    Read-only destination catalog with secondary indexes on flight duration,
+    hotel price per night and cheapest activity price. Range filters are
+    answered by bisecting the narrowest index instead of scanning every entry.
+    """
+
+    def __init__(self, entries: Dict[str, dict]):
+        self.entries = entries
+        self._position = {name: i for i, name in enumerate(entries)}
+        self._flight_hours: Dict[str, float] = {}
+        self._hotel_price: Dict[str, float] = {}
+        self._activity_price: Dict[str, float] = {}
+        for name, data in entries.items():
+            flight_hours = data.get("flight", {}).get("duration_hours")
+            hotel_price = data.get("hotel", {}).get("price_per_night")
+            activity_prices = [
+                a.get("price", a.get("cost_estimate")) for a in data.get("activities", [])
+            ]
+            activity_prices = [p for p in activity_prices if p is not None]
+            if flight_hours is not None:
+                self._flight_hours[name] = float(flight_hours)
+            if hotel_price is not None:
+                self._hotel_price[name] = float(hotel_price)
+            if activity_prices:
+                self._activity_price[name] = float(min(activity_prices))
+        self._indexes = {
+            "flight_hours": (self._flight_hours, _SortedIndex([(v, k) for k, v in self._flight_hours.items()])),
+            "hotel_price": (self._hotel_price, _SortedIndex([(v, k) for k, v in self._hotel_price.items()])),
+            "activity_price": (self._activity_price, _SortedIndex([(v, k) for k, v in self._activity_price.items()])),
+        }
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "DestinationCatalog":
+        with Path(path).open("r", encoding="utf-8") as f:
+            entries = json.load(f)
+        logger.info("Loaded %d destinations from %s", len(entries), path)
+        return cls(entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.entries
+
+    def get(self, name: str) -> Optional[dict]:
+        return self.entries.get(name)
+
+    def names(self) -> List[str]:
+        return list(self.entries)
+
+    def flight_hours(self, name: str) -> Optional[float]:
+        return self._flight_hours.get(name)
+
+    def query(
+        self,
+        max_flight_hours: Optional[float] = None,
+        max_hotel_price: Optional[float] = None,
+        max_activity_price: Optional[float] = None,
+    ) -> List[str]:
+        """
+        Destinations satisfying every given upper bound, in catalog order.
+        e.g. query(max_flight_hours=6, max_hotel_price=150).
+        """
+        limits = {
+            "flight_hours": max_flight_hours,
+            "hotel_price": max_hotel_price,
+            "activity_price": max_activity_price,
+        }
+        active = [(key, limit) for key, limit in limits.items() if limit is not None]
+        if not active:
+            return self.names()
+        # Bisecting for counts is cheap; only the narrowest index is sliced.
+        active.sort(key=lambda a: self._indexes[a[0]][1].count_at_most(a[1]))
+        narrowest, limit = active[0]
+        result = self._indexes[narrowest][1].at_most(limit)
+        for key, limit in active[1:]:
+            values = self._indexes[key][0]
+            result = [name for name in result if name in values and values[name] <= limit]
+        return sorted(result, key=self._position.__getitem__)
+
+
+_catalogs: Dict[str, DestinationCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(path: str | Path) -> DestinationCatalog:
+    """Load the catalog at path once per process and share it across requests."""
+    key = str(path)
+    catalog = _catalogs.get(key)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.get(key)
+            if catalog is None:
+                catalog = DestinationCatalog.from_file(path)
+                _catalogs[key] = catalog
+    return catalog
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import replace
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+from app.core.config import settings
+from app.llm.tools.hotel_cache import CachedHotelTool
+from app.llm.tools.hotel_makcorps import MakCorpsHotelTool
+from app.llm.tools.hotel_tool import Hotel, HotelTool
+from app.llm.tools.search_tool import SearchTool
+
+logger = logging.getLogger(__name__)
+
+# Two listings with the same normalized name within ~500 m are the same hotel.
+_SAME_PLACE_DEGREES = 0.005
+_NAME_NOISE = re.compile(r"[^a-z0-9]+")
+
+
+class CatalogHotelTool(HotelTool):
+    """HotelTool backed by the static destination catalog."""
+
+    def __init__(self, search_tool: SearchTool):
+        self.search_tool = search_tool
+
+    def search_hotels(self, city: str, limit: int = 5) -> List[Hotel]:
+        if not self.search_tool.has_destination(city):
+            return []
+        hotel = self.search_tool.lookup_destination(city).get("hotel", {})
+        if "price_per_night" not in hotel:
+            return []
+        name = hotel.get("name", f"{city} hotel")
+        return [
+            Hotel(
+                id=normalize_hotel_name(name),
+                name=name,
+                city=city,
+                price_per_night=float(hotel["price_per_night"]),
+            )
+        ][:limit]
+
+
+def normalize_hotel_name(name: str) -> str:
+    return _NAME_NOISE.sub(" ", name.lower()).strip()
+
+
+class HotelAggregator(HotelTool):
+    """
+    Queries several HotelTool providers concurrently and merges their results.
+    Providers that miss the shared deadline are ignored for this call (they keep
+    running in the background). Each provider has its own pool of
+    max_in_flight_per_provider threads; a call waits for a free thread within
+    the deadline, and calls still queued at the deadline are cancelled. A
+    provider is skipped only while every thread is stuck on a call that has
+    already run past the deadline, so a hung provider neither grows a queue
+    nor delays the others.
+    Listings are deduplicated by normalized name and coordinates; merged hotels
+    keep the lowest price and any known lat/lon/rating.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[HotelTool],
+        deadline_seconds: float = 2.0,
+        max_in_flight_per_provider: int = 40,
+    ):
+        self.providers = list(providers)
+        self.deadline_seconds = deadline_seconds
+        self.max_in_flight_per_provider = max(1, max_in_flight_per_provider)
+        self._executors = [
+            ThreadPoolExecutor(max_workers=self.max_in_flight_per_provider, thread_name_prefix=f"hotel-agg-{i}")
+            for i in range(len(self.providers))
+        ]
+        # worker thread -> when its current call started, per provider
+        self._running: List[Dict[int, float]] = [{} for _ in self.providers]
+        self._lock = threading.Lock()
+
+    def search_hotels(self, city: str, limit: int = 5) -> List[Hotel]:
+        started = time.monotonic()
+        futures = {}
+        for index, provider in enumerate(self.providers):
+            future = self._submit(index, provider, city, limit)
+            if future is not None:
+                futures[future] = provider
+        done, not_done = wait(futures, timeout=self.deadline_seconds)
+        if not_done:
+            logger.warning(
+                "%d hotel provider(s) missed the %.1fs deadline for %s",
+                len(not_done),
+                self.deadline_seconds,
+                city,
+            )
+            for future in not_done:
+                future.cancel()  # still queued behind busy threads: never start it
+        results: List[Hotel] = []
+        for future in futures:  # provider order keeps merges deterministic
+            if future not in done:
+                continue
+            try:
+                results.extend(future.result())
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Hotel provider %s failed: %s", type(futures[future]).__name__, exc)
+        merged = merge_hotels(results)
+        logger.debug("Merged %d hotels for %s in %.3fs", len(merged), city, time.monotonic() - started)
+        return merged[:limit]
+
+    def _submit(self, index: int, provider: HotelTool, city: str, limit: int) -> Optional[Future]:
+        if self._is_hung(index):
+            logger.warning("Skipping hotel provider %s: all its calls are past the deadline", type(provider).__name__)
+            return None
+        return self._executors[index].submit(self._call, index, provider, city, limit)
+
+    def _call(self, index: int, provider: HotelTool, city: str, limit: int) -> List[Hotel]:
+        ident = threading.get_ident()
+        with self._lock:
+            self._running[index][ident] = time.monotonic()
+        try:
+            return provider.search_hotels(city, limit)
+        finally:
+            with self._lock:
+                del self._running[index][ident]
+
+    def _is_hung(self, index: int) -> bool:
+        cutoff = time.monotonic() - self.deadline_seconds
+        with self._lock:
+            overdue = sum(1 for started in self._running[index].values() if started <= cutoff)
+        return overdue >= self.max_in_flight_per_provider
+
+
+def merge_hotels(hotels: Sequence[Hotel]) -> List[Hotel]:
+    """Deduplicate listings from several providers, cheapest first."""
+    buckets: Dict[str, List[Hotel]] = {}
+    for hotel in hotels:
+        bucket = buckets.setdefault(normalize_hotel_name(hotel.name), [])
+        for i, existing in enumerate(bucket):
+            if _same_place(existing, hotel):
+                bucket[i] = _merge_pair(existing, hotel)
+                break
+        else:
+            bucket.append(hotel)
+    merged = [hotel for bucket in buckets.values() for hotel in bucket]
+    return sorted(merged, key=lambda h: (h.price_per_night <= 0, h.price_per_night))
+
+
+def _same_place(a: Hotel, b: Hotel) -> bool:
+    if None in (a.lat, a.lon, b.lat, b.lon):
+        return True
+    return abs(a.lat - b.lat) <= _SAME_PLACE_DEGREES and abs(a.lon - b.lon) <= _SAME_PLACE_DEGREES
+
+
+def _merge_pair(a: Hotel, b: Hotel) -> Hotel:
+    prices = [p for p in (a.price_per_night, b.price_per_night) if p > 0]
+    return replace(
+        a,
+        price_per_night=min(prices) if prices else 0.0,
+        lat=a.lat if a.lat is not None else b.lat,
+        lon=a.lon if a.lon is not None else b.lon,
+        rating=a.rating if a.rating is not None else b.rating,
+    )
+
+
+@lru_cache()
+def get_hotel_aggregator() -> HotelAggregator:
+    """Process-wide aggregator: the catalog plus MakCorps (cached) when configured."""
+    providers: List[HotelTool] = [CatalogHotelTool(SearchTool())]
+    if settings.makcorps_jwt:
+        providers.append(
+            CachedHotelTool(
+                MakCorpsHotelTool(settings.makcorps_jwt, base_url=settings.makcorps_base_url),
+                ttl_seconds=settings.hotel_cache_ttl_seconds,
+                negative_ttl_seconds=settings.hotel_cache_negative_ttl_seconds,
+                max_entries=settings.hotel_cache_max_entries,
+                store_path=settings.hotel_cache_path,
+            )
+        )
+    return HotelAggregator(
+        providers,
+        deadline_seconds=settings.hotel_search_deadline_seconds,
+        # Every plan request searches up to planner_max_candidates destinations at once.
+        max_in_flight_per_provider=settings.planner_max_candidates * settings.hotel_search_concurrency,
+    )
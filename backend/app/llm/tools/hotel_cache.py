@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+from app.core.metrics import record_cache
+from app.llm.tools.hotel_tool import Hotel, HotelSearchError, HotelTool
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CacheEntry:
+    hotels: List[Hotel]
+    fetched_at: float
+    ok: bool
+
+
+class CachedHotelTool(HotelTool):
+    """
+    Caching decorator for any HotelTool.
+
+    - fresh entries (younger than the city's TTL) are served from memory;
+    - stale entries (within stale_seconds past the TTL) are served immediately
+      while a background refresh runs (stale-while-revalidate);
+    - provider failures are cached for negative_ttl_seconds, as the last good
+      hotels for the key if there were any, else as an empty result;
+    - at most max_entries keys are kept, least recently used evicted first;
+    - entries are mirrored to an optional SQLite file and reloaded on start.
+    """
+
+    def __init__(
+        self,
+        tool: HotelTool,
+        ttl_seconds: float = 3600.0,
+        stale_seconds: float = 86400.0,
+        negative_ttl_seconds: float = 60.0,
+        max_entries: int = 10000,
+        city_ttls: Optional[Dict[str, float]] = None,
+        store_path: Optional[str | Path] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.tool = tool
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self.city_ttls = {city.lower(): ttl for city, ttl in (city_ttls or {}).items()}
+        self.clock = clock
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._refreshing: Set[str] = set()
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hotel-cache")
+        self._db: Optional[sqlite3.Connection] = None
+        if store_path:
+            self._open_store(Path(store_path))
+
+    def search_hotels(self, city: str, limit: int = 5) -> List[Hotel]:
+        key = self._key(city, limit)
+        entry = self._get(key)
+        if entry is not None:
+            age = self.clock() - entry.fetched_at
+            if not entry.ok:
+                if age < self.negative_ttl_seconds:
+                    record_cache("hotel", hit=True)
+                    return entry.hotels
+            elif age < self._ttl(city):
+                record_cache("hotel", hit=True)
+                return entry.hotels
+            elif age < self._ttl(city) + self.stale_seconds:
+                record_cache("hotel", hit=True)
+                self._refresh_in_background(key, city, limit)
+                return entry.hotels
+        record_cache("hotel", hit=False)
+        return self._fetch(key, city, limit)
+
+    def close(self) -> None:
+        self._refresher.shutdown(wait=True)
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _fetch(self, key: str, city: str, limit: int) -> List[Hotel]:
+        try:
+            hotels = self.tool.search_hotels(city, limit=limit)
+            entry = _CacheEntry(hotels=hotels, fetched_at=self.clock(), ok=True)
+        except HotelSearchError as exc:
+            # A past-stale result beats none: keep serving it until the negative TTL ends.
+            previous = self._get(key)
+            hotels = previous.hotels if previous is not None else []
+            logger.warning("Hotel lookup for %s failed, caching %d old hotels: %s", city, len(hotels), exc)
+            entry = _CacheEntry(hotels=hotels, fetched_at=self.clock(), ok=False)
+        self._store(key, entry)
+        return entry.hotels
+
+    def _refresh_in_background(self, key: str, city: str, limit: int) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def _run() -> None:
+            try:
+                hotels = self.tool.search_hotels(city, limit=limit)
+                self._store(key, _CacheEntry(hotels=hotels, fetched_at=self.clock(), ok=True))
+            except HotelSearchError as exc:
+                # Keep serving the stale result rather than replacing it with a miss.
+                logger.warning("Background hotel refresh for %s failed: %s", city, exc)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresher.submit(_run)
+
+    def _ttl(self, city: str) -> float:
+        return self.city_ttls.get(city.lower(), self.ttl_seconds)
+
+    @staticmethod
+    def _key(city: str, limit: int) -> str:
+        return f"{city.lower()}|{limit}"
+
+    def _get(self, key: str) -> Optional[_CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key: str, entry: _CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO hotel_cache (key, fetched_at, ok, payload) VALUES (?, ?, ?, ?)",
+                    (key, entry.fetched_at, int(entry.ok), json.dumps([asdict(h) for h in entry.hotels])),
+                )
+                self._db.executemany("DELETE FROM hotel_cache WHERE key = ?", [(k,) for k in evicted])
+                self._db.commit()
+
+    def _open_store(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS hotel_cache "
+            "(key TEXT PRIMARY KEY, fetched_at REAL NOT NULL, ok INTEGER NOT NULL, payload TEXT NOT NULL)"
+        )
+        # Oldest first, so the newest max_entries survive as the most recently used.
+        for key, fetched_at, ok, payload in self._db.execute(
+            "SELECT key, fetched_at, ok, payload FROM hotel_cache ORDER BY fetched_at DESC LIMIT ?",
+            (self.max_entries,),
+        ).fetchall()[::-1]:
+            hotels = [Hotel(**h) for h in json.loads(payload)]
+            self._entries[key] = _CacheEntry(hotels=hotels, fetched_at=fetched_at, ok=bool(ok))
+        logger.info("Loaded %d cached hotel lookups from %s", len(self._entries), path)
@@ -3,7 +3,7 @@ from typing import List
 
 import requests
 
-from app.llm.tools.hotel_tool import Hotel, HotelTool
+from app.llm.tools.hotel_tool import Hotel, HotelSearchError, HotelTool
 
 logger = logging.getLogger(__name__)
 
@@ -12,23 +12,28 @@ class MakCorpsHotelTool(HotelTool):
     """
     HotelTool implementation using MakCorps Free API.
     Requires JWT token from MakCorps (set via env/config).
+    Uses one pooled HTTP session; failures raise HotelSearchError so callers
+    (e.g. CachedHotelTool) can tell an outage from an empty result.
     """
 
-    def __init__(self, jwt_token: str):
+    def __init__(self, jwt_token: str, base_url: str = "https://api.makcorps.com", timeout: float = 8):
         self.jwt_token = jwt_token
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"JWT {self.jwt_token}"
 
     def search_hotels(self, city: str, limit: int = 5) -> List[Hotel]:
-        url = f"https://api.makcorps.com/free/{city}"
-        headers = {"Authorization": f"JWT {self.jwt_token}"}
+        url = f"{self.base_url}/free/{city}"
 
         try:
-            resp = requests.get(url, headers=headers, timeout=8)
+            resp = self.session.get(url, timeout=self.timeout)
             resp.raise_for_status()
+            data = resp.json() if resp.content else {}
         except Exception as exc:  # noqa: BLE001
             logger.warning("MakCorps API request failed: %s", exc)
-            return []
+            raise HotelSearchError(str(exc)) from exc
 
-        data = resp.json() if resp.content else {}
         raw_hotels = data.get("hotels", [])
 
         hotels: List[Hotel] = []
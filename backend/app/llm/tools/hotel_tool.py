@@ -13,6 +13,10 @@ class Hotel:
     rating: Optional[float] = None
 
 
+class HotelSearchError(Exception):
+    """Raised by providers when a hotel lookup fails (network, HTTP or payload)."""
+
+
 class HotelTool(Protocol):
     """Hotel search abstraction to allow swapping providers."""
 
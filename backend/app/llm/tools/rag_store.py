@@ -1,12 +1,15 @@
 import hashlib
+import json
 import logging
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional, Sequence, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 
+from app.core.metrics import span
+
 try:
     import faiss  # type: ignore
 except ImportError:  # pragma: no cover - optional dependency
@@ -14,11 +17,15 @@ except ImportError:  # pragma: no cover - optional dependency
 
 logger = logging.getLogger(__name__)
 
+# Prebuilt index artifact RAGTool looks for in its store_path.
+INDEX_FILENAME = "rag_index.npz"
+
 
 @dataclass
 class RAGDocument:
     doc_id: str
     text: str
+    metadata: Dict[str, str] = field(default_factory=dict)
 
 
 def _simple_embed(text: str, dim: int = 128) -> np.ndarray:
@@ -34,11 +41,45 @@ def _simple_embed(text: str, dim: int = 128) -> np.ndarray:
     return vec / norm
 
 
+def embed_texts(texts: Sequence[str], dim: int = 128) -> np.ndarray:
+    """_simple_embed for a batch of texts, as one (len(texts), dim) float32 array."""
+    if not texts:
+        return np.zeros((0, dim), dtype="float32")
+    repeats = dim // 32 + 1  # sha256 digests are 32 bytes
+    digests = b"".join(hashlib.sha256(text.encode("utf-8")).digest() * repeats for text in texts)
+    vals = np.frombuffer(digests, dtype=np.uint8).reshape(len(texts), 32 * repeats)[:, :dim]
+    vecs = vals.astype("float32")
+    norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vecs / norms
+
+
+def write_index(path: str | Path, docs: Sequence[RAGDocument], vectors: np.ndarray) -> None:
+    """
+    Write a prebuilt index artifact that RAGTool.load_index opens without
+    re-embedding: the float32 vectors plus the documents (id, text, metadata)
+    as UTF-8 JSON, in one .npz file.
+    """
+    if len(docs) != len(vectors):
+        raise ValueError(f"{len(docs)} documents but {len(vectors)} vectors")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = json.dumps(
+        [{"id": d.doc_id, "text": d.text, "metadata": d.metadata} for d in docs], ensure_ascii=False
+    ).encode("utf-8")
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        np.savez(f, vectors=np.asarray(vectors, dtype="float32"), documents=np.frombuffer(payload, dtype=np.uint8))
+    os.replace(tmp, path)
+
+
 class RAGTool:
     def __init__(self, store_path: str | Path, dim: int = 128):
         self.store_path = Path(store_path)
         self.dim = dim
         self.documents: List[RAGDocument] = []
+        # metadata destination (lowercased) -> positions in documents; "" for untagged docs
+        self._by_destination: Dict[str, List[int]] = {}
         self.index = None
         self.use_faiss = faiss is not None
         self.gpu_enabled = False
@@ -58,10 +99,31 @@ class RAGTool:
             self.add_documents(docs)
             logger.info("RAG indexed %d documents from %s", len(docs), self.store_path)
 
+    def load_index(self, path: str | Path | None = None) -> None:
+        """Add the documents and vectors of a prebuilt artifact (see write_index)."""
+        path = Path(path) if path else self.store_path / INDEX_FILENAME
+        with np.load(path, allow_pickle=False) as data:
+            vectors = data["vectors"].astype("float32", copy=False)
+            entries = json.loads(data["documents"].tobytes().decode("utf-8"))
+        if vectors.shape[1] != self.dim:
+            if self.documents:
+                raise ValueError(f"Index {path} has dim {vectors.shape[1]}, store has {self.dim}")
+            self.dim = vectors.shape[1]
+        docs = [RAGDocument(doc_id=e["id"], text=e["text"], metadata=e.get("metadata", {})) for e in entries]
+        self._add_vectors(docs, vectors)
+        logger.info("RAG loaded %d prebuilt documents from %s", len(docs), path)
+
     def add_documents(self, docs: Sequence[RAGDocument]) -> None:
         if not docs:
             return
-        embeddings = np.vstack([_simple_embed(doc.text, self.dim) for doc in docs])
+        self._add_vectors(docs, embed_texts([doc.text for doc in docs], self.dim))
+
+    def _add_vectors(self, docs: Sequence[RAGDocument], embeddings: np.ndarray) -> None:
+        if not docs:
+            return
+        for position, doc in enumerate(docs, start=len(self.documents)):
+            key = doc.metadata.get("destination", "").lower()
+            self._by_destination.setdefault(key, []).append(position)
         self.documents.extend(docs)
         if self.use_faiss:
             if self.index is None:
@@ -83,20 +145,47 @@ class RAGTool:
             # Fallback: store embeddings for manual similarity
             self.index = embeddings if self.index is None else np.vstack([self.index, embeddings])
 
-    def search(self, query: str, top_k: int = 3) -> List[Tuple[str, float]]:
+    def search(self, query: str, top_k: int = 3, destination: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        The top_k documents most similar to query. With destination, documents
+        tagged with another destination in their metadata are left out;
+        untagged documents (plain .txt files) always qualify.
+        """
         if self.index is None or not self.documents:
             return []
+        with span("rag_search"):
+            return self._search(query, top_k, destination)
+
+    def _search(self, query: str, top_k: int, destination: Optional[str]) -> List[Tuple[str, float]]:
         q_vec = _simple_embed(query, self.dim).reshape(1, -1)
+        allowed = None
+        if destination is not None:
+            allowed = self._by_destination.get("", []) + self._by_destination.get(destination.lower(), [])
+            if len(allowed) == len(self.documents):
+                allowed = None
         if self.use_faiss:
-            scores, indices = self.index.search(q_vec, top_k)
-            hits = []
-            for score, idx in zip(scores[0], indices[0]):
-                if idx == -1:
-                    continue
-                hits.append((self.documents[idx].text, float(score)))
-            return hits
+            return self._search_faiss(q_vec, top_k, None if allowed is None else set(allowed))
         # Fallback cosine on numpy
-        doc_vecs = self.index
+        if allowed is None:
+            positions, doc_vecs = np.arange(len(self.documents)), self.index
+        else:
+            positions = np.asarray(allowed, dtype=np.int64)
+            doc_vecs = self.index[positions]
         scores = (doc_vecs @ q_vec.T).flatten()
         top_idx = np.argsort(scores)[::-1][:top_k]
-        return [(self.documents[i].text, float(scores[i])) for i in top_idx]
+        return [(self.documents[positions[i]].text, float(scores[i])) for i in top_idx]
+
+    def _search_faiss(self, q_vec: np.ndarray, top_k: int, allowed: Optional[set]) -> List[Tuple[str, float]]:
+        # A flat index cannot be restricted up front: fetch more until top_k allowed hits remain.
+        total = len(self.documents)
+        k = top_k
+        while True:
+            scores, indices = self.index.search(q_vec, min(k, total))
+            hits = [
+                (self.documents[idx].text, float(score))
+                for score, idx in zip(scores[0], indices[0])
+                if idx != -1 and (allowed is None or idx in allowed)
+            ]
+            if len(hits) >= top_k or k >= total:
+                return hits[:top_k]
+            k *= 4
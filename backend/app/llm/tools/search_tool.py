@@ -1,54 +1,35 @@
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.llm.tools.destination_catalog import DestinationCatalog, get_catalog
 
 
 class SearchTool:
-    def __init__(self) -> None:
-        self.catalog: Dict[str, dict] = {
-            "Lisbon": {
-                "flight": {"provider": "mock-air", "price": 450.0, "duration_hours": 4},
-                "hotel": {"name": "Lisbon Central", "price_per_night": 160.0},
-                "activities": [
-                    {
-                        "title": "Alfama walking tour",
-                        "description": "Explore historic Lisbon on foot.",
-                        "price": 60.0,
-                        "booking_required": True,
-                    },
-                    {
-                        "title": "LX Factory evening",
-                        "description": "Food and art markets by the river.",
-                        "price": 40.0,
-                        "booking_required": False,
-                    },
-                ],
-            },
-            "Bali": {
-                "flight": {"provider": "mock-air", "price": 900.0, "duration_hours": 16},
-                "hotel": {"name": "Ubud Retreat", "price_per_night": 120.0},
-                "activities": [
-                    {
-                        "title": "Rice terrace sunrise",
-                        "description": "Guided sunrise hike to Tegallalang.",
-                        "price": 80.0,
-                        "booking_required": True,
-                    },
-                    {
-                        "title": "Cooking class",
-                        "description": "Learn Balinese cuisine with locals.",
-                        "price": 55.0,
-                        "booking_required": True,
-                    },
-                ],
-            },
-        }
+    """
+    Destination search over the shared file-backed catalog (settings.catalog_path).
+    The catalog is loaded lazily on first use and indexed for range queries.
+    """
+
+    def __init__(self, catalog: Optional[DestinationCatalog] = None) -> None:
+        self._catalog = catalog
+
+    @property
+    def index(self) -> DestinationCatalog:
+        if self._catalog is None:
+            self._catalog = get_catalog(settings.catalog_path)
+        return self._catalog
+
+    @property
+    def catalog(self) -> Dict[str, dict]:
+        return self.index.entries
 
     def has_destination(self, destination: str) -> bool:
-        return destination in self.catalog
+        return destination in self.index
 
     def default_destination(self) -> str:
-        return list(self.catalog.keys())[0]
+        return next(iter(self.catalog))
 
     def lookup_destination(self, destination: str) -> dict:
         if destination not in self.catalog:
@@ -56,4 +37,19 @@ class SearchTool:
         return self.catalog[destination]
 
     def destinations(self) -> List[str]:
-        return list(self.catalog.keys())
+        return self.index.names()
+
+    def flight_hours(self, destination: str) -> Optional[float]:
+        return self.index.flight_hours(destination)
+
+    def find_destinations(
+        self,
+        max_flight_hours: Optional[float] = None,
+        max_hotel_price: Optional[float] = None,
+        max_activity_price: Optional[float] = None,
+    ) -> List[str]:
+        return self.index.query(
+            max_flight_hours=max_flight_hours,
+            max_hotel_price=max_hotel_price,
+            max_activity_price=max_activity_price,
+        )
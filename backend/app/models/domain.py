@@ -1,3 +1,4 @@
+import sys
 from dataclasses import dataclass, field
 from datetime import date, datetime
 from enum import Enum
@@ -8,6 +9,7 @@ class BookingStatus(str, Enum):
     pending = "pending"
     confirmed = "confirmed"
     failed = "failed"
+    cancelled = "cancelled"
 
 
 class BookingType(str, Enum):
@@ -21,9 +23,18 @@ class PaymentStatus(str, Enum):
     authorized = "authorized"
     captured = "captured"
     failed = "failed"
+    voided = "voided"
 
 
-@dataclass
+def _intern(value):
+    # Enum-like strings repeat across every stored plan/booking; share one copy.
+    return sys.intern(value) if type(value) is str else value
+
+
+# Domain objects are slotted (no per-instance __dict__) because the plan store
+# can hold millions of them. Activity is a frozen value object; plans, days and
+# bookings stay mutable because the planning service repairs them in place.
+@dataclass(slots=True, frozen=True)
 class Activity:
     time_of_day: str
     title: str
@@ -31,20 +42,23 @@ class Activity:
     cost_estimate: float
     booking_required: bool
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "time_of_day", _intern(self.time_of_day))
+
 
-@dataclass
+@dataclass(slots=True)
 class DayPlan:
     date: date
     activities: List[Activity] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class BudgetSummary:
     total_estimated: float
     breakdown: Dict[str, float]
 
 
-@dataclass
+@dataclass(slots=True)
 class TripPlan:
     trip_id: str
     user_id: str
@@ -54,8 +68,12 @@ class TripPlan:
     days: List[DayPlan]
     budget_summary: BudgetSummary
 
+    def __post_init__(self) -> None:
+        self.user_id = _intern(self.user_id)
+        self.destination = _intern(self.destination)
 
-@dataclass
+
+@dataclass(slots=True)
 class BookingRecord:
     booking_id: str
     user_id: str
@@ -67,3 +85,7 @@ class BookingRecord:
     created_at: datetime
     payment_status: PaymentStatus
     reference: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        self.user_id = _intern(self.user_id)
+        self.provider = _intern(self.provider)
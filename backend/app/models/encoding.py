@@ -0,0 +1,99 @@
+"""
+Direct domain-model -> JSON bytes encoding for hot response paths.
+
+Builds plain dicts straight from the dataclasses (no intermediate pydantic
+models) and renders them with the same json.dumps settings as FastAPI's
+JSONResponse, so the bytes match the response_model path exactly. Floats are
+coerced with float() the way the pydantic schemas coerce them.
+orjson is deliberately not used: it formats exponents differently (1e16 vs 1e+16).
+"""
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.models.domain import BookingRecord, TripPlan
+
+
+def plan_to_jsonable(plan: TripPlan) -> Dict[str, Any]:
+    """TripPlanSchema-shaped dict of a TripPlan (dates as ISO strings)."""
+    return {
+        "trip_id": plan.trip_id,
+        "user_id": plan.user_id,
+        "destination": plan.destination,
+        "start_date": plan.start_date.isoformat(),
+        "end_date": plan.end_date.isoformat(),
+        "days": [
+            {
+                "date": day.date.isoformat(),
+                "activities": [
+                    {
+                        "time_of_day": a.time_of_day,
+                        "title": a.title,
+                        "description": a.description,
+                        "cost_estimate": float(a.cost_estimate),
+                        "booking_required": bool(a.booking_required),
+                    }
+                    for a in day.activities
+                ],
+            }
+            for day in plan.days
+        ],
+        "budget_summary": {
+            "total_estimated": float(plan.budget_summary.total_estimated),
+            "breakdown": {k: float(v) for k, v in plan.budget_summary.breakdown.items()},
+        },
+    }
+
+
+def booking_to_jsonable(booking: BookingRecord) -> Dict[str, Any]:
+    """BookingRecordSchema-shaped dict of a BookingRecord."""
+    return {
+        "booking_id": booking.booking_id,
+        "user_id": booking.user_id,
+        "trip_id": booking.trip_id,
+        "type": booking.type.value,
+        "status": booking.status.value,
+        "provider": booking.provider,
+        "price": float(booking.price),
+        "created_at": booking.created_at.isoformat(),
+        "payment_status": booking.payment_status.value,
+        "reference": booking.reference,
+    }
+
+
+def dumps(content: Any) -> bytes:
+    """Render like starlette's JSONResponse.render."""
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def encode_plan(plan: TripPlan) -> bytes:
+    return dumps(plan_to_jsonable(plan))
+
+
+def body_etag(body: bytes) -> str:
+    """Strong ETag derived from the response bytes, stable across processes and backends."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def encode_plan_with_etag(plan: TripPlan) -> Tuple[bytes, str]:
+    body = encode_plan(plan)
+    return body, body_etag(body)
+
+
+def encode_plan_response(plan: TripPlan, alternatives: Iterable[TripPlan] = ()) -> bytes:
+    return dumps(
+        {
+            "plan": plan_to_jsonable(plan),
+            "alternatives": [plan_to_jsonable(p) for p in alternatives],
+        }
+    )
+
+
+def encode_plan_page(plans: List[TripPlan], next_cursor: Optional[str]) -> bytes:
+    return dumps({"items": [plan_to_jsonable(p) for p in plans], "next_cursor": next_cursor})
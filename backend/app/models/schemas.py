@@ -24,6 +24,7 @@ class Preferences(BaseModel):
     budget_max: float = 2000.0
     travel_style: str = "relaxing"
     max_flight_hours: Optional[int] = None
+    participants: List[str] = Field(default_factory=list)
     notes: Optional[str] = None
 
 
@@ -89,6 +90,12 @@ class TripPlanSchema(BaseModel):
 
 class PlanResponse(BaseModel):
     plan: TripPlanSchema
+    alternatives: List[TripPlanSchema] = Field(default_factory=list)
+
+
+class PlanPage(BaseModel):
+    items: List[TripPlanSchema]
+    next_cursor: Optional[str] = None
 
 
 class BookingRecordSchema(BaseModel):
@@ -121,3 +128,4 @@ class BookingRecordSchema(BaseModel):
 
 class BookingResponse(BaseModel):
     bookings: List[BookingRecordSchema]
+    replayed: bool = False
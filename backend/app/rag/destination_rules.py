@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:  # optional dependency: C Aho-Corasick automaton
+    import ahocorasick  # type: ignore
+except ImportError:  # pragma: no cover - fallback to _TermRegex
+    ahocorasick = None
+
+# Hit kinds, one bit each in a rule's per-document mask.
+_ANCHOR = 1
+_NEGATIVE = 2
+_POSITIVE = 4
+_POSITIVE_TITLE = 8
+_KEYWORD = 16
+_KEYWORD_TITLE = 32
+
+# Below this many rules, per-rule substring tests beat a single-pass scan.
+_AUTOMATON_MIN_RULES = 25
+
+
+@dataclass(frozen=True)
+class DestinationRule:
+    """
+    A destination matches a doc when its anchor occurs and no negative does.
+    Confidence: positive in the title 3, positive in the text 2, keyword in
+    the title 2, keyword in the text 1.
+    """
+
+    name: str
+    anchor: str
+    positive: Tuple[str, ...] = ()
+    negative: Tuple[str, ...] = ()
+    keywords: Tuple[str, ...] = ()
+
+
+class DestinationMatcher:
+    """
+    Matches documents against a destination rule table. Large tables are
+    compiled into one Aho-Corasick automaton (pyahocorasick), or into one
+    trie-shaped regex when pyahocorasick is missing; either scans a document
+    once, whatever the number of rules (the regex about 3x slower). Small
+    tables use per-rule substring tests gated on the anchor: below ~25 rules
+    those are cheaper than any single pass over the text. All paths report
+    the same hits.
+    """
+
+    def __init__(self, rules: Sequence[DestinationRule], automaton_min_rules: int = _AUTOMATON_MIN_RULES):
+        self.rules = [
+            DestinationRule(
+                name=rule.name,
+                anchor=rule.anchor.lower(),
+                positive=tuple(t.lower() for t in rule.positive if t),
+                negative=tuple(t.lower() for t in rule.negative if t),
+                keywords=tuple(t.lower() for t in rule.keywords if t),
+            )
+            for rule in rules
+        ]
+        self._automaton = None
+        if self.rules and len(self.rules) >= automaton_min_rules:
+            roles: Dict[str, List[Tuple[int, int]]] = {}
+            for index, rule in enumerate(self.rules):
+                for kind, terms in (
+                    (_ANCHOR, (rule.anchor,)),
+                    (_NEGATIVE, rule.negative),
+                    (_POSITIVE, rule.positive),
+                    (_KEYWORD, rule.keywords),
+                ):
+                    for term in terms:
+                        roles.setdefault(term, []).append((index, kind))
+            values = {term: (len(term), tuple(term_roles)) for term, term_roles in roles.items()}
+            if ahocorasick is not None:
+                self._automaton = ahocorasick.Automaton()
+                for term, value in values.items():
+                    self._automaton.add_word(term, value)
+                self._automaton.make_automaton()
+            else:
+                self._automaton = _TermRegex(values)
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "DestinationMatcher":
+        with Path(path).open("r", encoding="utf-8") as f:
+            entries = json.load(f)
+        return cls(
+            [
+                DestinationRule(
+                    name=entry["name"],
+                    anchor=entry["anchor"],
+                    positive=tuple(entry.get("positive", ())),
+                    negative=tuple(entry.get("negative", ())),
+                    keywords=tuple(entry.get("keywords", ())),
+                )
+                for entry in entries
+            ]
+        )
+
+    @property
+    def names(self) -> List[str]:
+        return [rule.name for rule in self.rules]
+
+    def detect(self, title: str, text: str) -> Optional[str]:
+        """Best-scoring destination for a doc; ties go to the earlier rule."""
+        title_lower = title.lower()
+        haystack = f"{title_lower}\n{text.lower()}"
+        if self._automaton is not None:
+            scores = self._automaton_scores(title_lower, haystack)
+        else:
+            scores = self._scan_scores(title_lower, haystack)
+        best: Optional[str] = None
+        best_score = 0
+        for index, score in scores:
+            if score > best_score:
+                best, best_score = self.rules[index].name, score
+        return best
+
+    def _automaton_scores(self, title_lower: str, haystack: str) -> Iterator[Tuple[int, int]]:
+        masks: Dict[int, int] = {}
+        title_end = len(title_lower)
+        # iter() reports every occurrence of every term, overlapping ones included.
+        for end, (length, roles) in self._automaton.iter(haystack):
+            in_title = end - length + 1 < title_end
+            for index, kind in roles:
+                if in_title and kind in (_POSITIVE, _KEYWORD):
+                    kind |= kind << 1  # the _TITLE variant of the kind
+                masks[index] = masks.get(index, 0) | kind
+        for index, mask in sorted(masks.items()):
+            if mask & _ANCHOR and not mask & _NEGATIVE:
+                yield index, _score(mask)
+
+    def _scan_scores(self, title_lower: str, haystack: str) -> Iterator[Tuple[int, int]]:
+        for index, rule in enumerate(self.rules):
+            if rule.anchor not in haystack or any(t in haystack for t in rule.negative):
+                continue
+            if any(t in title_lower for t in rule.positive):
+                yield index, 3
+            elif any(t in haystack for t in rule.positive) or any(t in title_lower for t in rule.keywords):
+                yield index, 2
+            elif any(t in haystack for t in rule.keywords):
+                yield index, 1
+
+
+class _TermRegex:
+    """
+    Pure-Python stand-in for the automaton, with the same iter() contract: one
+    regex whose alternation is factored into a trie, so each text position
+    costs a branch per character rather than a test per term. The lookahead
+    lets matches overlap; it finds the longest term starting at each position,
+    and the terms that are prefixes of it come from a precomputed table.
+    """
+
+    def __init__(self, values: Dict[str, Tuple[int, tuple]]):
+        self._regex = re.compile(f"(?=({_trie_pattern(values)}))")
+        self._hits = {
+            term: [values[term[:k]] for k in range(1, len(term) + 1) if term[:k] in values] for term in values
+        }
+
+    def iter(self, haystack: str) -> Iterator[Tuple[int, Tuple[int, tuple]]]:
+        for match in self._regex.finditer(haystack):
+            start = match.start()
+            for value in self._hits[match.group(1)]:
+                yield start + value[0] - 1, value
+
+
+def _trie_pattern(terms) -> str:
+    root: dict = {}
+    for term in terms:
+        node = root
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}  # end of a term
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        # A term may end here: the rest is optional, and greedy, so longer terms win.
+        return f"(?:{body})?" if "" in node else body
+
+    return build(root)
+
+
+def _score(mask: int) -> int:
+    if mask & _POSITIVE_TITLE:
+        return 3
+    if mask & (_POSITIVE | _KEYWORD_TITLE):
+        return 2
+    if mask & _KEYWORD:
+        return 1
+    return 0
+
+
+@lru_cache()
+def get_destination_matcher(path: str) -> DestinationMatcher:
+    """Compile the rule table at path once per process."""
+    return DestinationMatcher.from_file(path)
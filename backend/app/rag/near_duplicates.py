@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+_SHIFT = np.uint64(32)
+_NON_WORD = re.compile(r"[^\w]+")
+_REPORT_CHARS = 120
+
+
+@dataclass
+class DedupReport:
+    """What a NearDuplicateFilter saw and dropped."""
+
+    threshold: float
+    num_perm: int
+    bands: int
+    rows: int
+    checked: int = 0
+    dropped: int = 0
+    dropped_by_group: Dict[str, int] = field(default_factory=dict)
+    examples: List[Dict[str, str]] = field(default_factory=list)  # first few dropped/kept pairs
+
+
+class NearDuplicateFilter:
+    """
+    Streaming near-duplicate filter: MinHash signatures over character
+    shingles, bucketed with LSH banding. A text is a duplicate when it shares a
+    band with a kept text whose estimated Jaccard similarity is at least
+    threshold. Only the last max_entries kept texts are remembered (oldest
+    are forgotten first), so memory stays bounded on any input size.
+    Signatures are seeded, so results are identical across runs and processes.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        shingle_size: int = 5,
+        max_entries: int = 200_000,
+        max_examples: int = 20,
+        seed: int = 1,
+    ):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        self.max_examples = max_examples
+        self.bands, self.rows = _lsh_params(threshold, num_perm)
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)  # odd multipliers
+        self._b = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64)
+        self._weights = np.array([257**i % (1 << 64) for i in range(shingle_size)], dtype=np.uint64)
+        # band key -> ids of the kept entries in that bucket, oldest first
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        # entry id -> (signature bytes, start of the text for the report)
+        self._kept: "OrderedDict[int, Tuple[bytes, str]]" = OrderedDict()
+        self._next_id = 0
+        self.report = DedupReport(threshold=threshold, num_perm=num_perm, bands=self.bands, rows=self.rows)
+
+    def is_duplicate(self, text: str, group: str = "") -> bool:
+        """Check text against everything kept so far; keep it if it is new."""
+        self.report.checked += 1
+        signature = self.signature(text)
+        raw = signature.tobytes()
+        keys = self._band_keys(raw)
+        seen = set()
+        for band, key in enumerate(keys):
+            for other in self._buckets[band].get(key, ()):
+                if other in seen:
+                    continue
+                seen.add(other)
+                other_raw, other_text = self._kept[other]
+                similarity = np.count_nonzero(signature == np.frombuffer(other_raw, dtype=np.uint32)) / self.num_perm
+                if similarity >= self.threshold:
+                    self._record_drop(text, other_text, group)
+                    return True
+        self._keep(raw, text, keys)
+        return False
+
+    def signature(self, text: str) -> np.ndarray:
+        data = np.frombuffer(_normalize(text).encode("utf-8"), dtype=np.uint8)
+        if len(data) < self.shingle_size:
+            data = np.pad(data, (0, self.shingle_size - len(data)))
+        shingles = sliding_window_view(data, self.shingle_size).astype(np.uint64) @ self._weights
+        # Multiply-shift hashing: one permutation per (a, b) pair, top 32 bits kept.
+        hashed = (np.outer(shingles, self._a) + self._b) >> _SHIFT
+        return hashed.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, raw: bytes) -> List[bytes]:
+        width = self.rows * 4  # uint32 signature values
+        return [raw[i * width : (i + 1) * width] for i in range(self.bands)]
+
+    def _keep(self, raw: bytes, text: str, keys: List[bytes]) -> None:
+        entry_id = self._next_id
+        self._next_id += 1
+        for band, key in enumerate(keys):
+            self._buckets[band].setdefault(key, []).append(entry_id)
+        self._kept[entry_id] = (raw, text[:_REPORT_CHARS])
+        while len(self._kept) > self.max_entries:
+            old_id, (old_raw, _) = self._kept.popitem(last=False)
+            for band, key in enumerate(self._band_keys(old_raw)):
+                ids = self._buckets[band][key]
+                ids.remove(old_id)  # the oldest id, so this is ids[0]
+                if not ids:
+                    del self._buckets[band][key]
+
+    def _record_drop(self, text: str, kept_text: str, group: str) -> None:
+        report = self.report
+        report.dropped += 1
+        report.dropped_by_group[group] = report.dropped_by_group.get(group, 0) + 1
+        if len(report.examples) < self.max_examples:
+            report.examples.append({"dropped": text[:_REPORT_CHARS], "kept": kept_text})
+
+
+def _normalize(text: str) -> str:
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def _lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Bands x rows = num_perm whose S-curve midpoint (1/b)^(1/r) is closest to threshold."""
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(options, key=lambda br: abs((1.0 / br[0]) ** (1.0 / br[1]) - threshold))
@@ -1,11 +1,39 @@
+import bz2
+import gzip
+import hashlib
+import io
+import json
 import logging
+import multiprocessing
+import os
 import re
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from itertools import chain
 from pathlib import Path
-from typing import Dict, Iterator, List, Optional
+from typing import IO, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.llm.tools.rag_store import RAGDocument, embed_texts, write_index
+from app.rag.destination_rules import DestinationMatcher, get_destination_matcher
+from app.rag.near_duplicates import DedupReport, NearDuplicateFilter
+
+try:  # optional dependency for .zst shards
+    import zstandard  # type: ignore
+except ImportError:  # pragma: no cover - .zst input unavailable
+    zstandard = None
 
 logger = logging.getLogger(__name__)
 
+# detect_destination looks at this many leading characters of a doc body.
+_DETECTION_CHARS = 1500
+_SNIPPET_MIN_CHARS = 40
+# Hard cap on the body kept per doc, even when no snippet paragraph was found.
+_MAX_DOC_CHARS = 8192
+_DOC_ATTR = re.compile(r'(\w+)="([^"]*)"')
+
 
 @dataclass
 class WikiDoc:
@@ -15,174 +43,145 @@ class WikiDoc:
     text: str
 
 
-DESTINATION_KEYWORDS: Dict[str, List[str]] = {
-    "Bali": ["bali", "ubud", "kuta", "denpasar", "nusa penida", "seminyak"],
-    "Lisbon": ["lisbon", "alfama", "belém", "belem", "sintra"],
-    "Tokyo": ["tokyo", "shinjuku", "shibuya", "asakusa", "ueno"],
-}
-
-BALI_POSITIVE = [
-    "bali, indonesia",
-    "island of bali",
-    "on the island of bali",
-    "karangasem",
-    "karangasem regency",
-    "denpasar",
-    "ubud",
-    "kuta",
-    "seminyak",
-    "nusa penida",
-    "east bali",
-    "north bali",
-    "south bali",
-]
-
-BALI_NEGATIVE = [
-    "crete",
-    "greece",
-    "new taipei",
-    "taiwan",
-    "bulacan",
-    "philippines",
-    "astrakhan",
-    "russia",
-]
-
-LISBON_POSITIVE = [
-    "lisbon, portugal",
-    "capital of portugal",
-    "portuguese capital",
-    "tagus river",
-    "bairro alto",
-    "baixa",
-    "alfama",
-    "belém",
-    "belem",
-    "praça do comércio",
-]
-
-LISBON_NEGATIVE = [
-    "maine",
-    "new hampshire",
-    "iowa",
-    "ohio",
-    "north dakota",
-    "united states",
-    "usa",
-    "u.s.",
-]
-
-TOKYO_POSITIVE = [
-    "tokyo, japan",
-    "capital of japan",
-    "japanese capital",
-    "kantō region",
-    "kanto region",
-    "shinjuku",
-    "shibuya",
-    "asakusa",
-    "ueno",
-    "akihabara",
-]
-
-TOKYO_NEGATIVE = [
-    "little tokyo",
-    "los angeles",
-    "california",
-    "usa",
-    "united states",
-]
+@dataclass
+class ShardResult:
+    """Candidates extracted from one wiki shard, bucketed by destination."""
+
+    path: str
+    buckets: Dict[str, List[str]] = field(default_factory=dict)
+    # Per destination, the (doc id, url) each bucket line came from.
+    sources: Dict[str, List[Tuple[str, str]]] = field(default_factory=dict)
+    total_docs: int = 0
+    matched_docs: int = 0
+    reused: bool = False  # loaded from the build manifest instead of re-scanned
+
+
+def wiki_shards(base_path: Path) -> List[Path]:
+    """
+    wiki_00..wiki_99 shard files under base_path, in name order. .zst shards
+    are skipped with a warning when the optional zstandard package is missing.
+    """
+    shards = sorted(path for path in base_path.glob("wiki_*") if path.is_file())
+    if zstandard is None:
+        skipped = [path for path in shards if path.suffix == ".zst"]
+        if skipped:
+            logger.warning(
+                "Skipping %d .zst shard(s) under %s: install zstandard to read them", len(skipped), base_path
+            )
+            shards = [path for path in shards if path.suffix != ".zst"]
+    return shards
 
 
 def iter_wiki_docs(base_path: Path) -> Iterator[WikiDoc]:
     """
     Scan wiki_00..wiki_99 files under base_path and yield WikiDoc objects for each <doc>.
     """
-    for path in sorted(base_path.glob("wiki_*")):
-        with path.open("r", encoding="utf-8", errors="ignore") as f:
-            in_doc = False
-            doc_id = url = title = ""
-            lines: List[str] = []
-            for line in f:
-                if line.startswith("<doc "):
-                    in_doc = True
-                    doc_id = _attr(line, "id")
-                    url = _attr(line, "url")
-                    title = _attr(line, "title")
-                    lines = []
-                    continue
-                if line.startswith("</doc>") and in_doc:
-                    text = "".join(lines).strip()
-                    yield WikiDoc(id=doc_id, title=title, url=url, text=text)
-                    in_doc = False
-                    doc_id = url = title = ""
-                    lines = []
-                    continue
-                if in_doc:
-                    lines.append(line)
+    for path in wiki_shards(base_path):
+        yield from iter_shard_docs(path)
 
 
-def _attr(tag_line: str, attr: str) -> str:
-    match = re.search(fr'{attr}="([^"]*)"', tag_line)
-    return match.group(1) if match else ""
+def open_shard(path: Path, raw: Optional[BinaryIO] = None) -> IO[str]:
+    """
+    Open a shard as text, decompressing .bz2/.gz/.zst on the fly. With raw,
+    the shard's bytes are read from that binary stream instead (path then
+    only picks the format).
+    """
+    if path.suffix == ".bz2":
+        stream = bz2.open(raw if raw is not None else path, "rb")
+    elif path.suffix == ".gz":
+        stream = gzip.open(raw if raw is not None else path, "rb")
+    elif path.suffix == ".zst":
+        if zstandard is None:
+            raise ImportError(f"Reading {path} requires the zstandard package")
+        source = raw if raw is not None else path.open("rb")
+        stream = zstandard.ZstdDecompressor().stream_reader(source, closefd=raw is None)
+    else:
+        stream = raw if raw is not None else path.open("rb")
+    return io.TextIOWrapper(stream, encoding="utf-8", errors="ignore")
 
 
-def detect_destination(doc: WikiDoc) -> Optional[str]:
+def iter_shard_docs(path: Path, raw: Optional[BinaryIO] = None) -> Iterator[WikiDoc]:
     """
-    Return the destination name ("Bali", "Lisbon", "Tokyo") if the doc clearly belongs
-    to one of them based on keyword matching in title and text. Otherwise return None.
+    Yield a WikiDoc for each <doc> in a single (optionally compressed) shard.
+    Only the start of each body is kept: buffering stops once the detection
+    window is filled and a snippet-sized paragraph is complete, and never
+    exceeds _MAX_DOC_CHARS, so memory per document is bounded.
     """
-    haystack = f"{doc.title}\n{doc.text[:1500]}".lower()
-    title_lower = doc.title.lower()
+    with open_shard(path, raw) as f:
+        in_doc = full = snippet_ready = False
+        attrs: Dict[str, str] = {}
+        lines: List[str] = []
+        paragraph: List[str] = []
+        size = 0
+        for line in f:
+            if line.startswith("<doc "):
+                in_doc, full, snippet_ready = True, False, False
+                attrs = dict(_DOC_ATTR.findall(line))
+                lines, paragraph, size = [], [], 0
+                continue
+            if line.startswith("</doc>") and in_doc:
+                yield WikiDoc(
+                    id=attrs.get("id", ""),
+                    title=attrs.get("title", ""),
+                    url=attrs.get("url", ""),
+                    text="".join(lines).strip(),
+                )
+                in_doc = False
+                lines, paragraph = [], []
+                continue
+            if not in_doc or full:
+                continue
+            if not lines:
+                line = line.lstrip()  # the body is stripped anyway; count from its first character
+                if not line:
+                    continue
+            line = line[: _MAX_DOC_CHARS - size]
+            lines.append(line)
+            size += len(line)
+            if line == "\n":  # paragraph break, as split on "\n\n" sees it
+                snippet_ready = snippet_ready or len("".join(paragraph).strip()) >= _SNIPPET_MIN_CHARS
+                paragraph = []
+            elif not snippet_ready:
+                paragraph.append(line)
+            full = size >= _MAX_DOC_CHARS or (snippet_ready and size >= _DETECTION_CHARS)
 
-    def check_destination(name: str, base_keyword: str, positives: List[str], negatives: List[str]) -> Optional[tuple[str, int]]:
-        if base_keyword not in haystack:
-            return None
-        if any(neg in haystack for neg in negatives):
-            return None
-        title_positive = any(pos in title_lower for pos in positives)
-        text_positive = any(pos in haystack for pos in positives)
-        if title_positive:
-            return (name, 3)
-        if text_positive:
-            return (name, 2)
-        keywords = DESTINATION_KEYWORDS.get(name, [])
-        if any(kw in title_lower for kw in keywords):
-            return (name, 2)
-        if any(kw in haystack for kw in keywords):
-            return (name, 1)
-        return None
-
-    candidates: List[tuple[str, int]] = []
-    cand = check_destination("Bali", "bali", BALI_POSITIVE, BALI_NEGATIVE)
-    if cand:
-        candidates.append(cand)
-    cand = check_destination("Lisbon", "lisbon", LISBON_POSITIVE, LISBON_NEGATIVE)
-    if cand:
-        candidates.append(cand)
-    cand = check_destination("Tokyo", "tokyo", TOKYO_POSITIVE, TOKYO_NEGATIVE)
-    if cand:
-        candidates.append(cand)
-
-    if not candidates:
-        return None
-    candidates.sort(key=lambda x: x[1], reverse=True)
-    return candidates[0][0]
+
+def detect_destination(doc: WikiDoc, matcher: Optional[DestinationMatcher] = None) -> Optional[str]:
+    """
+    Return the destination name (e.g. "Bali", "Lisbon", "Tokyo") if the doc clearly
+    belongs to one of them based on keyword matching in title and text. Otherwise
+    return None. Rules come from settings.destination_rules_path unless a matcher
+    is given.
+    """
+    matcher = matcher or default_matcher()
+    return matcher.detect(doc.title, doc.text[:_DETECTION_CHARS])
+
+
+def default_matcher() -> DestinationMatcher:
+    return get_destination_matcher(settings.destination_rules_path)
 
 
 def extract_candidate_activities(doc: WikiDoc) -> List[str]:
     """
     From the doc.text, derive candidate 'Title | Short snippet' lines.
-    Uses doc.title and the first non-empty paragraph as snippet.
+    Uses doc.title and the first paragraph of 40+ characters as snippet (else
+    the first non-empty one). Paragraphs are scanned lazily, not split up front.
     """
-    paragraphs = [p.strip() for p in doc.text.split("\n\n") if p.strip()]
-    snippet = ""
-    for para in paragraphs:
-        if len(para) >= 40:
-            snippet = para.replace("\n", " ").strip()
+    text = doc.text
+    snippet = first = ""
+    start = 0
+    while True:
+        end = text.find("\n\n", start)
+        para = (text[start:] if end < 0 else text[start:end]).strip()
+        if para:
+            if len(para) >= _SNIPPET_MIN_CHARS:
+                snippet = para
+                break
+            first = first or para
+        if end < 0:
             break
-    if not snippet and paragraphs:
-        snippet = paragraphs[0].replace("\n", " ").strip()
+        start = end + 2
+    snippet = (snippet or first).replace("\n", " ").strip()
     if not snippet:
         return []
     if len(snippet) > 200:
@@ -191,27 +190,270 @@ def extract_candidate_activities(doc: WikiDoc) -> List[str]:
     return [f"{title} | {snippet}"]
 
 
-def build_wiki_activity_candidates(base_path: Path, output_dir: Path) -> None:
-    """
-    Scan all wiki files under base_path, detect destination, extract candidates,
-    and write one file per destination: wiki_activities_<destination>.txt.
-    Each line in the file is 'Title | Short snippet'.
-    """
-    output_dir.mkdir(parents=True, exist_ok=True)
-    buckets: Dict[str, List[str]] = {"Bali": [], "Lisbon": [], "Tokyo": []}
-    total_docs = 0
-    matched_docs = 0
-    for doc in iter_wiki_docs(base_path):
-        total_docs += 1
+def scan_shard(path: Path, raw: Optional[BinaryIO] = None) -> ShardResult:
+    """Detect destinations and extract candidates for every doc in one shard."""
+    result = ShardResult(path=str(path))
+    for doc in iter_shard_docs(path, raw):
+        result.total_docs += 1
         dest = detect_destination(doc)
         if not dest:
             continue
-        matched_docs += 1
+        result.matched_docs += 1
         candidates = extract_candidate_activities(doc)
         if candidates:
-            buckets.setdefault(dest, []).extend(candidates)
-    for dest, lines in buckets.items():
+            result.buckets.setdefault(dest, []).extend(candidates)
+            result.sources.setdefault(dest, []).extend((doc.id, doc.url) for _ in candidates)
+    return result
+
+
+def scan_shards(
+    shards: List[Path],
+    workers: int = 0,
+    chunk_size: int = 1,
+    scan: Callable[[Path], ShardResult] = scan_shard,
+) -> Iterator[ShardResult]:
+    """
+    Scan shards on a process pool (workers=0 means one per CPU), handing each
+    worker chunk_size shards at a time. Results are yielded in shard order, so
+    merging them gives exactly the output of a serial scan.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(shards))
+    if workers <= 1:
+        yield from map(scan, shards)
+        return
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        yield from pool.map(scan, shards, chunksize=max(1, chunk_size))
+
+
+_HASH_CHUNK_BYTES = 1 << 20
+
+# Bump when extraction changes so existing manifests are rebuilt.
+_MANIFEST_VERSION = 3
+
+
+class ShardManifest:
+    """
+    Per-shard build records in a directory, one JSON file per input shard with
+    its size, mtime, sha256 and extracted candidates. Workers write a shard's
+    record as soon as it is scanned, so an interrupted build resumes from the
+    shards already done. A record is reused while the shard's size and mtime
+    (or, if only the mtime moved, its hash) and the rule table are unchanged.
+    """
+
+    def __init__(self, directory: Path, rules_path: Optional[str] = None):
+        self.directory = directory
+        rules = Path(rules_path or settings.destination_rules_path).read_bytes()
+        self.fingerprint = f"{_MANIFEST_VERSION}:{hashlib.sha256(rules).hexdigest()[:16]}"
+
+    def load(self, shard: Path) -> Optional[ShardResult]:
+        """The recorded result for shard if it is still valid, else None."""
+        record = self._read(shard)
+        if record is None or record.get("version") != self.fingerprint:
+            return None
+        stat = shard.stat()
+        if record["size"] != stat.st_size:
+            return None
+        if record["mtime_ns"] != stat.st_mtime_ns:
+            if record["sha256"] != _file_sha256(shard):
+                return None
+            record["mtime_ns"] = stat.st_mtime_ns  # touched but unchanged
+            self._write(shard, record)
+        return ShardResult(
+            path=str(shard),
+            buckets=record["buckets"],
+            sources={dest: [tuple(src) for src in srcs] for dest, srcs in record["sources"].items()},
+            total_docs=record["total_docs"],
+            matched_docs=record["matched_docs"],
+            reused=True,
+        )
+
+    def scan(self, shard: Path) -> ShardResult:
+        """scan_shard, then checkpoint the result (runs in the worker process)."""
+        stat = shard.stat()  # taken first, so edits during the scan force a rescan
+        # Hash the bytes as the scan reads them rather than reading the shard twice.
+        with shard.open("rb") as f:
+            hashing = _HashingReader(f)
+            result = scan_shard(shard, io.BufferedReader(hashing))
+            hashing.drain()  # a decompressor may stop before trailing bytes
+        self._write(
+            shard,
+            {
+                "version": self.fingerprint,
+                "path": str(shard),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": hashing.hexdigest(),
+                "total_docs": result.total_docs,
+                "matched_docs": result.matched_docs,
+                "buckets": result.buckets,
+                "sources": result.sources,
+            },
+        )
+        return result
+
+    def _record_path(self, shard: Path) -> Path:
+        key = hashlib.sha1(str(shard.resolve()).encode("utf-8")).hexdigest()[:12]
+        return self.directory / f"{shard.name}.{key}.json"
+
+    def _read(self, shard: Path) -> Optional[dict]:
+        try:
+            with self._record_path(shard).open("r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, shard: Path, record: dict) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._record_path(shard)
+        tmp = path.with_suffix(f".tmp{os.getpid()}")
+        tmp.write_text(json.dumps(record, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)  # atomic: a crash never leaves a half-written record
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class _HashingReader(io.RawIOBase):
+    """Binary reader that feeds every byte it reads from f into a sha256."""
+
+    def __init__(self, f: BinaryIO):
+        self._f = f
+        self._digest = hashlib.sha256()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        n = self._f.readinto(buffer)
+        self._digest.update(memoryview(buffer)[:n])
+        return n
+
+    def drain(self) -> None:
+        for chunk in iter(lambda: self._f.read(_HASH_CHUNK_BYTES), b""):
+            self._digest.update(chunk)
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+def build_wiki_activity_candidates(
+    base_path: Path,
+    output_dir: Path,
+    workers: int = 0,
+    chunk_size: int = 1,
+    progress: Optional[Callable[[int, int, ShardResult], None]] = None,
+    manifest_dir: Optional[Path] = None,
+    force: bool = False,
+    index_path: Optional[Path] = None,
+    index_dim: int = 128,
+    embed_batch_size: int = 1024,
+    dedup_threshold: float = 0.8,
+    dedup_num_perm: int = 64,
+) -> None:
+    """
+    Scan all wiki files under base_path, detect destination, extract candidates,
+    and write one file per destination: wiki_activities_<destination>.txt.
+    Each line in the file is 'Title | Short snippet'. Shards are scanned in
+    parallel (see scan_shards); progress(done, total, result) is called after
+    each shard.
+
+    Builds are incremental: only shards that are new or changed since the last
+    run (per the ShardManifest in manifest_dir, default output_dir/.wiki_manifest)
+    are scanned, then every shard's candidates are merged in shard order. force
+    re-scans everything.
+
+    While merging, candidates whose MinHash-estimated similarity to an earlier
+    candidate is at least dedup_threshold are dropped (0 disables this) and the
+    drops are summarized in output_dir/wiki_dedup_report.json.
+
+    With index_path, the candidates are also embedded in batches and written as
+    a RAG index artifact (see write_candidate_index) that RAGTool.load_index
+    opens without embedding anything at service start.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = ShardManifest(manifest_dir or output_dir / ".wiki_manifest")
+    shards = wiki_shards(base_path)
+    results: Dict[str, ShardResult] = {}
+    pending: List[Path] = []
+    for shard in shards:
+        result = None if force else manifest.load(shard)
+        if result is None:
+            pending.append(shard)
+        else:
+            results[result.path] = result
+    logger.info("%d of %d shards unchanged, scanning %d", len(results), len(shards), len(pending))
+
+    reused = [results[str(shard)] for shard in shards if str(shard) in results]
+    scanned = scan_shards(pending, workers, chunk_size, scan=manifest.scan)
+    for done, result in enumerate(chain(reused, scanned), start=1):
+        results[result.path] = result
+        if progress is not None:
+            progress(done, len(shards), result)
+
+    dedup = NearDuplicateFilter(dedup_threshold, num_perm=dedup_num_perm) if dedup_threshold else None
+    merged = ShardResult(path=str(base_path), buckets={name: [] for name in default_matcher().names})
+    for shard in shards:
+        result = results[str(shard)]
+        merged.total_docs += result.total_docs
+        merged.matched_docs += result.matched_docs
+        for dest, candidates in result.buckets.items():
+            lines = merged.buckets.setdefault(dest, [])
+            sources = merged.sources.setdefault(dest, [])
+            for line, source in zip(candidates, result.sources.get(dest, [])):
+                if dedup is not None and dedup.is_duplicate(line, group=dest):
+                    continue
+                lines.append(line)
+                sources.append(source)
+    if dedup is not None:
+        _write_dedup_report(output_dir / "wiki_dedup_report.json", dedup.report)
+    for dest, lines in merged.buckets.items():
         out_path = output_dir / f"wiki_activities_{dest.lower()}.txt"
         out_path.write_text("\n".join(lines), encoding="utf-8")
         logger.info("Wrote %d candidates for %s to %s", len(lines), dest, out_path)
-    logger.info("Parsed %d docs, matched %d docs", total_docs, matched_docs)
+    if index_path is not None:
+        count = write_candidate_index(index_path, merged, dim=index_dim, batch_size=embed_batch_size)
+        logger.info("Wrote RAG index with %d candidates to %s", count, index_path)
+    logger.info("Parsed %d docs, matched %d docs", merged.total_docs, merged.matched_docs)
+
+
+def _write_dedup_report(path: Path, report: DedupReport) -> None:
+    path.write_text(json.dumps(asdict(report), ensure_ascii=False, indent=2), encoding="utf-8")
+    logger.info(
+        "Dropped %d of %d candidates as near-duplicates (threshold %.2f): %s",
+        report.dropped,
+        report.checked,
+        report.threshold,
+        report.dropped_by_group,
+    )
+
+
+def write_candidate_index(path: Path, merged: ShardResult, dim: int = 128, batch_size: int = 1024) -> int:
+    """
+    Embed every candidate line, batch_size at a time, and write the RAG index
+    artifact: one document per line with its destination and source URL.
+    Returns the number of documents written.
+    """
+    docs: List[RAGDocument] = []
+    for dest, lines in merged.buckets.items():
+        for line, (doc_id, url) in zip(lines, merged.sources.get(dest, [])):
+            docs.append(
+                RAGDocument(
+                    doc_id=f"wiki-{doc_id}",
+                    text=line,
+                    metadata={"destination": dest, "url": url, "title": line.split(" | ", 1)[0]},
+                )
+            )
+    vectors = np.empty((len(docs), dim), dtype="float32")
+    batch_size = max(1, batch_size)
+    for start in range(0, len(docs), batch_size):
+        batch = docs[start : start + batch_size]
+        vectors[start : start + len(batch)] = embed_texts([doc.text for doc in batch], dim)
+    write_index(path, docs, vectors)
+    return len(docs)
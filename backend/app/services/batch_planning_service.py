@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from typing import Iterator, List, Optional, Tuple
+
+from app.models.domain import TripPlan
+from app.models.encoding import dumps, plan_to_jsonable
+from app.models.schemas import Preferences
+from app.storage.repository import InMemoryRepository, Repository
+
+logger = logging.getLogger(__name__)
+
+# One warm PlanningService per worker process, built by the pool initializer.
+_worker_service = None
+
+
+def _init_worker() -> None:
+    global _worker_service
+    from app.services.planning_service import PlanningService
+
+    # Plans are persisted by the parent; the worker repository is never read.
+    _worker_service = PlanningService(repository=InMemoryRepository())
+
+
+def _plan_in_worker(user_id: str, preferences: dict) -> TripPlan:
+    plans = _worker_service.build_plans(
+        user_id, Preferences(**preferences), include_alternatives=False
+    )
+    return plans[0]
+
+
+class BatchPlanningService:
+    """
+    Plans many Preferences on a process pool of warm PlanningService workers so
+    throughput scales with cores. The pool is created on first use and reused
+    across requests; results are yielded as NDJSON lines as they complete.
+    """
+
+    def __init__(self, max_workers: int = 0, persist_chunk_size: int = 100):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.persist_chunk_size = max(1, persist_chunk_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def plan_many(
+        self,
+        user_id: str,
+        preferences_list: List[Preferences],
+        repository: Repository,
+    ) -> Iterator[bytes]:
+        """
+        Yield one NDJSON line per input, in completion order, tagged with the
+        input index. Plans are persisted with repository.save_plans in chunks, so
+        a trip_id may become readable shortly after its line is streamed.
+        """
+        executor = self._get_executor()
+        futures = {
+            executor.submit(_plan_in_worker, user_id, preferences.dict()): index
+            for index, preferences in enumerate(preferences_list)
+        }
+        pending: List[TripPlan] = []
+        try:
+            for future in as_completed(futures):
+                index, plan, error = self._result(futures, future)
+                if plan is None:
+                    yield dumps({"index": index, "error": error}) + b"\n"
+                    continue
+                pending.append(plan)
+                if len(pending) >= self.persist_chunk_size:
+                    repository.save_plans(pending)
+                    pending = []
+                yield dumps({"index": index, "plan": plan_to_jsonable(plan)}) + b"\n"
+        finally:
+            # Also runs when the client disconnects: keep what finished, drop the rest.
+            if pending:
+                repository.save_plans(pending)
+            for future in futures:
+                future.cancel()
+
+    @staticmethod
+    def _result(
+        futures: dict, future: Future
+    ) -> Tuple[int, Optional[TripPlan], Optional[str]]:
+        index = futures[future]
+        try:
+            return index, future.result(), None
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Batch plan %d failed: %s", index, exc)
+            return index, None, str(exc)
@@ -1,19 +1,67 @@
+import hashlib
+import json
+from typing import Optional
+
 from fastapi import HTTPException
 
+from app.core.metrics import record_cache
 from app.llm.tools.booking_tool import BookingTool
+from app.models.domain import TripPlan
 from app.models.schemas import BookingRecordSchema, BookingResponse
-from app.storage.repository import InMemoryRepository
+from app.storage.repository import Repository
+from app.storage.serialization import plan_to_dict
 
 
 class BookingService:
-    def __init__(self, repository: InMemoryRepository):
+    def __init__(self, repository: Repository, booking_tool: Optional[BookingTool] = None):
         self.repository = repository
+        self.booking_tool = booking_tool or BookingTool(repository=repository)
 
-    def book_trip(self, trip_id: str, payment_allowed: bool = True) -> BookingResponse:
+    def book_trip(
+        self,
+        trip_id: str,
+        payment_allowed: bool = True,
+        idempotency_key: Optional[str] = None,
+    ) -> BookingResponse:
+        """
+        Book every item of a stored plan. Replays with the same idempotency key
+        (the client's header, or the trip plus a hash of its content) return the
+        stored bookings instead of booking again; a replay while the first
+        attempt is still running gets a 409. Under a derived key only a fully
+        confirmed outcome is kept, so retrying after a failure books again.
+        """
         plan = self.repository.get_plan(trip_id)
         if not plan:
             raise HTTPException(status_code=404, detail="Plan not found")
-        tool = BookingTool(repository=self.repository)
-        bookings = tool.reserve_trip(plan=plan, payment_allowed=payment_allowed)
+        key = self._idempotency_key(plan, payment_allowed, idempotency_key)
+        # The claim is the only synchronization: it is atomic in the repository,
+        # so nothing is held while the providers are called.
+        claimed, existing = self.repository.claim_idempotency_key(key)
+        record_cache("booking_idempotency", hit=not claimed)
+        if existing is not None:
+            return self._response(existing, replayed=True)
+        if not claimed:
+            raise HTTPException(status_code=409, detail="Booking with this idempotency key is in progress")
+        try:
+            bookings = self.booking_tool.reserve_trip(
+                plan=plan,
+                payment_allowed=payment_allowed,
+                idempotency_key=key,
+                record_failures=idempotency_key is not None,
+            )
+        except Exception:
+            self.repository.release_idempotency_key(key)
+            raise
+        return self._response(bookings, replayed=False)
+
+    @staticmethod
+    def _idempotency_key(plan: TripPlan, payment_allowed: bool, client_key: Optional[str]) -> str:
+        if client_key:
+            return f"{plan.trip_id}:key:{client_key}"
+        content = json.dumps([plan_to_dict(plan), payment_allowed], sort_keys=True)
+        return f"{plan.trip_id}:sha256:{hashlib.sha256(content.encode('utf-8')).hexdigest()}"
+
+    @staticmethod
+    def _response(bookings, replayed: bool) -> BookingResponse:
         booking_schemas = [BookingRecordSchema.from_domain(b) for b in bookings]
-        return BookingResponse(bookings=booking_schemas)
+        return BookingResponse(bookings=booking_schemas, replayed=replayed)
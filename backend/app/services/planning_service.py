@@ -1,30 +1,35 @@
 import logging
 from datetime import date, timedelta
 from pathlib import Path
+from typing import List
 
 from app.core.config import settings
+from app.core.metrics import LLM_FALLBACKS, span
+from app.llm.candidates import rank_candidates
 from app.llm.client import PlannerContext
 from app.llm.planner import LLMPlanner, MockPlannerBackend
 from app.llm.backends.ollama_backend import OllamaPlannerBackend
 from app.llm.tools.calendar_tool import CalendarTool
+from app.llm.tools.hotel_aggregator import get_hotel_aggregator
 from app.llm.tools.preferences_tool import PreferencesTool
 from app.llm.tools.search_tool import SearchTool
-from app.llm.tools.rag_store import RAGTool
+from app.llm.tools.rag_store import INDEX_FILENAME, RAGTool
 from app.models.schemas import Preferences, TripPlanSchema
-from app.models.domain import Activity, DayPlan
-from app.storage.repository import InMemoryRepository
+from app.models.domain import Activity, DayPlan, TripPlan
+from app.storage.repository import Repository
 import re
 
 logger = logging.getLogger(__name__)
 
 
 class PlanningService:
-    def __init__(self, repository: InMemoryRepository):
+    def __init__(self, repository: Repository):
         self.repository = repository
         self.calendar_tool = CalendarTool()
         self._seed_calendar()
         self._load_calendar_from_ics()
         self.search_tool = SearchTool()
+        self.hotel_tool = get_hotel_aggregator()
         self.preferences_tool = PreferencesTool()
         self.rag_tool = self._init_rag_tool()
         primary_backend = (
@@ -58,15 +63,22 @@ class PlanningService:
         path = Path(settings.rag_docs_path)
         if not path.exists():
             return None
+        if path.suffix == ".npz":
+            rag = RAGTool(store_path=path.parent)
+            rag.load_index(path)
+            return rag
         rag = RAGTool(store_path=path)
-        rag.load_dir()
+        if (path / INDEX_FILENAME).exists():
+            rag.load_index()  # prebuilt by build_wiki_activities.py --index
+        rag.load_dir()  # curated .txt docs next to it, embedded at the index's dim
         return rag
 
     def _fill_empty_days(self, plan):
         """If planner returns empty activities, backfill from RAG or catalog to avoid blank days."""
         activity_pool: list[dict] = []
         if self.rag_tool:
-            hits = self.rag_tool.search(plan.destination, top_k=10)
+            with span("rag_backfill"):
+                hits = self.rag_tool.search(plan.destination, top_k=10, destination=plan.destination)
             for text, _ in hits:
                 for line in text.splitlines():
                     parts = [p.strip() for p in line.split("|")]
@@ -160,11 +172,35 @@ class PlanningService:
         hotel = float(hotel_raw or 0.0)
         breakdown["activities"] = activity_total
         plan.budget_summary.breakdown = breakdown
-        new_total = flight + hotel + activity_total
-        prev_total = plan.budget_summary.total_estimated or new_total
-        plan.budget_summary.total_estimated = min(new_total, prev_total)
+        plan.budget_summary.total_estimated = flight + hotel + activity_total
 
     def plan_trip(self, user_id: str, preferences: Preferences) -> TripPlanSchema:
+        return self.plan_trip_options(user_id, preferences, include_alternatives=False)[0]
+
+    def plan_trip_options(
+        self, user_id: str, preferences: Preferences, include_alternatives: bool = True
+    ) -> List[TripPlanSchema]:
+        """
+        Plan every preferred destination and return the best fit first. Alternatives
+        are only returned and persisted when include_alternatives is set.
+        """
+        plans = self.create_plans(user_id, preferences, include_alternatives)
+        with span("serialize"):
+            return [TripPlanSchema.from_domain(plan) for plan in plans]
+
+    def create_plans(
+        self, user_id: str, preferences: Preferences, include_alternatives: bool = True
+    ) -> List[TripPlan]:
+        """Like plan_trip_options, but returns the persisted domain plans."""
+        plans = self.build_plans(user_id, preferences, include_alternatives)
+        with span("persist"):
+            self.repository.save_plans(plans)
+        return plans
+
+    def build_plans(
+        self, user_id: str, preferences: Preferences, include_alternatives: bool = True
+    ) -> List[TripPlan]:
+        """Run the planner, backfill empty days and rank by fit, without persisting anything."""
         merged_preferences = self.preferences_tool.merge_with_defaults(preferences)
         context = PlannerContext(
             user_id=user_id,
@@ -172,15 +208,22 @@ class PlanningService:
             calendar_tool=self.calendar_tool,
             search_tool=self.search_tool,
             rag_tool=self.rag_tool,
+            hotel_tool=self.hotel_tool,
+            participants=merged_preferences.participants,
         )
         try:
-            plan = self.planner.plan(context)
+            with span("planner"):
+                plans = self.planner.plan_candidates(context)
         except Exception as exc:  # noqa: BLE001
             logger.warning("Primary planner failed, fallback to mock: %s", exc)
             if self.fallback_planner:
-                plan = self.fallback_planner.plan(context)
+                LLM_FALLBACKS.inc()
+                with span("fallback_planner"):
+                    plans = self.fallback_planner.plan_candidates(context)
             else:
                 raise
-        plan = self._fill_empty_days(plan)
-        self.repository.save_plan(plan)
-        return TripPlanSchema.from_domain(plan)
+        with span("fill_empty_days"):
+            plans = [self._fill_empty_days(plan) for plan in plans]
+        # Ranked only now: backfilling and rebalancing change each plan's budget.
+        plans = rank_candidates(plans, context)
+        return plans if include_alternatives else plans[:1]
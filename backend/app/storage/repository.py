@@ -1,28 +1,427 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+import sys
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import date
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple
 
+from app.core.metrics import record_cache
 from app.models.domain import BookingRecord, TripPlan
+from app.models.encoding import encode_plan_with_etag
+
+
+class Repository(Protocol):
+    """Storage interface shared by the in-memory and SQLite backends."""
+
+    def save_plan(self, plan: TripPlan) -> TripPlan:
+        ...
+
+    def save_plans(self, plans: Iterable[TripPlan]) -> None:
+        ...
+
+    def get_plan(self, trip_id: str) -> Optional[TripPlan]:
+        ...
+
+    def get_encoded_plan(self, trip_id: str) -> Optional[Tuple[bytes, str]]:
+        """
+        The plan's TripPlanSchema JSON bytes and their ETag, or None if missing.
+        Saving the plan again invalidates both.
+        """
+        ...
+
+    def list_plans(self) -> List[TripPlan]:
+        ...
+
+    def list_plans_for_user(self, user_id: str) -> List[TripPlan]:
+        ...
+
+    def list_plans_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        user_id: Optional[str] = None,
+        start_from: Optional[date] = None,
+        start_to: Optional[date] = None,
+    ) -> Tuple[List[TripPlan], Optional[str]]:
+        """
+        Up to limit plans in save order after the opaque cursor, filtered by user
+        and an inclusive start_date range. Returns the page and the next cursor
+        (None when there are no more plans).
+        """
+        ...
+
+    def save_booking(self, booking: BookingRecord) -> BookingRecord:
+        ...
+
+    def save_bookings(
+        self, bookings: Iterable[BookingRecord], idempotency_key: Optional[str] = None
+    ) -> List[BookingRecord]:
+        """
+        Persist all bookings atomically: either every record is stored or none.
+        With an idempotency_key the batch is also recorded as that key's result,
+        completing its claim.
+        """
+        ...
+
+    def claim_idempotency_key(self, idempotency_key: str) -> Tuple[bool, Optional[List[BookingRecord]]]:
+        """
+        Atomically reserve idempotency_key for one booking attempt. Returns
+        (True, None) when the caller now owns it; otherwise (False, bookings)
+        with the stored outcome, or (False, None) while another attempt holds it.
+        """
+        ...
+
+    def release_idempotency_key(self, idempotency_key: str) -> None:
+        """Drop a claim whose outcome is not stored, so the booking can be retried."""
+        ...
+
+    def get_idempotent_bookings(self, idempotency_key: str) -> Optional[List[BookingRecord]]:
+        """Bookings stored under idempotency_key, or None if the key is unused or pending."""
+        ...
+
+    def list_bookings_for_trip(self, trip_id: str) -> List[BookingRecord]:
+        ...
+
+
+def iter_plans(
+    repository: Repository,
+    page_size: int = 500,
+    user_id: Optional[str] = None,
+    start_from: Optional[date] = None,
+    start_to: Optional[date] = None,
+) -> Iterator[TripPlan]:
+    """Stream every matching plan page by page, holding one page in memory at a time."""
+    cursor: Optional[str] = None
+    while True:
+        page, cursor = repository.list_plans_page(
+            limit=page_size,
+            cursor=cursor,
+            user_id=user_id,
+            start_from=start_from,
+            start_to=start_to,
+        )
+        yield from page
+        if cursor is None:
+            return
+
+
+def parse_cursor(cursor: Optional[str]) -> int:
+    """The position a list_plans_page cursor points after; ValueError if it is malformed."""
+    if not cursor:
+        return 0
+    if not cursor.isdigit() or not cursor.isascii():
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return int(cursor)
+
+
+def _in_date_range(plan: TripPlan, start_from: Optional[date], start_to: Optional[date]) -> bool:
+    if start_from is not None and plan.start_date < start_from:
+        return False
+    return start_to is None or plan.start_date <= start_to
+
+
+def create_repository(settings: "Settings") -> Repository:
+    backend = settings.repository_backend.lower()
+    if backend == "sqlite":
+        from app.storage.sqlite_repository import SqliteRepository
+
+        return SqliteRepository(settings.sqlite_path)
+    if backend != "memory":
+        raise ValueError(f"Unknown repository backend: {settings.repository_backend}")
+    return InMemoryRepository(
+        max_plans=settings.plan_store_max_plans,
+        plan_ttl_seconds=settings.plan_store_ttl_seconds,
+        max_plan_bytes=settings.plan_store_max_bytes,
+        max_bookings=settings.booking_store_max_bookings,
+        booking_ttl_seconds=settings.booking_store_ttl_seconds,
+    )
 
 
 class InMemoryRepository:
-    def __init__(self) -> None:
-        self.plans: Dict[str, TripPlan] = {}
+    """
+    Process-local repository. Bookings are indexed by trip and plans by user so
+    lookups cost O(result) instead of O(everything stored). Plans are held in
+    LRU order and can be bounded by count, age (TTL) and estimated bytes.
+    Bookings are kept per save_bookings batch in save order and can be bounded
+    by count (of records and of idempotency keys) and age; a batch is evicted
+    whole, together with its idempotency key.
+    Plans and bookings each have their own lock so writers do not contend.
+    """
+
+    def __init__(
+        self,
+        max_plans: int = 0,
+        plan_ttl_seconds: float = 0.0,
+        max_plan_bytes: int = 0,
+        max_bookings: int = 0,
+        booking_ttl_seconds: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_plans = max_plans
+        self.plan_ttl_seconds = plan_ttl_seconds
+        self.max_plan_bytes = max_plan_bytes
+        self.max_bookings = max_bookings
+        self.booking_ttl_seconds = booking_ttl_seconds
+        self.clock = clock
+        self.plans: "OrderedDict[str, TripPlan]" = OrderedDict()
         self.bookings: Dict[str, BookingRecord] = {}
+        self._plan_meta: Dict[str, Tuple[float, int, int]] = {}  # trip_id -> (saved_at, bytes, seq)
+        self._saved_order: "OrderedDict[str, None]" = OrderedDict()  # oldest save first, for TTL
+        # Save sequence numbers back the pagination cursors: _seq_log is ascending
+        # (bisectable) and may hold evicted seqs until it is compacted.
+        self._next_seq = 0
+        self._seq_log: List[int] = []
+        self._trip_at_seq: Dict[int, str] = {}
+        self._plan_bytes = 0
+        self._trips_by_user: Dict[str, Dict[str, None]] = {}
+        self._user_seq_log: Dict[str, List[int]] = {}  # like _seq_log, per user
+        self._bookings_by_trip: Dict[str, List[str]] = {}
+        self._idempotency: Dict[str, Optional[List[str]]] = {}  # None while claimed
+        # batch seq -> (saved_at, booking ids, idempotency key), oldest first.
+        self._batches: "OrderedDict[int, Tuple[float, List[str], Optional[str]]]" = OrderedDict()
+        self._next_batch = 0
+        self._batch_of_booking: Dict[str, int] = {}
+        self._batch_of_key: Dict[str, int] = {}
+        # trip_id -> (JSON bytes, ETag), filled on first read and dropped on save.
+        self._encoded: Dict[str, Tuple[bytes, str]] = {}
+        self._plans_lock = threading.Lock()
+        self._bookings_lock = threading.Lock()
 
     def save_plan(self, plan: TripPlan) -> TripPlan:
-        self.plans[plan.trip_id] = plan
+        self.save_plans([plan])
         return plan
 
+    def save_plans(self, plans: Iterable[TripPlan]) -> None:
+        now = self.clock()
+        with self._plans_lock:
+            for plan in plans:
+                if plan.trip_id in self.plans:
+                    self._drop_plan(plan.trip_id)
+                size = estimate_plan_bytes(plan)
+                self.plans[plan.trip_id] = plan
+                self._next_seq += 1
+                self._plan_meta[plan.trip_id] = (now, size, self._next_seq)
+                self._saved_order[plan.trip_id] = None
+                self._seq_log.append(self._next_seq)
+                self._trip_at_seq[self._next_seq] = plan.trip_id
+                self._plan_bytes += size
+                self._trips_by_user.setdefault(plan.user_id, {})[plan.trip_id] = None
+                self._user_seq_log.setdefault(plan.user_id, []).append(self._next_seq)
+            self._evict(now)
+
     def get_plan(self, trip_id: str) -> Optional[TripPlan]:
-        return self.plans.get(trip_id)
+        with self._plans_lock:
+            return self._live_plan(trip_id)
+
+    def get_encoded_plan(self, trip_id: str) -> Optional[Tuple[bytes, str]]:
+        with self._plans_lock:
+            plan = self._live_plan(trip_id)
+            if plan is None:
+                return None
+            cached = self._encoded.get(trip_id)
+        record_cache("plan_body", hit=cached is not None)
+        if cached is not None:
+            return cached
+        # Encode outside the lock; only cache it if the plan was not replaced meanwhile.
+        encoded = encode_plan_with_etag(plan)
+        with self._plans_lock:
+            if self.plans.get(trip_id) is plan and trip_id not in self._encoded:
+                self._encoded[trip_id] = encoded
+                saved_at, size, seq = self._plan_meta[trip_id]
+                self._plan_meta[trip_id] = (saved_at, size + len(encoded[0]), seq)
+                self._plan_bytes += len(encoded[0])
+                self._evict(self.clock())  # the cached bytes count toward max_plan_bytes
+        return encoded
 
     def list_plans(self) -> List[TripPlan]:
-        return list(self.plans.values())
+        with self._plans_lock:
+            self._evict(self.clock())
+            return list(self.plans.values())
+
+    def list_plans_for_user(self, user_id: str) -> List[TripPlan]:
+        with self._plans_lock:
+            now = self.clock()
+            trip_ids = list(self._trips_by_user.get(user_id, {}))
+            return [self.plans[t] for t in trip_ids if not self._expired(t, now)]
+
+    def list_plans_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        user_id: Optional[str] = None,
+        start_from: Optional[date] = None,
+        start_to: Optional[date] = None,
+    ) -> Tuple[List[TripPlan], Optional[str]]:
+        after = parse_cursor(cursor)
+        now = self.clock()
+        items: List[TripPlan] = []
+        last_seq = after
+        with self._plans_lock:
+            seq_log = self._seq_log if user_id is None else self._user_seq_log.get(user_id, [])
+            start = bisect_right(seq_log, after)
+            seqs = (seq_log[i] for i in range(start, len(seq_log)))
+            for seq in seqs:
+                if len(items) >= limit:
+                    return items, str(last_seq)
+                trip_id = self._trip_at_seq.get(seq)
+                if trip_id is None or self._expired(trip_id, now):
+                    continue
+                last_seq = seq
+                plan = self.plans[trip_id]
+                if _in_date_range(plan, start_from, start_to):
+                    items.append(plan)
+        return items, None
 
     def save_booking(self, booking: BookingRecord) -> BookingRecord:
-        self.bookings[booking.booking_id] = booking
+        self.save_bookings([booking])
         return booking
 
+    def save_bookings(
+        self, bookings: Iterable[BookingRecord], idempotency_key: Optional[str] = None
+    ) -> List[BookingRecord]:
+        records = list(bookings)
+        booking_ids = [b.booking_id for b in records]
+        now = self.clock()
+        # Building the index entries cannot fail halfway, and the lock makes the
+        # whole batch visible to readers at once.
+        with self._bookings_lock:
+            self._next_batch += 1
+            for booking in records:
+                if booking.booking_id not in self.bookings:
+                    self._bookings_by_trip.setdefault(booking.trip_id, []).append(booking.booking_id)
+                self.bookings[booking.booking_id] = booking
+                self._batch_of_booking[booking.booking_id] = self._next_batch
+            if idempotency_key is not None:
+                self._idempotency[idempotency_key] = booking_ids
+                self._batch_of_key[idempotency_key] = self._next_batch
+            self._batches[self._next_batch] = (now, booking_ids, idempotency_key)
+            self._evict_bookings(now)
+        return records
+
+    def claim_idempotency_key(self, idempotency_key: str) -> Tuple[bool, Optional[List[BookingRecord]]]:
+        with self._bookings_lock:
+            self._evict_bookings(self.clock())
+            if idempotency_key not in self._idempotency:
+                self._idempotency[idempotency_key] = None
+                return True, None
+            booking_ids = self._idempotency[idempotency_key]
+            if booking_ids is None:
+                return False, None
+            return False, [self.bookings[b] for b in booking_ids if b in self.bookings]
+
+    def release_idempotency_key(self, idempotency_key: str) -> None:
+        with self._bookings_lock:
+            if self._idempotency.get(idempotency_key, ()) is None:
+                del self._idempotency[idempotency_key]
+
+    def get_idempotent_bookings(self, idempotency_key: str) -> Optional[List[BookingRecord]]:
+        with self._bookings_lock:
+            self._evict_bookings(self.clock())
+            booking_ids = self._idempotency.get(idempotency_key)
+            if booking_ids is None:
+                return None
+            return [self.bookings[b] for b in booking_ids if b in self.bookings]
+
     def list_bookings_for_trip(self, trip_id: str) -> List[BookingRecord]:
-        return [b for b in self.bookings.values() if b.trip_id == trip_id]
+        with self._bookings_lock:
+            return [self.bookings[b] for b in self._bookings_by_trip.get(trip_id, [])]
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Entry counts and the estimated bytes held by stored plans."""
+        with self._plans_lock:
+            plan_count, plan_bytes = len(self.plans), self._plan_bytes
+        with self._bookings_lock:
+            booking_count, key_count = len(self.bookings), len(self._idempotency)
+        return {"plans": plan_count, "plan_bytes": plan_bytes, "bookings": booking_count, "idempotency_keys": key_count}
+
+    def _live_plan(self, trip_id: str) -> Optional[TripPlan]:
+        # Caller holds _plans_lock.
+        plan = self.plans.get(trip_id)
+        if plan is None:
+            return None
+        if self._expired(trip_id, self.clock()):
+            self._drop_plan(trip_id)
+            return None
+        self.plans.move_to_end(trip_id)
+        return plan
+
+    def _expired(self, trip_id: str, now: float) -> bool:
+        if not self.plan_ttl_seconds:
+            return False
+        return now - self._plan_meta[trip_id][0] > self.plan_ttl_seconds
+
+    def _evict(self, now: float) -> None:
+        # Caller holds _plans_lock. Both orders keep the next victim at the front,
+        # so eviction is amortized O(1) per save.
+        while self._saved_order and self._expired(next(iter(self._saved_order)), now):
+            self._drop_plan(next(iter(self._saved_order)))
+        while self.plans and (
+            (self.max_plans and len(self.plans) > self.max_plans)
+            or (self.max_plan_bytes and self._plan_bytes > self.max_plan_bytes)
+        ):
+            self._drop_plan(next(iter(self.plans)))
+
+    def _drop_plan(self, trip_id: str) -> None:
+        plan = self.plans.pop(trip_id)
+        del self._saved_order[trip_id]
+        self._encoded.pop(trip_id, None)
+        _, size, seq = self._plan_meta.pop(trip_id)
+        self._plan_bytes -= size
+        del self._trip_at_seq[seq]
+        if len(self._seq_log) > 64 and len(self._seq_log) > 2 * len(self._trip_at_seq):
+            self._seq_log = list(self._trip_at_seq)  # insertion order is ascending seq
+        user_trips = self._trips_by_user.get(plan.user_id)
+        if user_trips is not None:
+            user_trips.pop(trip_id, None)
+            if not user_trips:
+                del self._trips_by_user[plan.user_id]
+                del self._user_seq_log[plan.user_id]
+            elif len(self._user_seq_log[plan.user_id]) > 64 + 2 * len(user_trips):
+                # A re-saved trip moves to the end of the dict, so it stays in seq order.
+                self._user_seq_log[plan.user_id] = [self._plan_meta[t][2] for t in user_trips]
+
+    def _evict_bookings(self, now: float) -> None:
+        # Caller holds _bookings_lock. Batches are in save order, so the oldest
+        # one is always the next victim for both the TTL and the count cap.
+        while self._batches:
+            saved_at, _, _ = next(iter(self._batches.values()))
+            expired = self.booking_ttl_seconds and now - saved_at > self.booking_ttl_seconds
+            over = self.max_bookings and (
+                len(self.bookings) > self.max_bookings or len(self._idempotency) > self.max_bookings
+            )
+            if not (expired or over):
+                return
+            self._drop_batch(next(iter(self._batches)))
+
+    def _drop_batch(self, batch: int) -> None:
+        _, booking_ids, key = self._batches.pop(batch)
+        if key is not None and self._batch_of_key.get(key) == batch:
+            del self._batch_of_key[key]
+            del self._idempotency[key]
+        for booking_id in booking_ids:
+            if self._batch_of_booking.get(booking_id) != batch:
+                continue  # saved again by a later batch
+            del self._batch_of_booking[booking_id]
+            booking = self.bookings.pop(booking_id)
+            trip_bookings = self._bookings_by_trip[booking.trip_id]
+            trip_bookings.remove(booking_id)
+            if not trip_bookings:
+                del self._bookings_by_trip[booking.trip_id]
+
+
+def estimate_plan_bytes(plan: TripPlan) -> int:
+    """Approximate retained size of a plan: object headers plus its strings."""
+    size = sys.getsizeof(plan) + sys.getsizeof(plan.trip_id) + sys.getsizeof(plan.destination)
+    size += sys.getsizeof(plan.budget_summary) + sys.getsizeof(plan.budget_summary.breakdown)
+    for day in plan.days:
+        size += sys.getsizeof(day) + sys.getsizeof(day.activities)
+        for activity in day.activities:
+            size += (
+                sys.getsizeof(activity)
+                + sys.getsizeof(activity.title)
+                + sys.getsizeof(activity.description)
+            )
+    return size
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Dict
+
+from app.models.domain import Activity, BudgetSummary, DayPlan, TripPlan
+from app.models.encoding import plan_to_jsonable
+
+
+def plan_to_dict(plan: TripPlan) -> Dict[str, Any]:
+    """JSON-ready dict of a TripPlan (dates as ISO strings)."""
+    return plan_to_jsonable(plan)
+
+
+def plan_from_dict(data: Dict[str, Any]) -> TripPlan:
+    return TripPlan(
+        trip_id=data["trip_id"],
+        user_id=data["user_id"],
+        destination=data["destination"],
+        start_date=date.fromisoformat(data["start_date"]),
+        end_date=date.fromisoformat(data["end_date"]),
+        days=[
+            DayPlan(
+                date=date.fromisoformat(day["date"]),
+                activities=[Activity(**a) for a in day["activities"]],
+            )
+            for day in data["days"]
+        ],
+        budget_summary=BudgetSummary(**data["budget_summary"]),
+    )
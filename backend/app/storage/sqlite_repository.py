@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from app.models.domain import (
+    BookingRecord,
+    BookingStatus,
+    BookingType,
+    PaymentStatus,
+    TripPlan,
+)
+from app.models.encoding import body_etag, encode_plan_with_etag
+from app.storage.repository import parse_cursor
+from app.storage.serialization import plan_from_dict
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    trip_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    etag TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_plans_user_id ON plans (user_id);
+CREATE TABLE IF NOT EXISTS bookings (
+    booking_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    trip_id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    price REAL NOT NULL,
+    created_at TEXT NOT NULL,
+    payment_status TEXT NOT NULL,
+    reference TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_bookings_trip_id ON bookings (trip_id);
+CREATE INDEX IF NOT EXISTS idx_bookings_user_id ON bookings (user_id);
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key TEXT PRIMARY KEY,
+    booking_ids TEXT NOT NULL,
+    claimed_at REAL NOT NULL DEFAULT 0
+);
+"""
+
+# Constant SQL strings so sqlite3's per-connection statement cache reuses them.
+# ON CONFLICT ... DO UPDATE keeps a re-saved plan's rowid, which the page cursors use.
+_UPSERT_PLAN = (
+    "INSERT INTO plans (trip_id, user_id, start_date, payload, etag) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT(trip_id) DO UPDATE SET user_id = excluded.user_id, start_date = excluded.start_date, "
+    "payload = excluded.payload, etag = excluded.etag"
+)
+_SELECT_PLAN = "SELECT payload FROM plans WHERE trip_id = ?"
+_SELECT_ENCODED_PLAN = "SELECT payload, etag FROM plans WHERE trip_id = ?"
+_SELECT_PLANS = "SELECT payload FROM plans"
+_SELECT_PLANS_FOR_USER = "SELECT payload FROM plans WHERE user_id = ? ORDER BY rowid"
+_UPSERT_BOOKING = (
+    "INSERT OR REPLACE INTO bookings (booking_id, user_id, trip_id, type, status, provider, "
+    "price, created_at, payment_status, reference) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_BOOKING_COLUMNS = (
+    "booking_id, user_id, trip_id, type, status, provider, price, created_at, payment_status, reference"
+)
+_SELECT_BOOKINGS_FOR_TRIP = f"SELECT {_BOOKING_COLUMNS} FROM bookings WHERE trip_id = ? ORDER BY rowid"
+_SELECT_BOOKING = f"SELECT {_BOOKING_COLUMNS} FROM bookings WHERE booking_id = ?"
+# An idempotency key's booking_ids is the JSON "null" while an attempt holds the claim.
+_PENDING = "null"
+_CLAIM_IDEMPOTENCY_KEY = "INSERT INTO idempotency_keys (key, booking_ids, claimed_at) VALUES (?, 'null', ?)"
+_TAKE_OVER_IDEMPOTENCY_KEY = (
+    "UPDATE idempotency_keys SET claimed_at = ? WHERE key = ? AND booking_ids = 'null' AND claimed_at < ?"
+)
+_RELEASE_IDEMPOTENCY_KEY = "DELETE FROM idempotency_keys WHERE key = ? AND booking_ids = 'null'"
+_COMPLETE_IDEMPOTENCY_KEY = (
+    "INSERT INTO idempotency_keys (key, booking_ids, claimed_at) VALUES (?, ?, ?) "
+    "ON CONFLICT(key) DO UPDATE SET booking_ids = excluded.booking_ids"
+)
+_SELECT_IDEMPOTENCY_KEY = "SELECT booking_ids FROM idempotency_keys WHERE key = ?"
+
+
+class SqliteRepository:
+    """
+    SQLite-backed repository with the same interface as InMemoryRepository.
+    Uses WAL mode so readers do not block the writer, one connection per thread,
+    indexes on trip_id/user_id, and executemany for batched writes.
+    Idempotency keys are claimed with a plain INSERT, so two workers sharing the
+    file cannot both book; a claim left pending for claim_ttl_seconds (a worker
+    died mid-booking) can be taken over.
+    """
+
+    def __init__(self, path: str | Path, claim_ttl_seconds: float = 300.0):
+        self.path = str(path)
+        self.claim_ttl_seconds = claim_ttl_seconds
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+            # Files created by older versions lack these columns.
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(idempotency_keys)")}
+            if "claimed_at" not in columns:
+                conn.execute("ALTER TABLE idempotency_keys ADD COLUMN claimed_at REAL NOT NULL DEFAULT 0")
+            if "etag" not in {row[1] for row in conn.execute("PRAGMA table_info(plans)")}:
+                conn.execute("ALTER TABLE plans ADD COLUMN etag TEXT")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, cached_statements=64)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def save_plan(self, plan: TripPlan) -> TripPlan:
+        self.save_plans([plan])
+        return plan
+
+    def save_plans(self, plans: Iterable[TripPlan]) -> None:
+        rows = [_plan_row(plan) for plan in plans]
+        with self._connection() as conn:
+            conn.executemany(_UPSERT_PLAN, rows)
+
+    def get_plan(self, trip_id: str) -> Optional[TripPlan]:
+        row = self._connection().execute(_SELECT_PLAN, (trip_id,)).fetchone()
+        return plan_from_dict(json.loads(row[0])) if row else None
+
+    def get_encoded_plan(self, trip_id: str) -> Optional[Tuple[bytes, str]]:
+        # Payloads are stored in the response encoding with their ETag, so a read
+        # does no JSON or hashing work (rows saved before the etag column excepted).
+        row = self._connection().execute(_SELECT_ENCODED_PLAN, (trip_id,)).fetchone()
+        if row is None:
+            return None
+        body = row[0].encode("utf-8")
+        return body, row[1] or body_etag(body)
+
+    def list_plans(self) -> List[TripPlan]:
+        return [plan_from_dict(json.loads(row[0])) for row in self._connection().execute(_SELECT_PLANS)]
+
+    def list_plans_for_user(self, user_id: str) -> List[TripPlan]:
+        rows = self._connection().execute(_SELECT_PLANS_FOR_USER, (user_id,))
+        return [plan_from_dict(json.loads(row[0])) for row in rows]
+
+    def list_plans_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        user_id: Optional[str] = None,
+        start_from: Optional[date] = None,
+        start_to: Optional[date] = None,
+    ) -> Tuple[List[TripPlan], Optional[str]]:
+        # Keyset pagination on rowid: each page is an index range scan.
+        clauses, params = ["rowid > ?"], [parse_cursor(cursor)]
+        if user_id is not None:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if start_from is not None:
+            clauses.append("start_date >= ?")
+            params.append(start_from.isoformat())
+        if start_to is not None:
+            clauses.append("start_date <= ?")
+            params.append(start_to.isoformat())
+        sql = f"SELECT rowid, payload FROM plans WHERE {' AND '.join(clauses)} ORDER BY rowid LIMIT ?"
+        rows = self._connection().execute(sql, (*params, limit + 1)).fetchall()
+        next_cursor = str(rows[limit - 1][0]) if len(rows) > limit else None
+        return [plan_from_dict(json.loads(row[1])) for row in rows[:limit]], next_cursor
+
+    def save_booking(self, booking: BookingRecord) -> BookingRecord:
+        self.save_bookings([booking])
+        return booking
+
+    def save_bookings(
+        self, bookings: Iterable[BookingRecord], idempotency_key: Optional[str] = None
+    ) -> List[BookingRecord]:
+        records = list(bookings)
+        # One transaction: committed on success, rolled back if any row fails.
+        with self._connection() as conn:
+            conn.executemany(_UPSERT_BOOKING, [_booking_row(b) for b in records])
+            if idempotency_key is not None:
+                booking_ids = json.dumps([b.booking_id for b in records])
+                conn.execute(_COMPLETE_IDEMPOTENCY_KEY, (idempotency_key, booking_ids, time.time()))
+        return records
+
+    def claim_idempotency_key(self, idempotency_key: str) -> Tuple[bool, Optional[List[BookingRecord]]]:
+        now = time.time()
+        try:
+            with self._connection() as conn:
+                conn.execute(_CLAIM_IDEMPOTENCY_KEY, (idempotency_key, now))
+            return True, None
+        except sqlite3.IntegrityError:
+            pass  # claimed before, possibly by another process
+        with self._connection() as conn:
+            taken = conn.execute(
+                _TAKE_OVER_IDEMPOTENCY_KEY, (now, idempotency_key, now - self.claim_ttl_seconds)
+            ).rowcount
+        if taken:
+            return True, None
+        return False, self.get_idempotent_bookings(idempotency_key)
+
+    def release_idempotency_key(self, idempotency_key: str) -> None:
+        with self._connection() as conn:
+            conn.execute(_RELEASE_IDEMPOTENCY_KEY, (idempotency_key,))
+
+    def get_idempotent_bookings(self, idempotency_key: str) -> Optional[List[BookingRecord]]:
+        conn = self._connection()
+        row = conn.execute(_SELECT_IDEMPOTENCY_KEY, (idempotency_key,)).fetchone()
+        if row is None or row[0] == _PENDING:
+            return None
+        rows = [conn.execute(_SELECT_BOOKING, (b,)).fetchone() for b in json.loads(row[0])]
+        return [_booking_from_row(r) for r in rows if r is not None]
+
+    def list_bookings_for_trip(self, trip_id: str) -> List[BookingRecord]:
+        rows = self._connection().execute(_SELECT_BOOKINGS_FOR_TRIP, (trip_id,))
+        return [_booking_from_row(row) for row in rows]
+
+
+def _plan_row(plan: TripPlan) -> tuple:
+    body, etag = encode_plan_with_etag(plan)
+    return (plan.trip_id, plan.user_id, plan.start_date.isoformat(), body.decode("utf-8"), etag)
+
+
+def _booking_row(booking: BookingRecord) -> tuple:
+    return (
+        booking.booking_id,
+        booking.user_id,
+        booking.trip_id,
+        booking.type.value,
+        booking.status.value,
+        booking.provider,
+        booking.price,
+        booking.created_at.isoformat(),
+        booking.payment_status.value,
+        booking.reference,
+    )
+
+
+def _booking_from_row(row: tuple) -> BookingRecord:
+    return BookingRecord(
+        booking_id=row[0],
+        user_id=row[1],
+        trip_id=row[2],
+        type=BookingType(row[3]),
+        status=BookingStatus(row[4]),
+        provider=row[5],
+        price=row[6],
+        created_at=datetime.fromisoformat(row[7]),
+        payment_status=PaymentStatus(row[8]),
+        reference=row[9],
+    )
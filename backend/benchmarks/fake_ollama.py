@@ -0,0 +1,317 @@
+#!/usr/bin/env python
+"""
+A stand-in for Ollama's /api/chat that answers with schema-valid TripPlan JSON,
+so the OllamaPlannerBackend path can be load-tested without a GPU.
+
+    python -m benchmarks.fake_ollama --port 11434 --latency lognormal:-0.7,0.5 --invalid-json-rate 0.1
+
+Latency specs: fixed:S, uniform:LO,HI, exp:MEAN, lognormal:MU,SIGMA (seconds).
+Injected failures: invalid JSON content, plans missing required fields (the
+backend retries those once), HTTP 500s and dropped connections.
+GET /stats returns what was served so far.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+_INPUT_MARKER = "Input:\n"
+_TIMES_OF_DAY = ["morning", "afternoon", "evening"]
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """A sampler for a latency spec such as "uniform:0.2,1.5"; see the module docstring."""
+    kind, _, raw = spec.partition(":")
+    args = [float(v) for v in raw.split(",")] if raw else []
+    if kind == "fixed" and len(args) == 1:
+        return lambda rng: args[0]
+    if kind == "uniform" and len(args) == 2:
+        return lambda rng: rng.uniform(args[0], args[1])
+    if kind == "exp" and len(args) == 1:
+        return lambda rng: rng.expovariate(1.0 / args[0]) if args[0] > 0 else 0.0
+    if kind == "lognormal" and len(args) == 2:
+        return lambda rng: rng.lognormvariate(args[0], args[1])
+    raise ValueError(f"Unknown latency spec {spec!r}")
+
+
+@dataclass
+class FakeOllamaConfig:
+    latency: str = "fixed:0"
+    invalid_json_rate: float = 0.0
+    missing_fields_rate: float = 0.0
+    error_rate: float = 0.0  # HTTP 500
+    drop_rate: float = 0.0  # close the connection without a response
+    stream_chunk_chars: int = 64
+    seed: Optional[int] = None
+
+
+class FakeOllamaServer:
+    """Threaded HTTP server; use as a context manager or call start()/stop()."""
+
+    def __init__(self, config: Optional[FakeOllamaConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or FakeOllamaConfig()
+        self._sample_latency = parse_latency(self.config.latency)
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "ok": 0,
+            "streamed": 0,
+            "invalid_json": 0,
+            "missing_fields": 0,
+            "errors": 0,
+            "dropped": 0,
+        }
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def draw(self) -> Tuple[float, str]:
+        """Latency and outcome for one request: ok, invalid_json, missing_fields, error or dropped."""
+        config = self.config
+        with self._lock:
+            latency = max(0.0, self._sample_latency(self._rng))
+            roll = self._rng.random()
+        outcome = "ok"
+        for name, rate in (
+            ("dropped", config.drop_rate),
+            ("error", config.error_rate),
+            ("invalid_json", config.invalid_json_rate),
+            ("missing_fields", config.missing_fields_rate),
+        ):
+            if roll < rate:
+                outcome = name
+                break
+            roll -= rate
+        return latency, outcome
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+
+def _make_handler(server: FakeOllamaServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args) -> None:  # noqa: A002 - quiet by default
+            pass
+
+        def do_GET(self) -> None:
+            if self.path == "/stats":
+                self._send_json(200, server.snapshot())
+            elif self.path == "/api/tags":
+                self._send_json(200, {"models": [{"name": "fake"}]})
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self) -> None:
+            if self.path != "/api/chat":
+                self._send_json(404, {"error": "not found"})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                request = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError:
+                self._send_json(400, {"error": "invalid request body"})
+                return
+            server.count("requests")
+            latency, outcome = server.draw()
+            time.sleep(latency)
+            if outcome == "dropped":
+                server.count("dropped")
+                self.close_connection = True
+                self.connection.shutdown(socket.SHUT_RDWR)
+                return
+            if outcome == "error":
+                server.count("errors")
+                self._send_json(500, {"error": "injected failure"})
+                return
+
+            plan = plan_for_request(request.get("messages", []))
+            if outcome == "missing_fields":
+                server.count("missing_fields")
+                plan.pop("days")
+                content = json.dumps(plan)
+            elif outcome == "invalid_json":
+                server.count("invalid_json")
+                content = "Sure! Here is your plan: " + json.dumps(plan)[:80]
+            else:
+                server.count("ok")
+                content = json.dumps(plan)
+
+            model = request.get("model", "fake")
+            if request.get("stream", True):
+                server.count("streamed")
+                self._stream(model, content)
+            else:
+                self._send_json(200, _chat_response(model, content, done=True))
+
+        def _stream(self, model: str, content: str) -> None:
+            # Ollama streams NDJSON: one message fragment per line, then a done marker.
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            size = max(1, server.config.stream_chunk_chars)
+            for start in range(0, len(content), size):
+                self._write_chunk(_chat_response(model, content[start : start + size], done=False))
+            self._write_chunk(_chat_response(model, "", done=True))
+            self.wfile.write(b"0\r\n\r\n")
+
+        def _write_chunk(self, payload: dict) -> None:
+            line = json.dumps(payload).encode("utf-8") + b"\n"
+            self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+
+        def _send_json(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def _chat_response(model: str, content: str, done: bool) -> dict:
+    response = {
+        "model": model,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "message": {"role": "assistant", "content": content},
+        "done": done,
+    }
+    if done:
+        response["done_reason"] = "stop"
+    return response
+
+
+def plan_for_request(messages: List[dict]) -> dict:
+    """
+    A TripPlan dict for the prompt OllamaPlannerBackend builds: the destination,
+    catalog activities, first free calendar window and budget come from the
+    JSON after "Input:" in the last user message that has one.
+    """
+    user_block: dict = {}
+    for message in reversed(messages):
+        content = message.get("content", "")
+        if message.get("role") == "user" and _INPUT_MARKER in content:
+            try:
+                user_block = json.loads(content.split(_INPUT_MARKER, 1)[1])
+            except json.JSONDecodeError:
+                pass
+            break
+    preferences = user_block.get("preferences", {})
+    catalog = user_block.get("catalog", {})
+    destination = next(iter(catalog), None) or next(iter(preferences.get("destination_preferences", [])), "Lisbon")
+    entry = catalog.get(destination) or {}
+    min_days = int(preferences.get("min_duration_days") or 3)
+    max_days = int(preferences.get("max_duration_days") or max(min_days, 5))
+
+    start = date.today() + timedelta(days=1)
+    day_count = max_days
+    for raw_start, raw_end in user_block.get("calendar_free", []):
+        free_start, free_end = date.fromisoformat(raw_start), date.fromisoformat(raw_end)
+        length = (free_end - free_start).days + 1
+        if length >= min_days:
+            start, day_count = free_start, min(length, max_days)
+            break
+
+    pool = entry.get("activities") or [{"title": f"{destination} old town", "description": "Guided walk.", "price": 25}]
+    days = []
+    for offset in range(day_count):
+        activities = []
+        for slot in range(2):
+            activity = pool[(offset * 2 + slot) % len(pool)]
+            activities.append(
+                {
+                    "time_of_day": _TIMES_OF_DAY[slot],
+                    "title": activity.get("title", "Activity"),
+                    "description": activity.get("description", ""),
+                    "cost_estimate": float(activity.get("price", activity.get("cost_estimate", 30.0))),
+                    "booking_required": bool(activity.get("booking_required", False)),
+                }
+            )
+        days.append({"date": (start + timedelta(days=offset)).isoformat(), "activities": activities})
+
+    flight = float(entry.get("flight", {}).get("price", 400.0))
+    hotel = float(entry.get("hotel", {}).get("price_per_night", 120.0)) * day_count
+    activity_total = sum(a["cost_estimate"] for d in days for a in d["activities"])
+    return {
+        "destination": destination,
+        "start_date": days[0]["date"],
+        "end_date": days[-1]["date"],
+        "days": days,
+        "budget_summary": {
+            "total_estimated": flight + hotel + activity_total,
+            "breakdown": {"flight": flight, "hotel": hotel, "activities": activity_total},
+        },
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", default="fixed:0", help="per-request latency spec (seconds)")
+    parser.add_argument("--invalid-json-rate", type=float, default=0.0)
+    parser.add_argument("--missing-fields-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    config = FakeOllamaConfig(
+        latency=args.latency,
+        invalid_json_rate=args.invalid_json_rate,
+        missing_fields_rate=args.missing_fields_rate,
+        error_rate=args.error_rate,
+        drop_rate=args.drop_rate,
+        seed=args.seed,
+    )
+    server = FakeOllamaServer(config, host=args.host, port=args.port)
+    print(f"fake Ollama listening on {server.url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
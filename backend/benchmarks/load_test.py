@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+"""
+Drive POST /plan, GET /plan/{id} and POST /plan/{id}/book at a fixed
+concurrency and report throughput and p50/p95/p99 latency per endpoint.
+
+Against a running backend:
+    python -m benchmarks.load_test --base-url http://localhost:8000 --concurrency 16 --duration 60
+
+End to end on one machine: start a fake Ollama and the backend (LLM_PROVIDER=ollama)
+as a subprocess, then load it:
+    python -m benchmarks.load_test --spawn --latency lognormal:-1,0.5 --invalid-json-rate 0.1
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import requests
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.fake_ollama import FakeOllamaConfig, FakeOllamaServer
+
+DESTINATIONS = ["Lisbon", "Bali", "Paris", "Tokyo"]
+STYLES = ["relaxing", "adventure", "culture", "food"]
+
+
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Dict[str, int] = field(default_factory=dict)  # "200", "404", "error" ...
+
+    def record(self, seconds: float, status: str) -> None:
+        self.latencies.append(seconds)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    @property
+    def errors(self) -> int:
+        return sum(n for status, n in self.statuses.items() if not status.startswith("2") and status != "304")
+
+
+class LoadRecorder:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.endpoints: Dict[str, EndpointStats] = {}
+
+    def record(self, endpoint: str, seconds: float, status: str) -> None:
+        with self._lock:
+            self.endpoints.setdefault(endpoint, EndpointStats()).record(seconds, status)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of values (0 for none)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))  # ceil without floats drifting
+    return ordered[int(rank) - 1]
+
+
+def random_preferences(rng: random.Random) -> dict:
+    min_days = rng.randint(2, 5)
+    return {
+        "destination_preferences": rng.sample(DESTINATIONS, rng.randint(1, 3)),
+        "min_duration_days": min_days,
+        "max_duration_days": min_days + rng.randint(0, 4),
+        "budget_max": rng.choice([1200, 2000, 3500]),
+        "travel_style": rng.choice(STYLES),
+    }
+
+
+def run_load(
+    base_url: str,
+    concurrency: int = 8,
+    duration: float = 30.0,
+    iterations: Optional[int] = None,
+    gets_per_plan: int = 3,
+    book_ratio: float = 0.5,
+    timeout: float = 60.0,
+    seed: int = 0,
+) -> dict:
+    """
+    Each worker repeats: create a plan, fetch it gets_per_plan times (revalidating
+    with its ETag after the first fetch) and book it with probability book_ratio.
+    Stops after duration seconds, or after iterations plans when given.
+    """
+    recorder = LoadRecorder()
+    deadline = time.monotonic() + duration
+    remaining = [iterations] if iterations is not None else None
+    counter_lock = threading.Lock()
+
+    def next_iteration() -> bool:
+        if remaining is None:
+            return time.monotonic() < deadline
+        with counter_lock:
+            if remaining[0] <= 0:
+                return False
+            remaining[0] -= 1
+            return True
+
+    def call(session: requests.Session, endpoint: str, method: str, url: str, **kwargs) -> Optional[requests.Response]:
+        started = time.perf_counter()
+        try:
+            response = session.request(method, url, timeout=timeout, **kwargs)
+        except requests.RequestException:
+            recorder.record(endpoint, time.perf_counter() - started, "error")
+            return None
+        recorder.record(endpoint, time.perf_counter() - started, str(response.status_code))
+        return response
+
+    def worker(index: int) -> None:
+        rng = random.Random(seed * 1000 + index)
+        with requests.Session() as session:
+            while next_iteration():
+                created = call(session, "POST /plan", "POST", f"{base_url}/plan/", json=random_preferences(rng))
+                if created is None or created.status_code != 200:
+                    continue
+                trip_id = created.json()["plan"]["trip_id"]
+                etag = None
+                for _ in range(gets_per_plan):
+                    headers = {"If-None-Match": etag} if etag else {}
+                    fetched = call(session, "GET /plan/{id}", "GET", f"{base_url}/plan/{trip_id}", headers=headers)
+                    if fetched is not None:
+                        etag = fetched.headers.get("ETag") or etag
+                if rng.random() < book_ratio:
+                    call(session, "POST /plan/{id}/book", "POST", f"{base_url}/plan/{trip_id}/book")
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    elapsed = time.monotonic() - started
+    return summarize(recorder, elapsed, concurrency)
+
+
+def summarize(recorder: LoadRecorder, elapsed: float, concurrency: int) -> dict:
+    endpoints = {}
+    for name, stats in sorted(recorder.endpoints.items()):
+        endpoints[name] = {
+            "requests": len(stats.latencies),
+            "errors": stats.errors,
+            "statuses": dict(sorted(stats.statuses.items())),
+            "throughput_rps": len(stats.latencies) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(stats.latencies, 50) * 1e3,
+            "p95_ms": percentile(stats.latencies, 95) * 1e3,
+            "p99_ms": percentile(stats.latencies, 99) * 1e3,
+            "max_ms": max(stats.latencies, default=0.0) * 1e3,
+        }
+    total = sum(e["requests"] for e in endpoints.values())
+    return {
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "requests": total,
+        "throughput_rps": total / elapsed if elapsed else 0.0,
+        "endpoints": endpoints,
+    }
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"{report['requests']} requests in {report['elapsed_s']:.1f}s at concurrency {report['concurrency']}"
+        f" ({report['throughput_rps']:.1f} req/s)"
+    )
+    print(f"{'endpoint':<22}{'reqs':>7}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, e in report["endpoints"].items():
+        print(
+            f"{name:<22}{e['requests']:>7}{e['errors']:>8}{e['throughput_rps']:>9.1f}"
+            f"{e['p50_ms']:>10.1f}{e['p95_ms']:>10.1f}{e['p99_ms']:>10.1f}"
+        )
+    if "fake_ollama" in report:
+        print("fake Ollama: " + ", ".join(f"{k}={v}" for k, v in report["fake_ollama"].items()))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def spawn_backend(env: Dict[str, str], log_path: Optional[Path] = None, startup_timeout: float = 30.0) -> Iterator[str]:
+    """Run `uvicorn main:app` in a subprocess with env added; yields its base URL."""
+    port = _free_port()
+    log = log_path.open("ab") if log_path else subprocess.DEVNULL
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env={**os.environ, **env},
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"backend exited with status {process.returncode}")
+            try:
+                if requests.get(f"{base_url}/health", timeout=1).ok:
+                    break
+            except requests.RequestException:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("backend did not become healthy in time")
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        if log_path:
+            log.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    parser.add_argument("--iterations", type=int, help="stop after this many plans instead of after --duration")
+    parser.add_argument("--gets-per-plan", type=int, default=3)
+    parser.add_argument("--book-ratio", type=float, default=0.5)
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request client timeout")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="also write the report here")
+    spawn = parser.add_argument_group("spawned stack (--spawn)")
+    spawn.add_argument("--spawn", action="store_true", help="start a fake Ollama and the backend locally")
+    spawn.add_argument("--latency", default="lognormal:-1.2,0.5", help="fake Ollama latency spec")
+    spawn.add_argument("--invalid-json-rate", type=float, default=0.0)
+    spawn.add_argument("--missing-fields-rate", type=float, default=0.0)
+    spawn.add_argument("--error-rate", type=float, default=0.0)
+    spawn.add_argument("--drop-rate", type=float, default=0.0)
+    spawn.add_argument("--backend-log", type=Path, help="append the backend's output here (default: discarded)")
+    args = parser.parse_args(argv)
+
+    load = dict(
+        concurrency=args.concurrency,
+        duration=args.duration,
+        iterations=args.iterations,
+        gets_per_plan=args.gets_per_plan,
+        book_ratio=args.book_ratio,
+        timeout=args.timeout,
+        seed=args.seed,
+    )
+    if args.spawn:
+        config = FakeOllamaConfig(
+            latency=args.latency,
+            invalid_json_rate=args.invalid_json_rate,
+            missing_fields_rate=args.missing_fields_rate,
+            error_rate=args.error_rate,
+            drop_rate=args.drop_rate,
+            seed=args.seed,
+        )
+        with FakeOllamaServer(config) as fake:
+            env = {"LLM_PROVIDER": "ollama", "OLLAMA_HOST": fake.url, "OLLAMA_MODEL": "fake"}
+            with spawn_backend(env, log_path=args.backend_log) as base_url:
+                report = run_load(base_url, **load)
+            report["fake_ollama"] = fake.snapshot()
+    else:
+        report = run_load(args.base_url.rstrip("/"), **load)
+
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
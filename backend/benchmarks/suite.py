@@ -0,0 +1,299 @@
+#!/usr/bin/env python
+"""
+Benchmark the planning hot paths on synthetic data and compare with a stored
+baseline. Exits with status 1 when a case regresses beyond its threshold.
+
+    python -m benchmarks.suite                      # compare with benchmarks/baseline.json
+    python -m benchmarks.suite --update-baseline    # record a new baseline
+    python -m benchmarks.suite --scale small --only rag_search
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.core.metrics import span
+from app.llm.tools.calendar_tool import CalendarTool
+from app.llm.tools.destination_catalog import DestinationCatalog
+from app.llm.tools.hotel_aggregator import CatalogHotelTool, HotelAggregator
+from app.llm.tools.rag_store import RAGTool
+from app.llm.tools.search_tool import SearchTool
+from app.models.schemas import Preferences, TripPlanSchema
+from app.rag.destination_rules import DestinationMatcher
+from app.rag.wiki_activities import detect_destination
+from app.services.planning_service import PlanningService
+from app.storage.repository import InMemoryRepository
+from benchmarks import synthetic
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_THRESHOLDS = {"max_slowdown": 0.30, "max_memory_growth": 0.50}
+# Peak-memory changes smaller than this are noise, whatever the ratio.
+_MEMORY_SLACK_KIB = 64.0
+
+
+@dataclass(frozen=True)
+class Scale:
+    destinations: int
+    rag_docs: int
+    calendar_events: int
+    trip_days: int
+    wiki_docs: int
+
+
+SCALES: Dict[str, Scale] = {
+    "small": Scale(destinations=20, rag_docs=50, calendar_events=100, trip_days=14, wiki_docs=200),
+    "default": Scale(destinations=200, rag_docs=2000, calendar_events=5000, trip_days=30, wiki_docs=2000),
+    "large": Scale(destinations=2000, rag_docs=20000, calendar_events=50000, trip_days=90, wiki_docs=20000),
+}
+
+
+@dataclass
+class BenchResult:
+    name: str
+    ops: int  # units of work per call, e.g. queries or docs
+    seconds: float  # best call out of the repeats
+    ops_per_sec: float
+    peak_kib: float  # tracemalloc peak during one call
+
+
+# A case builds its data and returns the call to time plus the ops per call.
+Workload = Tuple[Callable[[], object], int]
+CASES: Dict[str, Callable[[Scale, Path], Workload]] = {}
+
+
+def case(name: str):
+    def register(setup: Callable[[Scale, Path], Workload]) -> Callable[[Scale, Path], Workload]:
+        CASES[name] = setup
+        return setup
+
+    return register
+
+
+@case("plan_trip")
+def _plan_trip(scale: Scale, workdir: Path) -> Workload:
+    names = synthetic.destination_names(scale.destinations)
+    service = PlanningService(repository=InMemoryRepository())
+    service.search_tool = SearchTool(DestinationCatalog(synthetic.make_catalog(names)))
+    service.hotel_tool = HotelAggregator([CatalogHotelTool(service.search_tool)])
+    service.rag_tool = RAGTool(store_path=workdir)
+    service.rag_tool.add_documents(synthetic.make_rag_docs(scale.rag_docs, names))
+    # A long calendar history before today; the planning window itself stays open.
+    history_start = date.today() - timedelta(days=scale.calendar_events * 10)
+    busy = [r for r in synthetic.make_busy_ranges(scale.calendar_events, history_start) if r[1] < date.today()]
+    service.calendar_tool.seed_busy_ranges("bench-user", busy)
+    preferences = Preferences(
+        destination_preferences=names[:5],
+        min_duration_days=min(7, scale.trip_days),
+        max_duration_days=scale.trip_days,
+        budget_max=50_000,
+    )
+    return (lambda: service.plan_trip("bench-user", preferences)), 1
+
+
+@case("rag_load_dir")
+def _rag_load_dir(scale: Scale, workdir: Path) -> Workload:
+    names = synthetic.destination_names(scale.destinations)
+    docs_dir = synthetic.write_rag_dir(workdir / "rag", synthetic.make_rag_docs(scale.rag_docs, names))
+    return (lambda: RAGTool(store_path=docs_dir).load_dir()), scale.rag_docs
+
+
+@case("rag_search")
+def _rag_search(scale: Scale, workdir: Path) -> Workload:
+    names = synthetic.destination_names(scale.destinations)
+    rag = RAGTool(store_path=workdir)
+    rag.add_documents(synthetic.make_rag_docs(scale.rag_docs, names))
+    queries = names[:100]
+
+    def run() -> None:
+        for query in queries:
+            rag.search(query, top_k=5)
+
+    return run, len(queries)
+
+
+@case("calendar_free_ranges")
+def _calendar_free_ranges(scale: Scale, workdir: Path) -> Workload:
+    start = date(2020, 1, 1)
+    busy = synthetic.make_busy_ranges(scale.calendar_events, start)
+    calendar = CalendarTool()
+    calendar.seed_busy_ranges("bench-user", busy)
+    end = busy[-1][1] + timedelta(days=30)
+    return (lambda: calendar.get_free_date_ranges("bench-user", start, end)), scale.calendar_events
+
+
+@case("parse_ics")
+def _parse_ics(scale: Scale, workdir: Path) -> Workload:
+    content = synthetic.make_ics(synthetic.make_busy_ranges(scale.calendar_events, date(2020, 1, 1)))
+    return (lambda: CalendarTool.parse_ics_content(content)), scale.calendar_events
+
+
+@case("trip_plan_schema")
+def _trip_plan_schema(scale: Scale, workdir: Path) -> Workload:
+    plan = synthetic.make_trip_plan(scale.trip_days)
+    return (lambda: TripPlanSchema.from_domain(plan)), scale.trip_days
+
+
+@case("detect_destination")
+def _detect_destination(scale: Scale, workdir: Path) -> Workload:
+    names = synthetic.destination_names(scale.destinations)
+    matcher = DestinationMatcher(synthetic.make_destination_rules(names))
+    docs = synthetic.make_wiki_docs(scale.wiki_docs, names)
+
+    def run() -> None:
+        for doc in docs:
+            detect_destination(doc, matcher)
+
+    return run, len(docs)
+
+
+@case("metrics_span")
+def _metrics_span(scale: Scale, workdir: Path) -> Workload:
+    spans = 10_000
+
+    def run() -> None:
+        for _ in range(spans):
+            with span("bench"):
+                pass
+
+    return run, spans
+
+
+def run_case(name: str, scale: Scale, repeat: int = 5) -> BenchResult:
+    with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as tmp:
+        fn, ops = CASES[name](scale, Path(tmp))
+        fn()  # warm-up: lazy loads, caches, first allocations
+        best = float("inf")
+        for _ in range(repeat):
+            gc.collect()
+            started = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - started)
+        # Memory is measured on a separate call: tracemalloc slows allocation down.
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return BenchResult(name=name, ops=ops, seconds=best, ops_per_sec=ops / best, peak_kib=peak / 1024)
+
+
+def compare(results: List[BenchResult], baseline: dict) -> List[str]:
+    """Regressions of results against baseline, as readable lines; empty when all pass."""
+    thresholds = baseline.get("thresholds", {})
+    defaults = {**DEFAULT_THRESHOLDS, **thresholds.get("default", {})}
+    regressions = []
+    for result in results:
+        before = baseline.get("results", {}).get(result.name)
+        if before is None:
+            continue
+        limits = {**defaults, **thresholds.get(result.name, {})}
+        slowdown = 1 - result.ops_per_sec / before["ops_per_sec"]
+        if slowdown > limits["max_slowdown"]:
+            regressions.append(
+                f"{result.name}: {result.ops_per_sec:,.0f} ops/s vs {before['ops_per_sec']:,.0f}"
+                f" ({slowdown:.0%} slower, limit {limits['max_slowdown']:.0%})"
+            )
+        growth_kib = result.peak_kib - before["peak_kib"]
+        if growth_kib > _MEMORY_SLACK_KIB and growth_kib / max(before["peak_kib"], 1.0) > limits["max_memory_growth"]:
+            regressions.append(
+                f"{result.name}: peak {result.peak_kib:,.0f} KiB vs {before['peak_kib']:,.0f} KiB"
+                f" (limit +{limits['max_memory_growth']:.0%})"
+            )
+    return regressions
+
+
+def load_baseline(path: Path) -> Optional[dict]:
+    if not path.exists():
+        return None
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_baseline(path: Path, scale_name: str, results: List[BenchResult], previous: Optional[dict]) -> None:
+    # Results of cases not re-run, and hand-tuned thresholds, are carried over.
+    recorded = dict(previous.get("results", {})) if previous and previous.get("scale") == scale_name else {}
+    recorded.update({r.name: {"ops_per_sec": round(r.ops_per_sec, 1), "peak_kib": round(r.peak_kib, 1)} for r in results})
+    data = {
+        "scale": scale_name,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "thresholds": (previous or {}).get("thresholds", {"default": DEFAULT_THRESHOLDS}),
+        "results": dict(sorted(recorded.items())),
+    }
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="default")
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES), help="run just these cases")
+    parser.add_argument("--repeat", type=int, default=5, help="timed calls per case; the best one counts")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="record these results as the baseline")
+    parser.add_argument("--max-slowdown", type=float, help="override the baseline's default throughput threshold")
+    parser.add_argument("--max-memory-growth", type=float, help="override the baseline's default memory threshold")
+    parser.add_argument("--json", type=Path, help="also write the results here")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+
+    scale = SCALES[args.scale]
+    results = []
+    for name in args.only or CASES:
+        result = run_case(name, scale, repeat=args.repeat)
+        results.append(result)
+        print(
+            f"{name:>22}: {result.ops_per_sec:>12,.1f} ops/s  {result.seconds * 1e3:>9.2f} ms/call"
+            f"  peak {result.peak_kib:>10,.0f} KiB"
+        )
+    if args.json:
+        args.json.write_text(json.dumps([asdict(r) for r in results], indent=2) + "\n", encoding="utf-8")
+
+    baseline = load_baseline(args.baseline)
+    if args.update_baseline:
+        write_baseline(args.baseline, args.scale, results, baseline)
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if baseline is None:
+        print(f"no baseline at {args.baseline}; run with --update-baseline to record one")
+        return 0
+    if baseline.get("scale") != args.scale:
+        print(f"baseline was recorded at scale {baseline.get('scale')!r}, not {args.scale!r}; not comparing")
+        return 0
+    overrides = {
+        key: value
+        for key, value in (("max_slowdown", args.max_slowdown), ("max_memory_growth", args.max_memory_growth))
+        if value is not None
+    }
+    if overrides:
+        thresholds = dict(baseline.get("thresholds", {}))
+        thresholds["default"] = {**thresholds.get("default", {}), **overrides}
+        baseline = {**baseline, "thresholds": thresholds}
+    regressions = compare(results, baseline)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print(f"no regressions against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
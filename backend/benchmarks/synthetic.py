@@ -0,0 +1,168 @@
+"""Seeded synthetic data for the benchmark suite; the same seed gives the same data."""
+from __future__ import annotations
+
+import random
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from app.llm.tools.rag_store import RAGDocument
+from app.models.domain import Activity, BudgetSummary, DayPlan, TripPlan
+from app.rag.destination_rules import DestinationRule
+from app.rag.wiki_activities import WikiDoc
+
+TIMES_OF_DAY = ["morning", "afternoon", "evening"]
+_SYLLABLES = ["ka", "lo", "mi", "san", "ta", "ri", "ven", "do", "bel", "qui", "na", "por", "tu", "zel", "ar", "mon"]
+_WORDS = [
+    "harbour", "market", "castle", "museum", "garden", "old", "town", "river", "food", "walk",
+    "tour", "beach", "temple", "night", "view", "local", "street", "art", "hill", "tram",
+]
+
+
+def destination_names(count: int, seed: int = 0) -> List[str]:
+    """count distinct, pronounceable place names."""
+    rng = random.Random(seed)
+    names: Dict[str, None] = {}
+    while len(names) < count:
+        name = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        names.setdefault(f"{name}{len(names)}" if name in names else name, None)
+    return list(names)
+
+
+def make_catalog(names: Sequence[str], activities_per_destination: int = 8, seed: int = 0) -> Dict[str, dict]:
+    """Entries shaped like app/data/destinations.json."""
+    rng = random.Random(seed)
+    catalog: Dict[str, dict] = {}
+    for name in names:
+        catalog[name] = {
+            "flight": {
+                "provider": "mock-air",
+                "price": round(rng.uniform(80, 1200), 2),
+                "duration_hours": rng.randint(1, 16),
+            },
+            "hotel": {"name": f"{name} Central", "price_per_night": round(rng.uniform(40, 400), 2)},
+            "activities": [
+                {
+                    "title": f"{name} {_sentence(rng, 2)} {i}",
+                    "description": _sentence(rng, 8),
+                    "price": round(rng.uniform(0, 150), 2),
+                    "booking_required": rng.random() < 0.3,
+                    "time_of_day": rng.choice(TIMES_OF_DAY),
+                }
+                for i in range(activities_per_destination)
+            ],
+        }
+    return catalog
+
+
+def make_rag_docs(count: int, names: Sequence[str], lines_per_doc: int = 6, seed: int = 0) -> List[RAGDocument]:
+    """Docs of 'Title | Description | Cost | Time' lines, as build_wiki_activities.py writes them."""
+    rng = random.Random(seed)
+    docs = []
+    for i in range(count):
+        name = names[i % len(names)]
+        lines = [
+            f"{name} {_sentence(rng, 2)} | {_sentence(rng, 10)}"
+            f" | {rng.randint(0, 120)} EUR | {rng.choice(TIMES_OF_DAY)}"
+            for _ in range(lines_per_doc)
+        ]
+        docs.append(RAGDocument(doc_id=f"{name.lower()}_{i}.txt", text="\n".join(lines)))
+    return docs
+
+
+def write_rag_dir(path: Path, docs: Sequence[RAGDocument]) -> Path:
+    """One .txt file per doc, the layout RAGTool.load_dir reads."""
+    path.mkdir(parents=True, exist_ok=True)
+    for doc in docs:
+        (path / doc.doc_id).write_text(doc.text, encoding="utf-8")
+    return path
+
+
+def make_busy_ranges(count: int, start: date, seed: int = 0) -> List[Tuple[date, date]]:
+    """count sorted, non-overlapping busy blocks of 1-3 days, 1-10 days apart, from start on."""
+    rng = random.Random(seed)
+    ranges = []
+    current = start
+    for _ in range(count):
+        current += timedelta(days=rng.randint(1, 10))
+        end = current + timedelta(days=rng.randint(0, 2))
+        ranges.append((current, end))
+        current = end + timedelta(days=1)
+    return ranges
+
+
+def make_ics(ranges: Sequence[Tuple[date, date]]) -> str:
+    """A VCALENDAR with one all-day VEVENT per busy range (DTEND non-inclusive)."""
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//bench//EN"]
+    for i, (start, end) in enumerate(ranges):
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:bench-{i}",
+            f"DTSTART;VALUE=DATE:{start:%Y%m%d}",
+            f"DTEND;VALUE=DATE:{end + timedelta(days=1):%Y%m%d}",
+            f"SUMMARY:Busy {i}",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(lines)
+
+
+def make_trip_plan(days: int, activities_per_day: int = 4, seed: int = 0) -> TripPlan:
+    rng = random.Random(seed)
+    start = date(2025, 1, 1)
+    return TripPlan(
+        trip_id="bench-trip",
+        user_id="demo-user",
+        destination="Lisbon",
+        start_date=start,
+        end_date=start + timedelta(days=days - 1),
+        days=[
+            DayPlan(
+                date=start + timedelta(days=d),
+                activities=[
+                    Activity(
+                        TIMES_OF_DAY[a % len(TIMES_OF_DAY)],
+                        _sentence(rng, 3).title(),
+                        _sentence(rng, 12),
+                        round(rng.uniform(0, 150), 2),
+                        rng.random() < 0.3,
+                    )
+                    for a in range(activities_per_day)
+                ],
+            )
+            for d in range(days)
+        ],
+        budget_summary=BudgetSummary(2500.0, {"flight": 450.0, "hotel": 1200.0, "activities": 850.0}),
+    )
+
+
+def make_destination_rules(names: Sequence[str]) -> List[DestinationRule]:
+    return [
+        DestinationRule(
+            name=name,
+            anchor=name.lower(),
+            positive=(f"{name.lower()} old town", f"city of {name.lower()}"),
+            negative=(f"{name.lower()} county",),
+            keywords=(f"{name.lower()} harbour", f"{name.lower()} museum"),
+        )
+        for name in names
+    ]
+
+
+def make_wiki_docs(count: int, names: Sequence[str], seed: int = 0) -> List[WikiDoc]:
+    """Articles of ~1.5k characters; about half mention one of names."""
+    rng = random.Random(seed)
+    docs = []
+    for i in range(count):
+        body = [_sentence(rng, 20) for _ in range(12)]
+        title = _sentence(rng, 2).title()
+        if rng.random() < 0.5:
+            name = rng.choice(names)
+            body[rng.randrange(len(body))] += f" in the city of {name}, by the {name} harbour"
+            title = f"{title} ({name})"
+        docs.append(WikiDoc(id=str(i), title=title, url=f"https://example.org/wiki?curid={i}", text="\n\n".join(body)))
+    return docs
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
@@ -1,10 +1,15 @@
-from fastapi import FastAPI
+import time
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api import routes_health, routes_plan, routes_booking
+from app.api import routes_admin, routes_booking, routes_export, routes_health, routes_metrics, routes_plan
 from app.core.config import settings
 from app.core.logging import configure_logging
-from app.storage.repository import InMemoryRepository
+from app.core.metrics import HTTP_REQUEST_SECONDS
+from app.core.profiling import create_request_profiler, instrument_routes
+from app.services.batch_planning_service import BatchPlanningService
+from app.storage.repository import create_repository
 
 
 def create_app() -> FastAPI:
@@ -19,7 +24,20 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
-    repository = InMemoryRepository()
+    @app.middleware("http")
+    async def _record_request_latency(request: Request, call_next):
+        started = time.perf_counter()
+        status = 500  # unless call_next returns: an unhandled error becomes a 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # Label by route template (/plan/{trip_id}), not the raw path, to keep cardinality bounded.
+            route = getattr(request.scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_SECONDS.labels(request.method, route, str(status)).observe(time.perf_counter() - started)
+
+    repository = create_repository(settings)
 
     app.include_router(routes_health.router, tags=["health"])
     app.include_router(
@@ -31,10 +49,29 @@ def create_app() -> FastAPI:
         tags=["booking"],
         dependencies=[],
     )
+    app.include_router(routes_export.router, tags=["export"])
+    app.include_router(routes_metrics.router, tags=["metrics"])
+    app.include_router(routes_admin.router, prefix="/admin", tags=["admin"], include_in_schema=False)
+
+    # Off unless ADMIN_TOKEN, PROFILE_SAMPLE_RATE or PROFILE_SLOW_SECONDS is set.
+    profiler = create_request_profiler(settings)
+    app.state.profiler = profiler
+    if profiler is not None:
+        instrument_routes(app.routes)
+        app.middleware("http")(profiler.dispatch)
 
     # Inject repository into state for dependencies
     app.state.repository = repository
     app.state.settings = settings
+    app.state.batch_planning_service = BatchPlanningService(
+        max_workers=settings.batch_workers,
+        persist_chunk_size=settings.batch_persist_chunk_size,
+    )
+
+    @app.on_event("shutdown")
+    def _shutdown_batch_pool() -> None:
+        app.state.batch_planning_service.shutdown()
+
     return app
 
 
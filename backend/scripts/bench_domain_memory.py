@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+"""
+Measure the memory held by an in-memory plan store with ~1M activities, using
+the slotted/interned domain models versus plain __dict__ dataclasses.
+"""
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from app.storage.repository import InMemoryRepository
+from app.storage.serialization import plan_from_dict
+
+TIMES_OF_DAY = ["morning", "afternoon", "evening"]
+DESTINATIONS = ["Lisbon", "Bali", "Paris", "Tokyo"]
+
+
+# The models as they were before slots/interning, for comparison.
+@dataclass
+class LegacyActivity:
+    time_of_day: str
+    title: str
+    description: str
+    cost_estimate: float
+    booking_required: bool
+
+
+@dataclass
+class LegacyDayPlan:
+    date: date
+    activities: List[LegacyActivity] = field(default_factory=list)
+
+
+@dataclass
+class LegacyBudgetSummary:
+    total_estimated: float
+    breakdown: Dict[str, float]
+
+
+@dataclass
+class LegacyTripPlan:
+    trip_id: str
+    user_id: str
+    destination: str
+    start_date: date
+    end_date: date
+    days: List[LegacyDayPlan]
+    budget_summary: LegacyBudgetSummary
+
+
+def legacy_plan_from_dict(data: dict) -> LegacyTripPlan:
+    return LegacyTripPlan(
+        trip_id=data["trip_id"],
+        user_id=data["user_id"],
+        destination=data["destination"],
+        start_date=date.fromisoformat(data["start_date"]),
+        end_date=date.fromisoformat(data["end_date"]),
+        days=[
+            LegacyDayPlan(
+                date=date.fromisoformat(day["date"]),
+                activities=[LegacyActivity(**a) for a in day["activities"]],
+            )
+            for day in data["days"]
+        ],
+        budget_summary=LegacyBudgetSummary(**data["budget_summary"]),
+    )
+
+
+def plan_payload(i: int, days: int, per_day: int) -> str:
+    """JSON for one plan; decoding it gives fresh strings, as the storage paths do."""
+    start = date(2025, 1, 1) + timedelta(days=i % 300)
+    return json.dumps(
+        {
+            "trip_id": "",
+            "user_id": f"user-{i % 500}",
+            "destination": DESTINATIONS[i % len(DESTINATIONS)],
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=days - 1)).isoformat(),
+            "days": [
+                {
+                    "date": (start + timedelta(days=d)).isoformat(),
+                    "activities": [
+                        {
+                            "time_of_day": TIMES_OF_DAY[a % len(TIMES_OF_DAY)],
+                            "title": f"Activity {a}",
+                            "description": "Walk, eat and look around.",
+                            "cost_estimate": 42.5,
+                            "booking_required": a % 2 == 0,
+                        }
+                        for a in range(per_day)
+                    ],
+                }
+                for d in range(days)
+            ],
+            "budget_summary": {"total_estimated": 1234.5, "breakdown": {"flight": 450.0, "hotel": 640.0}},
+        }
+    )
+
+
+def measure(build: Callable[[dict], object], plans: int, days: int, per_day: int) -> int:
+    # A few hundred distinct payloads are enough; trip ids are made unique below.
+    payloads = [plan_payload(i, days, per_day) for i in range(min(plans, 1200))]
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    repository = InMemoryRepository()
+    batch = []
+    for i in range(plans):
+        data = json.loads(payloads[i % len(payloads)])
+        data["trip_id"] = f"trip-{i}"
+        batch.append(build(data))
+        if len(batch) == 1000:
+            repository.save_plans(batch)
+            batch = []
+    repository.save_plans(batch)
+    del batch
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del repository
+    return current - baseline
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--activities", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=10)
+    parser.add_argument("--per-day", type=int, default=5)
+    args = parser.parse_args()
+
+    plans = max(1, args.activities // (args.days * args.per_day))
+    total = plans * args.days * args.per_day
+    print(f"{plans} plans, {total} activities")
+    results = {}
+    for name, build in [("plain dataclass", legacy_plan_from_dict), ("slotted+interned", plan_from_dict)]:
+        results[name] = measure(build, plans, args.days, args.per_day)
+        print(f"{name:>17}: {results[name] / 2**20:8.1f} MiB ({results[name] / total:6.1f} B/activity)")
+    saved = 1 - results["slotted+interned"] / results["plain dataclass"]
+    print(f"{'reduction':>17}: {saved:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
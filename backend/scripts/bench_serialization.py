@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""Compare the response_model serialization path with the direct encoder."""
+import argparse
+import sys
+import timeit
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.models.domain import Activity, BudgetSummary, DayPlan, TripPlan
+from app.models.encoding import encode_plan
+from app.models.schemas import TripPlanSchema
+
+
+def make_plan(days: int, activities_per_day: int) -> TripPlan:
+    start = date(2025, 1, 1)
+    return TripPlan(
+        trip_id="bench",
+        user_id="demo-user",
+        destination="Lisbon",
+        start_date=start,
+        end_date=start + timedelta(days=days - 1),
+        days=[
+            DayPlan(
+                date=start + timedelta(days=d),
+                activities=[
+                    Activity("morning", f"Activity {d}-{a}", "Walk, eat and look around.", 42.5, a % 2 == 0)
+                    for a in range(activities_per_day)
+                ],
+            )
+            for d in range(days)
+        ],
+        budget_summary=BudgetSummary(1234.5, {"flight": 450.0, "hotel": 640.0, "activities": 144.5}),
+    )
+
+
+def current_path(plan: TripPlan) -> bytes:
+    # What FastAPI does for response_model=TripPlanSchema: build, re-validate, encode.
+    schema = TripPlanSchema.from_domain(plan)
+    validated = TripPlanSchema.parse_obj(schema.dict())
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--activities", type=int, default=3)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    plan = make_plan(args.days, args.activities)
+    assert current_path(plan) == encode_plan(plan), "encoders disagree"
+    for name, fn in [("response_model", current_path), ("direct encoder", encode_plan)]:
+        seconds = min(timeit.repeat(lambda: fn(plan), number=args.number, repeat=3))
+        print(f"{name:>15}: {seconds / args.number * 1e6:9.1f} us/plan")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,67 @@
 #!/usr/bin/env python
-from pathlib import Path
+import argparse
+import logging
 import sys
+import time
+from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT))
 
-from app.rag.wiki_activities import build_wiki_activity_candidates
+from app.rag.wiki_activities import ShardResult, build_wiki_activity_candidates
 
 
 def main() -> None:
-    base_path = Path("extracted/AA")
-    output_dir = Path("data")
-    build_wiki_activity_candidates(base_path, output_dir)
+    parser = argparse.ArgumentParser(description="Extract per-destination activity candidates from wiki shards.")
+    parser.add_argument("--input", type=Path, default=Path("extracted/AA"))
+    parser.add_argument("--output", type=Path, default=Path("data"))
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (0 = one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=1, help="shards handed to a worker at a time")
+    parser.add_argument("--force", action="store_true", help="re-scan every shard, ignoring the build manifest")
+    parser.add_argument(
+        "--index",
+        type=Path,
+        default=None,
+        help="also write a prebuilt RAG index here (e.g. <RAG_DOCS_PATH>/rag_index.npz)",
+    )
+    parser.add_argument("--index-dim", type=int, default=128)
+    parser.add_argument("--embed-batch-size", type=int, default=1024)
+    parser.add_argument(
+        "--dedup-threshold", type=float, default=0.8, help="near-duplicate similarity cutoff (0 disables)"
+    )
+    parser.add_argument("--dedup-num-perm", type=int, default=64, help="MinHash permutations")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    started = time.monotonic()
+    docs = 0
+
+    def report(done: int, total: int, result: ShardResult) -> None:
+        nonlocal docs
+        if result.reused:
+            print(f"[{done}/{total}] {Path(result.path).name}: unchanged", file=sys.stderr)
+            return
+        docs += result.total_docs
+        elapsed = time.monotonic() - started
+        print(
+            f"[{done}/{total}] {Path(result.path).name}: {result.matched_docs}/{result.total_docs} matched"
+            f" ({docs / max(elapsed, 1e-9):.0f} docs/s)",
+            file=sys.stderr,
+        )
+
+    build_wiki_activity_candidates(
+        args.input,
+        args.output,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        progress=report,
+        force=args.force,
+        index_path=args.index,
+        index_dim=args.index_dim,
+        embed_batch_size=args.embed_batch_size,
+        dedup_threshold=args.dedup_threshold,
+        dedup_num_perm=args.dedup_num_perm,
+    )
 
 
 if __name__ == "__main__":
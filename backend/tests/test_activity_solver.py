@@ -0,0 +1,26 @@
+from app.llm.activity_solver import select_activities
+
+
+def _pool():
+    return [
+        {"title": "Sunset cruise", "description": "Boat trip", "cost_estimate": 120.0, "time_of_day": "evening"},
+        {"title": "Spa day", "description": "Massage and yoga", "cost_estimate": 90.0, "time_of_day": "afternoon"},
+        {"title": "Museum", "description": "Local history", "cost_estimate": 20.0, "time_of_day": "morning"},
+        {"title": "Market stroll", "description": "Street food", "cost_estimate": 10.0, "time_of_day": "morning"},
+    ]
+
+
+def test_select_activities_stays_within_budget():
+    days = select_activities(_pool(), day_count=3, budget=150.0, travel_style="relaxing")
+
+    assert len(days) == 3
+    assert all(day for day in days)
+    assert sum(a["cost_estimate"] for day in days for a in day) <= 150.0
+    titles = [a["title"] for day in days for a in day]
+    assert len(titles) == len(set(titles))
+
+
+def test_select_activities_prefers_style_when_affordable():
+    days = select_activities(_pool(), day_count=1, budget=500.0, travel_style="relaxing", max_per_day=1)
+
+    assert days[0][0]["title"] == "Spa day"
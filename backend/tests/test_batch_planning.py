@@ -0,0 +1,25 @@
+import json
+
+from app.models.schemas import Preferences
+from app.services.batch_planning_service import BatchPlanningService
+from app.storage.repository import InMemoryRepository
+
+
+def test_plan_many_streams_and_persists_every_plan():
+    repository = InMemoryRepository()
+    service = BatchPlanningService(max_workers=2, persist_chunk_size=2)
+    preferences = [
+        Preferences(destination_preferences=["Lisbon"]),
+        Preferences(destination_preferences=["Bali"], budget_max=3000.0),
+        Preferences(destination_preferences=["Lisbon"], start_date="2020-01-01", end_date="2020-01-01"),
+    ]
+    try:
+        rows = [json.loads(line) for line in service.plan_many("demo-user", preferences, repository)]
+    finally:
+        service.shutdown()
+
+    assert sorted(row["index"] for row in rows) == [0, 1, 2]
+    plans = {row["index"]: row["plan"] for row in rows if "plan" in row}
+    assert plans[0]["destination"] == "Lisbon"
+    assert plans[1]["destination"] == "Bali"
+    assert all(repository.get_plan(plan["trip_id"]) for plan in plans.values())
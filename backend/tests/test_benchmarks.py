@@ -0,0 +1,25 @@
+from benchmarks.suite import CASES, SCALES, BenchResult, compare, run_case
+
+
+def test_every_case_runs_at_small_scale():
+    for name in CASES:
+        result = run_case(name, SCALES["small"], repeat=1)
+        assert result.ops > 0 and result.ops_per_sec > 0 and result.peak_kib >= 0
+
+
+def test_compare_flags_slowdowns_and_memory_growth_beyond_thresholds():
+    baseline = {
+        "thresholds": {"default": {"max_slowdown": 0.3, "max_memory_growth": 0.5}, "b": {"max_slowdown": 0.6}},
+        "results": {
+            "a": {"ops_per_sec": 1000.0, "peak_kib": 1000.0},
+            "b": {"ops_per_sec": 1000.0, "peak_kib": 10.0},
+        },
+    }
+    results = [
+        BenchResult("a", ops=1, seconds=1.0, ops_per_sec=600.0, peak_kib=1600.0),
+        BenchResult("b", ops=1, seconds=1.0, ops_per_sec=500.0, peak_kib=40.0),  # within its own limit
+        BenchResult("new", ops=1, seconds=1.0, ops_per_sec=1.0, peak_kib=1.0),  # not in the baseline
+    ]
+    regressions = compare(results, baseline)
+    assert len(regressions) == 2
+    assert all(line.startswith("a: ") for line in regressions)
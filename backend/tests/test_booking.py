@@ -1,3 +1,6 @@
+import time
+
+from app.llm.tools.booking_tool import BookingTool, MockBookingProvider
 from app.models.schemas import Preferences
 from app.services.booking_service import BookingService
 from app.services.planning_service import PlanningService
@@ -16,3 +19,68 @@ def test_booking_creates_records():
 
     assert response.bookings
     assert any(b.type == "flight" for b in response.bookings)
+
+
+def _plan_with_bookable_activities(repository):
+    planning_service = PlanningService(repository=repository)
+    preferences = Preferences(destination_preferences=["Bali"], budget_max=3000.0)
+    return planning_service.plan_trip(user_id="demo-user", preferences=preferences)
+
+
+def test_booking_is_idempotent_and_concurrent():
+    repository = InMemoryRepository()
+    plan = _plan_with_bookable_activities(repository)
+    providers = {
+        name: MockBookingProvider(name, latency_seconds=0.2)
+        for name in ("mock-air", "mock-hotel", "mock-activity")
+    }
+    service = BookingService(repository=repository, booking_tool=BookingTool(repository, providers=providers))
+
+    started = time.monotonic()
+    first = service.book_trip(trip_id=plan.trip_id)
+    elapsed = time.monotonic() - started
+    replay = service.book_trip(trip_id=plan.trip_id)
+
+    assert len(first.bookings) > 2
+    assert elapsed < 0.2 * 2
+    assert replay.replayed
+    assert [b.booking_id for b in replay.bookings] == [b.booking_id for b in first.bookings]
+    assert len(repository.list_bookings_for_trip(plan.trip_id)) == len(first.bookings)
+
+
+def test_booking_compensates_partial_failure():
+    repository = InMemoryRepository()
+    plan = _plan_with_bookable_activities(repository)
+    providers = {
+        "mock-air": MockBookingProvider("mock-air"),
+        "mock-hotel": MockBookingProvider("mock-hotel", fail=True),
+        "mock-activity": MockBookingProvider("mock-activity"),
+    }
+    service = BookingService(repository=repository, booking_tool=BookingTool(repository, providers=providers))
+
+    response = service.book_trip(trip_id=plan.trip_id, idempotency_key="retry-1")
+
+    statuses = {b.type: b.status for b in response.bookings}
+    assert statuses["hotel"] == "failed"
+    assert statuses["flight"] == "cancelled"
+    assert len(providers["mock-air"].cancelled) == 1
+    assert service.book_trip(trip_id=plan.trip_id, idempotency_key="retry-1").replayed
+
+
+def test_booking_without_a_key_retries_after_a_failure():
+    repository = InMemoryRepository()
+    plan = _plan_with_bookable_activities(repository)
+    providers = {
+        "mock-air": MockBookingProvider("mock-air"),
+        "mock-hotel": MockBookingProvider("mock-hotel", fail=True),
+        "mock-activity": MockBookingProvider("mock-activity"),
+    }
+    service = BookingService(repository=repository, booking_tool=BookingTool(repository, providers=providers))
+    assert any(b.status == "failed" for b in service.book_trip(trip_id=plan.trip_id).bookings)
+
+    providers["mock-hotel"].fail = False
+    retry = service.book_trip(trip_id=plan.trip_id)
+
+    assert not retry.replayed
+    assert all(b.status == "confirmed" for b in retry.bookings)
+    assert service.book_trip(trip_id=plan.trip_id).replayed
@@ -29,3 +29,21 @@ def test_calendar_tool_merges_ics_with_seeded():
     busy = tool.busy["u1"]
     assert (date(2025, 2, 1), date(2025, 2, 2)) in busy
     assert (date(2025, 2, 5), date(2025, 2, 5)) in busy
+
+
+def test_group_free_ranges_intersects_all_calendars():
+    tool = CalendarTool()
+    tool.seed_busy_ranges("u1", [(date(2025, 3, 10), date(2025, 3, 12)), (date(2025, 3, 2), date(2025, 3, 3))])
+    tool.seed_busy_ranges("u2", [(date(2025, 3, 5), date(2025, 3, 6)), (date(2025, 3, 11), date(2025, 3, 14))])
+
+    start, end = date(2025, 3, 1), date(2025, 3, 20)
+    expected = [
+        (date(2025, 3, 1), date(2025, 3, 1)),
+        (date(2025, 3, 4), date(2025, 3, 4)),
+        (date(2025, 3, 7), date(2025, 3, 9)),
+        (date(2025, 3, 15), date(2025, 3, 20)),
+    ]
+    assert tool.get_group_free_date_ranges(["u1", "u2"], start, end) == expected
+    assert tool.get_group_free_date_ranges(["u2", "u1"], start, end) == expected
+    assert tool.is_group_range_available(["u1", "u2"], date(2025, 3, 7), date(2025, 3, 9))
+    assert not tool.is_group_range_available(["u1", "u2"], date(2025, 3, 4), date(2025, 3, 5))
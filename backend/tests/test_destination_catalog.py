@@ -0,0 +1,48 @@
+from app.llm.candidates import candidate_destinations
+from app.llm.client import PlannerContext
+from app.llm.tools.calendar_tool import CalendarTool
+from app.llm.tools.destination_catalog import DestinationCatalog
+from app.llm.tools.search_tool import SearchTool
+from app.models.schemas import Preferences
+
+
+def _entry(flight_hours, hotel_price, activity_prices):
+    return {
+        "flight": {"price": 100.0, "duration_hours": flight_hours},
+        "hotel": {"price_per_night": hotel_price},
+        "activities": [{"title": f"a{p}", "price": p} for p in activity_prices],
+    }
+
+
+def test_query_intersects_range_indexes_in_catalog_order():
+    catalog = DestinationCatalog(
+        {
+            "Porto": _entry(3, 90.0, [20.0]),
+            "Tokyo": _entry(14, 110.0, [15.0, 80.0]),
+            "Paris": _entry(2, 220.0, [50.0]),
+            "Rome": _entry(3, 140.0, [35.0]),
+        }
+    )
+
+    assert catalog.query(max_flight_hours=4, max_hotel_price=150) == ["Porto", "Rome"]
+    assert catalog.query(max_activity_price=20) == ["Porto", "Tokyo"]
+    assert catalog.query(max_flight_hours=1) == []
+    assert catalog.query() == ["Porto", "Tokyo", "Paris", "Rome"]
+
+
+def test_candidates_look_up_preferred_destinations_without_a_range_query(monkeypatch):
+    search_tool = SearchTool(
+        DestinationCatalog({"Porto": _entry(3, 90.0, [20.0]), "Tokyo": _entry(14, 110.0, [15.0])})
+    )
+    queries = []
+    find_destinations = search_tool.find_destinations
+    monkeypatch.setattr(search_tool, "find_destinations", lambda **kw: queries.append(kw) or find_destinations(**kw))
+
+    def candidates(preferred):
+        preferences = Preferences(destination_preferences=preferred, max_flight_hours=4)
+        return candidate_destinations(PlannerContext("u", preferences, CalendarTool(), search_tool))
+
+    assert candidates(["Tokyo", "Porto"]) == ["Tokyo", "Porto"]
+    assert queries == []
+    assert candidates(["Tokyo"]) == ["Porto"]
+    assert queries == [{"max_flight_hours": 4}]
@@ -0,0 +1,30 @@
+import dataclasses
+import sys
+from datetime import datetime
+
+import pytest
+
+from app.models.domain import Activity, BookingRecord, BookingStatus, BookingType, PaymentStatus
+
+
+def test_domain_models_are_slotted_and_intern_enum_like_fields():
+    a = Activity("".join(["mor", "ning"]), "Tram 28", "Ride", 3.0, False)
+    b = Activity("".join(["mor", "ning"]), "Alfama", "Walk", 0.0, False)
+    assert not hasattr(a, "__dict__")
+    assert a.time_of_day is b.time_of_day
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        a.title = "changed"
+
+    booking = BookingRecord(
+        booking_id="b1",
+        user_id="".join(["demo", "-user"]),
+        trip_id="t1",
+        type=BookingType.hotel,
+        status=BookingStatus.confirmed,
+        provider="".join(["mock", "-hotel"]),
+        price=10.0,
+        created_at=datetime(2025, 1, 1),
+        payment_status=PaymentStatus.authorized,
+    )
+    assert booking.provider is sys.intern("mock-hotel")
+    booking.price = 12.0  # bookings stay mutable
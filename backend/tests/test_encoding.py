@@ -0,0 +1,52 @@
+from datetime import date, datetime
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.models.domain import (
+    Activity,
+    BookingRecord,
+    BookingStatus,
+    BookingType,
+    BudgetSummary,
+    DayPlan,
+    PaymentStatus,
+    TripPlan,
+)
+from app.models.encoding import booking_to_jsonable, dumps, encode_plan
+from app.models.schemas import BookingRecordSchema, TripPlanSchema
+
+
+def test_encode_plan_matches_response_model_bytes():
+    plan = TripPlan(
+        trip_id="t1",
+        user_id="u1",
+        destination="Lisbon",
+        start_date=date(2025, 5, 1),
+        end_date=date(2025, 5, 2),
+        days=[
+            DayPlan(date=date(2025, 5, 1), activities=[Activity("morning", "Praça do Comércio", 'Say "olá"', 60, True)]),
+            DayPlan(date=date(2025, 5, 2), activities=[]),
+        ],
+        budget_summary=BudgetSummary(total_estimated=0.1 + 0.2, breakdown={"flight": 450, "hotel": 1e16}),
+    )
+
+    expected = JSONResponse(jsonable_encoder(TripPlanSchema.from_domain(plan))).body
+    assert encode_plan(plan) == expected
+
+
+def test_booking_to_jsonable_matches_schema():
+    booking = BookingRecord(
+        booking_id="b1",
+        user_id="u1",
+        trip_id="t1",
+        type=BookingType.hotel,
+        status=BookingStatus.confirmed,
+        provider="mock-hotel",
+        price=320,
+        created_at=datetime(2025, 4, 1, 12, 30, 5, 123),
+        payment_status=PaymentStatus.authorized,
+    )
+
+    expected = JSONResponse(jsonable_encoder(BookingRecordSchema.from_domain(booking))).body
+    assert dumps(booking_to_jsonable(booking)) == expected
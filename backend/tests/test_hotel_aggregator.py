@@ -0,0 +1,62 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.llm.tools.hotel_aggregator import HotelAggregator
+from app.llm.tools.hotel_tool import Hotel
+
+
+class _Provider:
+    def __init__(self, hotels, delay=0.0):
+        self.hotels = hotels
+        self.delay = delay
+        self.calls = 0
+
+    def search_hotels(self, city, limit=5):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.hotels
+
+
+def test_aggregator_merges_duplicates_and_ignores_slow_providers():
+    fast_a = _Provider([Hotel(id="1", name="Lisbon Central", city="Lisbon", price_per_night=160.0, lat=38.71, lon=-9.14)])
+    fast_b = _Provider(
+        [
+            Hotel(id="x", name="LISBON-CENTRAL", city="Lisbon", price_per_night=140.0, rating=4.5),
+            Hotel(id="y", name="Tagus View", city="Lisbon", price_per_night=120.0),
+        ]
+    )
+    slow = _Provider([Hotel(id="z", name="Slow Inn", city="Lisbon", price_per_night=10.0)], delay=1.0)
+    aggregator = HotelAggregator([fast_a, fast_b, slow], deadline_seconds=0.2)
+
+    started = time.monotonic()
+    hotels = aggregator.search_hotels("Lisbon")
+
+    assert time.monotonic() - started < 0.9
+    assert [h.name for h in hotels] == ["Tagus View", "Lisbon Central"]
+    assert hotels[1].price_per_night == 140.0
+    assert hotels[1].rating == 4.5
+    assert hotels[1].lat == 38.71
+
+
+def test_aggregator_skips_a_provider_whose_calls_are_all_past_the_deadline():
+    fast = _Provider([Hotel(id="1", name="Lisbon Central", city="Lisbon", price_per_night=160.0)])
+    slow = _Provider([Hotel(id="z", name="Slow Inn", city="Lisbon", price_per_night=10.0)], delay=0.6)
+    aggregator = HotelAggregator([slow, fast], deadline_seconds=0.1, max_in_flight_per_provider=1)
+
+    started = time.monotonic()
+    results = [aggregator.search_hotels("Lisbon") for _ in range(3)]
+
+    assert time.monotonic() - started < 0.5  # the later calls did not wait on the slow provider
+    assert all([h.name for h in hotels] == ["Lisbon Central"] for hotels in results)
+    assert slow.calls == 1
+
+
+def test_concurrent_searches_beyond_the_cap_queue_for_a_slot():
+    provider = _Provider([Hotel(id="1", name="Lisbon Central", city="Lisbon", price_per_night=160.0)], delay=0.05)
+    aggregator = HotelAggregator([provider], deadline_seconds=2.0, max_in_flight_per_provider=4)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: aggregator.search_hotels("Lisbon"), range(8)))
+
+    assert [len(hotels) for hotels in results] == [1] * 8
+    assert provider.calls == 8
@@ -0,0 +1,120 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from app.llm.tools.hotel_cache import CachedHotelTool
+from app.llm.tools.hotel_makcorps import MakCorpsHotelTool
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def makcorps_stub():
+    state = {"calls": 0, "fail": False}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802
+            state["calls"] += 1
+            if state["fail"]:
+                self.send_response(503)
+                self.end_headers()
+                return
+            city = self.path.rsplit("/", 1)[-1]
+            body = json.dumps({"hotels": [{"hotel_name": f"{city} Inn", "lowest_price": "99"}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", state
+    server.shutdown()
+
+
+def test_cache_serves_fresh_and_stale_then_refreshes(makcorps_stub):
+    base_url, state = makcorps_stub
+    clock = _Clock()
+    cache = CachedHotelTool(MakCorpsHotelTool("jwt", base_url=base_url), ttl_seconds=10, stale_seconds=100, clock=clock)
+
+    assert cache.search_hotels("Lisbon")[0].price_per_night == 99.0
+    assert cache.search_hotels("Lisbon")[0].name == "Lisbon Inn"
+    assert state["calls"] == 1
+
+    clock.now += 20
+    assert cache.search_hotels("Lisbon")[0].name == "Lisbon Inn"
+    cache.close()
+    assert state["calls"] == 2
+
+
+def test_cache_negative_caches_failures(makcorps_stub):
+    base_url, state = makcorps_stub
+    state["fail"] = True
+    clock = _Clock()
+    cache = CachedHotelTool(MakCorpsHotelTool("jwt", base_url=base_url), negative_ttl_seconds=5, clock=clock)
+
+    assert cache.search_hotels("Bali") == []
+    assert cache.search_hotels("Bali") == []
+    assert state["calls"] == 1
+
+    state["fail"] = False
+    clock.now += 10
+    assert cache.search_hotels("Bali")[0].name == "Bali Inn"
+    cache.close()
+
+
+def test_failed_refetch_keeps_serving_the_old_hotels(makcorps_stub):
+    base_url, state = makcorps_stub
+    clock = _Clock()
+    cache = CachedHotelTool(
+        MakCorpsHotelTool("jwt", base_url=base_url), ttl_seconds=10, stale_seconds=10, negative_ttl_seconds=5, clock=clock
+    )
+    cache.search_hotels("Lisbon")
+
+    state["fail"] = True
+    clock.now += 30  # past the stale window: refetched synchronously
+    assert cache.search_hotels("Lisbon")[0].name == "Lisbon Inn"
+    assert cache.search_hotels("Lisbon")[0].name == "Lisbon Inn"
+    assert state["calls"] == 2
+    cache.close()
+
+
+def test_cache_evicts_least_recently_used(makcorps_stub):
+    base_url, state = makcorps_stub
+    cache = CachedHotelTool(MakCorpsHotelTool("jwt", base_url=base_url), max_entries=2)
+    cache.search_hotels("Lisbon")
+    cache.search_hotels("Bali")
+    cache.search_hotels("Lisbon")
+    cache.search_hotels("Tokyo")  # evicts Bali, the least recently used
+
+    cache.search_hotels("Lisbon")
+    assert state["calls"] == 3
+    cache.search_hotels("Bali")
+    assert state["calls"] == 4
+    cache.close()
+
+
+def test_cache_persists_between_instances(makcorps_stub, tmp_path):
+    base_url, state = makcorps_stub
+    store = tmp_path / "hotels.sqlite"
+    first = CachedHotelTool(MakCorpsHotelTool("jwt", base_url=base_url), store_path=store)
+    first.search_hotels("Tokyo")
+    first.close()
+
+    second = CachedHotelTool(MakCorpsHotelTool("jwt", base_url=base_url), store_path=store)
+    assert second.search_hotels("Tokyo")[0].name == "Tokyo Inn"
+    second.close()
+    assert state["calls"] == 1
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+import requests
+
+from app.core.config import settings
+from app.llm.backends.ollama_backend import OllamaPlannerBackend
+from app.llm.planner import LLMPlanner
+from app.models.schemas import Preferences
+from app.services.planning_service import PlanningService
+from app.storage.repository import InMemoryRepository
+from benchmarks.fake_ollama import FakeOllamaConfig, FakeOllamaServer
+from benchmarks.load_test import percentile
+
+
+def _ollama_service(monkeypatch, fake: FakeOllamaServer) -> PlanningService:
+    monkeypatch.setattr(settings, "ollama_host", fake.url)
+    service = PlanningService(repository=InMemoryRepository())
+    service.planner = LLMPlanner(backend=OllamaPlannerBackend())
+    return service
+
+
+def test_ollama_backend_plans_against_the_fake_server(monkeypatch):
+    with FakeOllamaServer(FakeOllamaConfig(seed=1)) as fake:
+        service = _ollama_service(monkeypatch, fake)
+        plan = service.plan_trip("demo-user", Preferences(destination_preferences=["Lisbon"], max_duration_days=4))
+        stats = fake.snapshot()
+    assert plan.destination == "Lisbon"
+    assert 3 <= len(plan.days) <= 4 and all(day.activities for day in plan.days)
+    assert (stats["requests"], stats["ok"]) == (1, 1)
+
+
+@pytest.mark.parametrize("outcome", ["invalid_json", "missing_fields"])
+def test_injected_failures_surface_after_the_backend_gives_up(monkeypatch, outcome):
+    with FakeOllamaServer(FakeOllamaConfig(**{f"{outcome}_rate": 1.0})) as fake:
+        service = _ollama_service(monkeypatch, fake)
+        with pytest.raises(ValueError):
+            service.plan_trip("demo-user", Preferences(destination_preferences=["Lisbon"]))
+        # Only a plan with missing fields earns the strict-JSON retry.
+        assert fake.snapshot()[outcome] == (2 if outcome == "missing_fields" else 1)
+
+
+def test_streamed_fragments_join_into_the_plan():
+    with FakeOllamaServer(FakeOllamaConfig(stream_chunk_chars=16)) as fake:
+        response = requests.post(f"{fake.url}/api/chat", json={"messages": [], "stream": True}, stream=True)
+        lines = [json.loads(line) for line in response.iter_lines() if line]
+    assert lines[-1]["done"] and not any(line["done"] for line in lines[:-1])
+    plan = json.loads("".join(line["message"]["content"] for line in lines))
+    assert plan["days"] and plan["budget_summary"]["total_estimated"] > 0
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 99)) == (50.0, 95.0, 99.0)
+    assert percentile([], 99) == 0.0
+
@@ -0,0 +1,55 @@
+import re
+
+from fastapi.testclient import TestClient
+
+from app.core.metrics import MetricsRegistry, span
+from app.services.planning_service import PlanningService
+from main import create_app
+
+
+def test_histograms_render_cumulative_buckets_in_prometheus_format():
+    registry = MetricsRegistry()
+    latency = registry.histogram("demo_seconds", "Demo latency.", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.labels('say "hi"').observe(value)
+    registry.counter("demo_total", "Demo counter.").labels().inc(2)
+
+    text = registry.render()
+    assert '# TYPE demo_seconds histogram' in text
+    assert 'demo_seconds_bucket{stage="say \\"hi\\"",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="say \\"hi\\"",le="1.0"} 3' in text
+    assert 'demo_seconds_bucket{stage="say \\"hi\\"",le="+Inf"} 4' in text
+    assert 'demo_seconds_count{stage="say \\"hi\\""} 4' in text
+    assert "demo_total 2.0" in text
+
+
+def test_metrics_endpoint_reports_plan_stages_and_cache_hits():
+    client = TestClient(create_app())
+    with span("unit_test"):
+        pass
+    trip_id = client.post("/plan/", json={"destination_preferences": ["Lisbon"]}).json()["plan"]["trip_id"]
+    client.get(f"/plan/{trip_id}")
+    client.get(f"/plan/{trip_id}")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    for stage in ("unit_test", "calendar", "planner", "fill_empty_days", "persist", "serialize"):
+        assert re.search(rf'vacation_planner_stage_seconds_count{{stage="{stage}"}} [1-9]', text), stage
+    assert re.search(r'vacation_planner_cache_requests_total{cache="plan_body",result="hit"} [1-9]', text)
+    assert 'route="/plan/{trip_id}"' in text
+
+
+def test_failing_requests_are_recorded_as_500(monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("planner exploded")
+
+    monkeypatch.setattr(PlanningService, "create_plans", fail)
+    client = TestClient(create_app(), raise_server_exceptions=False)
+
+    assert client.post("/plan/", json={"destination_preferences": ["Lisbon"]}).status_code == 500
+    text = client.get("/metrics").text
+    assert re.search(
+        r'vacation_planner_http_request_seconds_count{method="POST",route="/plan/",status="500"} [1-9]', text
+    )
@@ -0,0 +1,50 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from main import create_app
+
+
+def test_plan_listing_pages_and_export_streams():
+    client = TestClient(create_app())
+    trip_ids = [
+        client.post("/plan/", json={"destination_preferences": ["Lisbon"]}).json()["plan"]["trip_id"]
+        for _ in range(3)
+    ]
+    client.post(f"/plan/{trip_ids[0]}/book")
+
+    first = client.get("/plan/", params={"limit": 2}).json()
+    second = client.get("/plan/", params={"limit": 2, "cursor": first["next_cursor"]}).json()
+    assert [p["trip_id"] for p in first["items"] + second["items"]] == trip_ids
+    assert second["next_cursor"] is None
+    assert client.get("/plan/", params={"user_id": "someone-else"}).json()["items"] == []
+    assert client.get("/plan/", params={"cursor": "abc"}).status_code == 400
+
+    rows = [json.loads(line) for line in client.get("/export").text.splitlines()]
+    assert [r["data"]["trip_id"] for r in rows if r["type"] == "plan"] == trip_ids
+    assert any(r["type"] == "booking" for r in rows)
+
+
+def test_get_plan_uses_etag_and_cached_bytes():
+    app = create_app()
+    client = TestClient(app)
+    trip_id = client.post("/plan/", json={"destination_preferences": ["Lisbon"]}).json()["plan"]["trip_id"]
+
+    first = client.get(f"/plan/{trip_id}")
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+    assert client.get(f"/plan/{trip_id}").content == first.content
+
+    not_modified = client.get(f"/plan/{trip_id}", headers={"If-None-Match": f'"other", W/{etag}'})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    # Re-saving the plan invalidates the cached bytes and the ETag.
+    repository = app.state.repository
+    plan = repository.get_plan(trip_id)
+    plan.destination = "Bali"
+    repository.save_plan(plan)
+    changed = client.get(f"/plan/{trip_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["destination"] == "Bali"
+    assert changed.headers["etag"] != etag
@@ -1,3 +1,8 @@
+from datetime import date, timedelta
+from uuid import uuid4
+
+from app.llm.planner import LLMPlanner
+from app.models.domain import Activity, BudgetSummary, DayPlan, TripPlan
 from app.models.schemas import Preferences
 from app.services.planning_service import PlanningService
 from app.storage.repository import InMemoryRepository
@@ -16,3 +21,68 @@ def test_plan_respects_budget_and_destination():
     assert plan.destination == "Lisbon"
     assert plan.budget_summary.total_estimated <= preferences.budget_max
     assert len(plan.days) >= preferences.min_duration_days
+
+
+def test_plan_ranks_all_preferred_destinations():
+    repository = InMemoryRepository()
+    service = PlanningService(repository=repository)
+    preferences = Preferences(
+        destination_preferences=["Bali", "Lisbon"],
+        budget_max=1500.0,
+        max_flight_hours=8,
+    )
+
+    plans = service.plan_trip_options(user_id="demo-user", preferences=preferences)
+
+    assert [p.destination for p in plans] == ["Lisbon", "Bali"]
+    assert all(repository.get_plan(p.trip_id) for p in plans)
+
+
+def test_plan_applies_max_flight_hours():
+    repository = InMemoryRepository()
+    service = PlanningService(repository=repository)
+    preferences = Preferences(destination_preferences=["Bali"], max_flight_hours=8)
+
+    plans = service.plan_trip_options(user_id="demo-user", preferences=preferences)
+
+    assert [p.destination for p in plans] == ["Lisbon"]
+
+
+def test_candidates_are_ranked_after_empty_days_are_filled():
+    class StubBackend:
+        def generate_plan(self, context):
+            return self.generate_candidates(context)[0]
+
+        def generate_candidates(self, context):
+            start = date.today() + timedelta(days=40)
+            empty = [DayPlan(date=start + timedelta(days=i), activities=[]) for i in range(3)]
+            full = [
+                DayPlan(date=start + timedelta(days=i), activities=[Activity("morning", "Walk", "Old town.", 10.0, False)])
+                for i in range(3)
+            ]
+            return [
+                # Looks cheapest until its three empty days are backfilled.
+                _plan(context.user_id, "Lisbon", empty, flight=450.0),
+                _plan(context.user_id, "Lisbon", full, flight=460.0),
+            ]
+
+    service = PlanningService(repository=InMemoryRepository())
+    service.planner = LLMPlanner(backend=StubBackend())
+    preferences = Preferences(destination_preferences=["Lisbon"], budget_max=500.0)
+
+    plans = service.plan_trip_options(user_id="demo-user", preferences=preferences)
+
+    assert [p.budget_summary.breakdown["flight"] for p in plans] == [460.0, 450.0]
+    assert plans[0].budget_summary.total_estimated <= preferences.budget_max < plans[1].budget_summary.total_estimated
+
+
+def _plan(user_id, destination, days, flight):
+    return TripPlan(
+        trip_id=str(uuid4()),
+        user_id=user_id,
+        destination=destination,
+        start_date=days[0].date,
+        end_date=days[-1].date,
+        days=days,
+        budget_summary=BudgetSummary(total_estimated=flight, breakdown={"flight": flight, "hotel": 0.0}),
+    )
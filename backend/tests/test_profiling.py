@@ -0,0 +1,92 @@
+import pstats
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.profiling import ProfileStore, RequestProfiler, instrument_routes
+from main import create_app
+
+
+def test_admin_header_profiles_a_request_and_the_index_serves_it(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    client = TestClient(create_app())
+
+    plain = client.post("/plan/", json={"destination_preferences": ["Lisbon"]})
+    assert "X-Profile-Id" not in plain.headers
+    profiled = client.post(
+        "/plan/",
+        json={"destination_preferences": ["Lisbon"]},
+        headers={"X-Profile": "1", "X-Admin-Token": "s3cret"},
+    )
+    profile_id = profiled.headers["X-Profile-Id"]
+
+    assert client.get("/admin/profiles").status_code == 403
+    index = client.get("/admin/profiles", headers={"X-Admin-Token": "s3cret"}).json()
+    assert [(p["id"], p["trigger"], p["route"], p["kind"]) for p in index] == [
+        (profile_id, "header", "/plan/", "cprofile")
+    ]
+    download = client.get(f"/admin/profiles/{profile_id}", headers={"X-Admin-Token": "s3cret"})
+    path = tmp_path / "download.prof"
+    path.write_bytes(download.content)
+    # The dependency (PlanningService construction) and the endpoint both ran under the profiler.
+    functions = {name for _, _, name in pstats.Stats(str(path)).stats}
+    assert {"get_planning_service", "create_plan", "build_plans"} <= functions
+
+
+def test_non_ascii_admin_tokens_are_rejected_not_errors(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    client = TestClient(create_app())
+    token = "s3cr\u00e9t".encode("latin-1")  # decoded by the server as a non-ASCII str
+
+    response = client.post(
+        "/plan/",
+        json={"destination_preferences": ["Lisbon"]},
+        headers={"X-Profile": "1", "X-Admin-Token": token},
+    )
+
+    assert response.status_code == 200 and "X-Profile-Id" not in response.headers
+    assert client.get("/admin/profiles", headers={"X-Admin-Token": token}).status_code == 403
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_slow_requests_are_stack_sampled(tmp_path):
+    app = FastAPI()
+
+    @app.get("/fast")
+    def fast() -> dict:
+        return {}
+
+    @app.get("/slow")
+    def slow() -> dict:
+        _busy(0.3)
+        return {}
+
+    profiler = RequestProfiler(ProfileStore(tmp_path), slow_seconds=0.05, sample_interval=0.005)
+    instrument_routes(app.routes)
+    app.middleware("http")(profiler.dispatch)
+    client = TestClient(app)
+
+    assert "X-Profile-Id" not in client.get("/fast").headers
+    profile_id = client.get("/slow").headers["X-Profile-Id"]
+    (record,) = profiler.store.list()
+    assert (record.id, record.trigger, record.kind) == (profile_id, "slow", "folded")
+    folded = (tmp_path / record.filename).read_text(encoding="utf-8")
+    assert "_busy" in folded and "slow" in folded
+
+
+def test_profile_store_keeps_only_the_newest(tmp_path):
+    store = ProfileStore(tmp_path, max_profiles=2)
+    fields = dict(method="GET", path="/", route="/", status=200, duration_ms=1.0, trigger="sampled")
+    ids = [store.save(fields, "folded", lambda p: p.write_text("a;b 1\n")).id for _ in range(3)]
+    assert [r.id for r in store.list()] == ids[:0:-1]
+    assert len(list(tmp_path.iterdir())) == 4
+    assert store.path_for(ids[0]) is None and store.path_for("../etc/passwd") is None
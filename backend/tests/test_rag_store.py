@@ -1,6 +1,9 @@
 from pathlib import Path
 
-from app.llm.tools.rag_store import RAGTool
+from app.core.config import settings
+from app.llm.tools.rag_store import INDEX_FILENAME, RAGDocument, RAGTool, embed_texts, write_index
+from app.services.planning_service import PlanningService
+from app.storage.repository import InMemoryRepository
 
 
 def test_rag_search_returns_snippet(tmp_path: Path):
@@ -14,3 +17,22 @@ def test_rag_search_returns_snippet(tmp_path: Path):
     results = rag.search("Lisbon", top_k=1)
     assert results
     assert "Lisbon" in results[0][0]
+
+
+def test_index_and_curated_docs_in_one_directory_are_both_loaded(tmp_path: Path, monkeypatch):
+    docs_dir = tmp_path / "extracted"
+    docs_dir.mkdir()
+    (docs_dir / "lisbon.txt").write_text("Tram 28 | Ride the old tram | 3 EUR | morning", encoding="utf-8")
+    wiki = [
+        RAGDocument(doc_id=f"wiki-{i}", text=f"{title} {i} | From the wiki", metadata={"destination": dest})
+        for i, (title, dest) in enumerate([("Miradouro", "Lisbon")] + [("Ubud rice terrace", "Bali")] * 20)
+    ]
+    write_index(docs_dir / INDEX_FILENAME, wiki, embed_texts([doc.text for doc in wiki], 64))
+    monkeypatch.setattr(settings, "rag_docs_path", str(docs_dir))
+
+    rag = PlanningService(repository=InMemoryRepository()).rag_tool
+
+    assert rag.dim == 64 and len(rag.documents) == 22
+    texts = [text for text, _ in rag.search("Lisbon", top_k=5, destination="Lisbon")]
+    assert sorted(texts) == ["Miradouro 0 | From the wiki", "Tram 28 | Ride the old tram | 3 EUR | morning"]
+    assert len(rag.search("Lisbon", top_k=5)) == 5
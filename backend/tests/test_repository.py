@@ -0,0 +1,107 @@
+from datetime import date, datetime
+
+from app.models.domain import BookingRecord, BookingStatus, BookingType, BudgetSummary, PaymentStatus, TripPlan
+from app.models.schemas import Preferences
+from app.services.booking_service import BookingService
+from app.services.planning_service import PlanningService
+from app.storage.repository import InMemoryRepository
+
+
+def test_in_memory_repository_evicts_and_indexes():
+    now = [0.0]
+    repository = InMemoryRepository(max_plans=2, plan_ttl_seconds=100, clock=lambda: now[0])
+    planning_service = PlanningService(repository=repository)
+    booking_service = BookingService(repository=repository)
+    preferences = Preferences(destination_preferences=["Lisbon"])
+
+    first = planning_service.plan_trip(user_id="demo-user", preferences=preferences)
+    booking_service.book_trip(trip_id=first.trip_id)
+    second = planning_service.plan_trip(user_id="demo-user", preferences=preferences)
+    assert repository.get_plan(first.trip_id)
+    third = planning_service.plan_trip(user_id="demo-user", preferences=preferences)
+
+    assert repository.get_plan(second.trip_id) is None
+    assert [p.trip_id for p in repository.list_plans_for_user("demo-user")] == [first.trip_id, third.trip_id]
+    assert {b.trip_id for b in repository.list_bookings_for_trip(first.trip_id)} == {first.trip_id}
+    assert repository.memory_usage()["plans"] == 2
+
+    now[0] = 150.0
+    assert repository.get_plan(first.trip_id) is None
+    assert repository.memory_usage()["plan_bytes"] > 0
+
+
+def _booking(booking_id, trip_id):
+    return BookingRecord(
+        booking_id=booking_id,
+        user_id="demo-user",
+        trip_id=trip_id,
+        type=BookingType.flight,
+        status=BookingStatus.confirmed,
+        provider="mock-air",
+        price=100.0,
+        created_at=datetime(2026, 1, 1),
+        payment_status=PaymentStatus.authorized,
+    )
+
+
+def test_in_memory_repository_bounds_bookings_and_idempotency_keys():
+    now = [0.0]
+    repository = InMemoryRepository(max_bookings=3, booking_ttl_seconds=100, clock=lambda: now[0])
+    repository.save_bookings([_booking("a1", "trip-a"), _booking("a2", "trip-a")], idempotency_key="key-a")
+    repository.save_bookings([_booking("b1", "trip-b")], idempotency_key="key-b")
+    repository.save_bookings([_booking("c1", "trip-c")], idempotency_key="key-c")
+
+    # Over the cap: the oldest batch goes whole, with its key.
+    assert repository.list_bookings_for_trip("trip-a") == []
+    assert repository.get_idempotent_bookings("key-a") is None
+    assert [b.booking_id for b in repository.get_idempotent_bookings("key-b")] == ["b1"]
+    assert repository.memory_usage()["bookings"] == 2
+
+    for i in range(5):  # batches with no bookings still count against the key cap
+        repository.save_bookings([], idempotency_key=f"empty-{i}")
+    assert repository.memory_usage()["idempotency_keys"] == 3
+
+    now[0] = 150.0
+    assert repository.get_idempotent_bookings("empty-4") is None
+    assert repository.memory_usage()["bookings"] == repository.memory_usage()["idempotency_keys"] == 0
+
+
+def test_in_memory_repository_pages_one_user_in_save_order():
+    repository = InMemoryRepository()
+    plans = [_plan(f"t{i}", "u1" if i % 2 else "u2") for i in range(10)]
+    repository.save_plans(plans)
+    repository.save_plan(plans[1])  # re-saved: moves to the end
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = repository.list_plans_page(limit=2, cursor=cursor, user_id="u1")
+        seen.extend(p.trip_id for p in page)
+        if cursor is None:
+            break
+    assert seen == ["t3", "t5", "t7", "t9", "t1"]
+
+
+def _plan(trip_id, user_id):
+    return TripPlan(
+        trip_id=trip_id,
+        user_id=user_id,
+        destination="Lisbon",
+        start_date=date(2026, 5, 1),
+        end_date=date(2026, 5, 1),
+        days=[],
+        budget_summary=BudgetSummary(total_estimated=0.0, breakdown={}),
+    )
+
+
+def test_in_memory_repository_counts_cached_bodies_toward_max_plan_bytes():
+    repository = InMemoryRepository()
+    plans = [_plan(f"t{i}", "u1") for i in range(4)]
+    repository.save_plans(plans)
+    limit = repository.memory_usage()["plan_bytes"] + 50
+    repository.max_plan_bytes = limit
+
+    for plan in plans:
+        repository.get_encoded_plan(plan.trip_id)
+
+    assert repository.memory_usage()["plan_bytes"] <= limit
+    assert repository.get_plan("t3") is not None  # most recently read survives
@@ -0,0 +1,101 @@
+import sqlite3
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+
+from app.models.domain import (
+    Activity,
+    BookingRecord,
+    BookingStatus,
+    BookingType,
+    BudgetSummary,
+    DayPlan,
+    PaymentStatus,
+    TripPlan,
+)
+from app.models.encoding import encode_plan_with_etag
+from app.storage.sqlite_repository import SqliteRepository
+
+
+def _plan(trip_id: str) -> TripPlan:
+    return TripPlan(
+        trip_id=trip_id,
+        user_id="u1",
+        destination="Lisbon",
+        start_date=date(2025, 5, 1),
+        end_date=date(2025, 5, 2),
+        days=[DayPlan(date=date(2025, 5, 1), activities=[Activity("morning", "Tram 28", "Ride", 3.0, False)])],
+        budget_summary=BudgetSummary(total_estimated=613.0, breakdown={"flight": 450.0, "hotel": 160.0, "activities": 3.0}),
+    )
+
+
+def _booking(booking_id: str, trip_id: str) -> BookingRecord:
+    return BookingRecord(
+        booking_id=booking_id,
+        user_id="u1",
+        trip_id=trip_id,
+        type=BookingType.flight,
+        status=BookingStatus.confirmed,
+        provider="mock-air",
+        price=450.0,
+        created_at=datetime(2025, 4, 1, 12, 0),
+        payment_status=PaymentStatus.authorized,
+    )
+
+
+def test_sqlite_repository_survives_restart(tmp_path: Path):
+    db_path = tmp_path / "planner.db"
+    repository = SqliteRepository(db_path)
+    repository.save_plans([_plan("t1"), _plan("t2")])
+    repository.save_booking(_booking("b1", "t1"))
+    repository.save_booking(_booking("b2", "t2"))
+
+    reopened = SqliteRepository(db_path)
+
+    assert reopened.get_plan("t1") == _plan("t1")
+    assert reopened.get_plan("missing") is None
+    assert reopened.get_encoded_plan("t1") == encode_plan_with_etag(_plan("t1"))
+    assert {p.trip_id for p in reopened.list_plans()} == {"t1", "t2"}
+    assert reopened.list_bookings_for_trip("t1") == [_booking("b1", "t1")]
+
+
+def test_sqlite_save_bookings_is_atomic(tmp_path: Path):
+    repository = SqliteRepository(tmp_path / "planner.db")
+    broken = _booking("b3", "t1")
+    broken.price = None  # violates NOT NULL
+
+    with pytest.raises(sqlite3.IntegrityError):
+        repository.save_bookings([_booking("b1", "t1"), _booking("b2", "t1"), broken])
+
+    assert repository.list_bookings_for_trip("t1") == []
+    repository.save_bookings([_booking("b1", "t1"), _booking("b2", "t1")])
+    assert [b.booking_id for b in repository.list_bookings_for_trip("t1")] == ["b1", "b2"]
+
+
+def test_sqlite_idempotency_claim_is_shared_between_workers(tmp_path: Path):
+    worker_a = SqliteRepository(tmp_path / "planner.db")
+    worker_b = SqliteRepository(tmp_path / "planner.db")
+
+    assert worker_a.claim_idempotency_key("t1:key:k") == (True, None)
+    assert worker_b.claim_idempotency_key("t1:key:k") == (False, None)  # still booking
+
+    worker_a.save_bookings([_booking("b1", "t1")], idempotency_key="t1:key:k")
+    assert worker_b.claim_idempotency_key("t1:key:k") == (False, [_booking("b1", "t1")])
+
+    assert worker_a.claim_idempotency_key("t2:key:k") == (True, None)
+    worker_a.release_idempotency_key("t2:key:k")
+    assert worker_b.claim_idempotency_key("t2:key:k") == (True, None)
+
+
+def test_sqlite_resaved_plan_keeps_its_page_position(tmp_path: Path):
+    repository = SqliteRepository(tmp_path / "planner.db")
+    repository.save_plans([_plan("t1"), _plan("t2"), _plan("t3")])
+
+    first, cursor = repository.list_plans_page(limit=2)
+    repository.save_plan(_plan("t1"))
+    second, _ = repository.list_plans_page(limit=2, cursor=cursor)
+
+    assert [p.trip_id for p in first + second] == ["t1", "t2", "t3"]
+    with pytest.raises(ValueError):
+        repository.list_plans_page(cursor="abc")
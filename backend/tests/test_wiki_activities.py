@@ -0,0 +1,233 @@
+import gzip
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.llm.tools.rag_store import INDEX_FILENAME, RAGTool
+from app.rag import destination_rules, wiki_activities
+from app.rag.destination_rules import DestinationMatcher, DestinationRule
+from app.rag.near_duplicates import NearDuplicateFilter
+from app.rag.wiki_activities import (
+    build_wiki_activity_candidates,
+    detect_destination,
+    extract_candidate_activities,
+    iter_wiki_docs,
+)
+
+LISBON_DOC = """<doc id="{id}" url="https://en.wikipedia.org/wiki?curid={id}" title="{title}">
+{title}
+
+{title} {detail}
+</doc>
+"""
+LISBON_DETAILS = [
+    "is a viewpoint in the Alfama district of Lisbon, Portugal, overlooking the Tagus River.",
+    "is a tiled chapel hidden behind a bakery in Lisbon, Portugal, famous for its ceiling.",
+    "runs ferries across the estuary from Lisbon, Portugal to the southern bank every hour.",
+    "was a sardine cannery in Lisbon, Portugal that now hosts weekend flea markets.",
+    "is a botanical garden with giant ficus trees near the university in Lisbon, Portugal.",
+    "hosts fado concerts in a cramped cellar tavern of Lisbon, Portugal until dawn.",
+    "is a funicular climbing the steep slope between two neighbourhoods of Lisbon, Portugal.",
+    "exhibits azulejo tiles from five centuries in a former convent of Lisbon, Portugal.",
+    "is a surf beach reached by suburban train from Lisbon, Portugal in forty minutes.",
+    "sells custard tarts from an 1837 recipe at the monastery quarter of Lisbon, Portugal.",
+    "is an oceanarium built for the 1998 world exposition in Lisbon, Portugal.",
+    "is a flea market held on Tuesdays and Saturdays beside a church in Lisbon, Portugal.",
+]
+OTHER_DOC = """<doc id="{id}" url="https://en.wikipedia.org/wiki?curid={id}" title="{title}">
+{title}
+
+{title} is a town in Maine, United States, named after Lisbon in Portugal.
+</doc>
+"""
+
+
+def _write_shards(base: Path, shards: int = 4, per_shard: int = 3) -> None:
+    base.mkdir(parents=True)
+    doc_id = 0
+    for s in range(shards):
+        parts = []
+        for _ in range(per_shard):
+            doc_id += 1
+            template = LISBON_DOC if doc_id % 3 else OTHER_DOC
+            detail = LISBON_DETAILS[doc_id % len(LISBON_DETAILS)]
+            parts.append(template.format(id=doc_id, title=f"Miradouro {doc_id}", detail=detail))
+        (base / f"wiki_{s:02d}").write_text("".join(parts), encoding="utf-8")
+
+
+def test_detect_destination_respects_negatives(tmp_path: Path):
+    _write_shards(tmp_path / "AA", shards=1)
+    detected = [detect_destination(doc) for doc in iter_wiki_docs(tmp_path / "AA")]
+    assert detected == ["Lisbon", "Lisbon", None]
+
+
+def test_parallel_build_matches_serial(tmp_path: Path):
+    _write_shards(tmp_path / "AA")
+    progress = []
+    build_wiki_activity_candidates(tmp_path / "AA", tmp_path / "serial", workers=1)
+    build_wiki_activity_candidates(
+        tmp_path / "AA",
+        tmp_path / "parallel",
+        workers=2,
+        chunk_size=2,
+        progress=lambda done, total, result: progress.append((done, total)),
+    )
+
+    serial = (tmp_path / "serial" / "wiki_activities_lisbon.txt").read_text(encoding="utf-8")
+    parallel = (tmp_path / "parallel" / "wiki_activities_lisbon.txt").read_text(encoding="utf-8")
+    assert parallel == serial
+    assert len(serial.splitlines()) == 8
+    assert progress == [(1, 4), (2, 4), (3, 4), (4, 4)]
+
+
+def test_destination_rules_are_data_driven_and_paths_agree(monkeypatch):
+    rules = [
+        DestinationRule("Lisbon", "lisbon", positive=("lisbon, portugal",), negative=("maine",), keywords=("alfama",)),
+        DestinationRule("Porto", "porto", positive=("porto, portugal", "ribeira"), keywords=("douro",)),
+    ]
+    docs = [
+        ("Ribeira", "A quarter of Porto, Portugal on the Douro."),
+        ("Alfama", "Oldest district of Lisbon."),
+        ("Lisbon Falls", "A village in Maine, near Lisbon."),
+        ("Douro Valley", "Wine region upstream of Porto and Lisbon, Portugal."),
+        ("Madrid", "Capital of Spain."),
+    ]
+    scan = DestinationMatcher(rules)
+    assert [scan.detect(title, text) for title, text in docs] == ["Porto", "Lisbon", None, "Lisbon", None]
+
+    monkeypatch.setattr(destination_rules, "ahocorasick", None)
+    regex = DestinationMatcher(rules, automaton_min_rules=0)
+    assert [regex.detect(title, text) for title, text in docs] == [scan.detect(t, x) for t, x in docs]
+
+    monkeypatch.undo()
+    pytest.importorskip("ahocorasick")
+    automaton = DestinationMatcher(rules, automaton_min_rules=0)
+    assert [automaton.detect(title, text) for title, text in docs] == [scan.detect(t, x) for t, x in docs]
+
+
+def test_incremental_build_rescans_only_changed_shards(tmp_path: Path):
+    base = tmp_path / "AA"
+    _write_shards(base)
+    out = tmp_path / "out"
+    build_wiki_activity_candidates(base, out, workers=1)
+
+    (base / "wiki_01").write_text(LISBON_DOC.format(id=99, title="Miradouro 99", detail=LISBON_DETAILS[99 % 12]), encoding="utf-8")
+    # An interrupted run leaves some shards without a record; they are redone too.
+    for record in (out / ".wiki_manifest").glob("wiki_03.*.json"):
+        record.unlink()
+    reused = {}
+    build_wiki_activity_candidates(
+        base, out, workers=1, progress=lambda done, total, r: reused.update({Path(r.path).name: r.reused})
+    )
+    assert reused == {"wiki_00": True, "wiki_01": False, "wiki_02": True, "wiki_03": False}
+
+    build_wiki_activity_candidates(base, tmp_path / "full", workers=1, force=True)
+    incremental = (out / "wiki_activities_lisbon.txt").read_text(encoding="utf-8")
+    assert incremental == (tmp_path / "full" / "wiki_activities_lisbon.txt").read_text(encoding="utf-8")
+    assert "Miradouro 99" in incremental
+
+
+def test_touched_shards_are_reused_by_hash(tmp_path: Path):
+    base = tmp_path / "AA"
+    base.mkdir()
+    (base / "wiki_00").write_text(LISBON_DOC.format(id=1, title="Miradouro 1", detail=LISBON_DETAILS[1]), encoding="utf-8")
+    with gzip.open(base / "wiki_01.gz", "wt", encoding="utf-8") as f:
+        f.write(LISBON_DOC.format(id=2, title="Miradouro 2", detail=LISBON_DETAILS[2]))
+    out = tmp_path / "out"
+    build_wiki_activity_candidates(base, out, workers=1)
+
+    for shard in base.iterdir():
+        os.utime(shard, ns=(shard.stat().st_atime_ns, shard.stat().st_mtime_ns + 10**9))
+    reused = {}
+    build_wiki_activity_candidates(
+        base, out, workers=1, progress=lambda done, total, r: reused.update({Path(r.path).name: r.reused})
+    )
+    # The hash taken while scanning matches the one taken from the file alone.
+    assert reused == {"wiki_00": True, "wiki_01.gz": True}
+
+
+def test_compressed_shards_stream_with_bounded_bodies(tmp_path: Path):
+    base = tmp_path / "AA"
+    base.mkdir()
+    long_doc = LISBON_DOC.format(id=1, title="Miradouro 1", detail=LISBON_DETAILS[0]).replace("</doc>", "\nfiller line\n" * 2000 + "</doc>")
+    with gzip.open(base / "wiki_00.gz", "wt", encoding="utf-8") as f:
+        f.write(long_doc + OTHER_DOC.format(id=2, title="Lisbon Falls"))
+
+    docs = list(iter_wiki_docs(base))
+    assert [(d.id, d.title) for d in docs] == [("1", "Miradouro 1"), ("2", "Lisbon Falls")]
+    assert len(docs[0].text) < 2000  # stopped buffering after the detection window
+    assert extract_candidate_activities(docs[0]) == [
+        "Miradouro 1 | Miradouro 1 is a viewpoint in the Alfama district of Lisbon, Portugal, "
+        "overlooking the Tagus River."
+    ]
+
+
+def test_zst_shards_are_skipped_without_zstandard(tmp_path: Path, monkeypatch, caplog):
+    base = tmp_path / "AA"
+    base.mkdir()
+    (base / "wiki_00").write_text(LISBON_DOC.format(id=1, title="Miradouro 1", detail=LISBON_DETAILS[1]), encoding="utf-8")
+    (base / "wiki_01.zst").write_bytes(b"not readable without zstandard")
+    monkeypatch.setattr(wiki_activities, "zstandard", None)
+
+    assert [d.id for d in iter_wiki_docs(base)] == ["1"]
+    assert "install zstandard" in caplog.text
+
+
+def test_build_writes_prebuilt_rag_index(tmp_path: Path):
+    _write_shards(tmp_path / "AA", shards=2)
+    rag_dir = tmp_path / "rag"
+    build_wiki_activity_candidates(
+        tmp_path / "AA", tmp_path / "out", workers=1, index_path=rag_dir / INDEX_FILENAME, embed_batch_size=3
+    )
+
+    rag = RAGTool(store_path=rag_dir)
+    rag.load_index()
+    assert len(rag.documents) == 4
+    doc = rag.documents[0]
+    assert doc.doc_id == "wiki-1"
+    assert doc.metadata == {
+        "destination": "Lisbon",
+        "url": "https://en.wikipedia.org/wiki?curid=1",
+        "title": "Miradouro 1",
+    }
+    # Vectors come from the artifact, so a search for a stored line finds it exactly.
+    text, score = rag.search(doc.text, top_k=1)[0]
+    assert text == doc.text and score > 0.999
+
+
+def test_near_duplicate_candidates_are_dropped_and_reported(tmp_path: Path):
+    base = tmp_path / "AA"
+    base.mkdir()
+    docs = [
+        LISBON_DOC.format(id=1, title="Tram 28", detail=LISBON_DETAILS[6]),
+        LISBON_DOC.format(id=2, title="Tram 28", detail=LISBON_DETAILS[6].replace("steep", "steep,")),
+        LISBON_DOC.format(id=3, title="Oceanario", detail=LISBON_DETAILS[10]),
+    ]
+    (base / "wiki_00").write_text("".join(docs), encoding="utf-8")
+
+    build_wiki_activity_candidates(base, tmp_path / "out", workers=1)
+    lines = (tmp_path / "out" / "wiki_activities_lisbon.txt").read_text(encoding="utf-8").splitlines()
+    assert [line.split(" | ")[0] for line in lines] == ["Tram 28", "Oceanario"]
+    report = json.loads((tmp_path / "out" / "wiki_dedup_report.json").read_text(encoding="utf-8"))
+    assert (report["checked"], report["dropped"], report["dropped_by_group"]) == (3, 1, {"Lisbon": 1})
+
+    build_wiki_activity_candidates(base, tmp_path / "all", workers=1, dedup_threshold=0)
+    assert len((tmp_path / "all" / "wiki_activities_lisbon.txt").read_text(encoding="utf-8").splitlines()) == 3
+
+
+@pytest.mark.parametrize("max_entries", [10, 1])
+def test_near_duplicates_of_later_texts_in_a_shared_bucket_are_found(max_entries):
+    dedup = NearDuplicateFilter(threshold=0.8, num_perm=64, max_entries=max_entries)
+    assert (dedup.bands, dedup.rows) == (8, 8)
+    first = np.zeros(64, dtype=np.uint32)
+    second = np.concatenate([first[:8], np.arange(1, 57, dtype=np.uint32)])  # shares only band 0 with first
+    near_second = second.copy()
+    near_second[8::8] += 1000  # one row changed in every other band: 57/64 similar to second
+    signatures = {"first": first, "second": second, "near second": near_second}
+    dedup.signature = signatures.__getitem__
+
+    assert [dedup.is_duplicate(text) for text in signatures] == [False, False, True]
+    assert dedup.report.examples == [{"dropped": "near second", "kept": "second"}]